@@ -0,0 +1,97 @@
+"""Requests/sec through the middleware stack: legacy vs pure ASGI.
+
+The legacy stack is reproduced here (SentryAsgiMiddleware plus two
+BaseHTTPMiddleware layers) so both can be measured side by side:
+
+    poetry run python -m benchmarks.bench_middleware --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import httpx
+from fastapi import FastAPI, Request
+from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from fastapi_assignment.config import SECURE_PATH_PATTERNS
+from fastapi_assignment.middleware.request_middleware import RequestGuardMiddleware
+from fastapi_assignment.utils.jwt_utils import (
+    create_access_token,
+    decode_access_token,
+)
+
+
+class LegacyJWTAuthenticationMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if any(pattern.match(request.url.path) for pattern in SECURE_PATH_PATTERNS):
+            authorization = request.headers.get("Authorization")
+            if not authorization:
+                return JSONResponse(status_code=403, content={"detail": "missing"})
+            scheme, token = authorization.split()
+            payload = decode_access_token(token)
+            if payload is None:
+                return JSONResponse(status_code=403, content={"detail": "invalid"})
+            request.state.email = payload.get("email")
+        return await call_next(request)
+
+
+class LegacySentryLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"detail": "error"})
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+    if stack == "legacy":
+        app.add_middleware(SentryAsgiMiddleware)
+        app.add_middleware(LegacyJWTAuthenticationMiddleware)
+        app.add_middleware(LegacySentryLoggingMiddleware)
+    else:
+        app.add_middleware(RequestGuardMiddleware)
+
+    @app.get("/candidate/{id}")
+    async def protected(id: str, request: Request):
+        return {"id": id, "email": request.state.email}
+
+    return app
+
+
+async def measure(stack: str, requests: int, concurrency: int) -> dict:
+    token = create_access_token({"id": "1", "email": "bench@example.com"})
+    transport = httpx.ASGITransport(app=build_app(stack))
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        await client.get("/candidate/warmup")
+        started = time.perf_counter()
+        for _ in range(requests // concurrency):
+            responses = await asyncio.gather(
+                *(client.get("/candidate/1") for _ in range(concurrency))
+            )
+            assert all(r.status_code == 200 for r in responses)
+        elapsed = time.perf_counter() - started
+    done = (requests // concurrency) * concurrency
+    return {"stack": stack, "requests": done, "rps": round(done / elapsed, 1)}
+
+
+async def main(requests: int, concurrency: int):
+    results = [await measure(s, requests, concurrency) for s in ("legacy", "asgi")]
+    results.append(
+        {"speedup": round(results[1]["rps"] / results[0]["rps"], 2)},
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
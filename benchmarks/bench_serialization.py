@@ -0,0 +1,94 @@
+"""Candidate list responses per page size: validated vs trusted fast path.
+
+The validated path is what /all-candidates did before: build CandidateInDB
+per document, revalidate through response_model and encode with the
+standard JSON encoder. The fast path maps stored documents straight to
+dicts and encodes them with orjson:
+
+    poetry run python -m benchmarks.bench_serialization --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+import httpx
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi_assignment.models.candidate import CandidateInDB
+from fastapi_assignment.utils.serialization import candidate_document
+
+PAGE_SIZES = (10, 50, 100)
+
+
+def stored_documents(count: int) -> List[dict]:
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Candidate {index}",
+            "email": f"candidate{index}@example.com",
+            "experience": index % 20,
+            "is_verified": index % 2 == 0,
+            "version": 1,
+        }
+        for index in range(count)
+    ]
+
+
+def build_app(path: str, documents: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    if path == "validated":
+
+        @app.get("/all-candidates", response_model=List[CandidateInDB])
+        async def validated(size: int):
+            return [
+                CandidateInDB(id=str(document["_id"]), **document)
+                for document in documents[:size]
+            ]
+
+    else:
+
+        @app.get("/all-candidates", response_model=List[CandidateInDB])
+        async def fast(size: int):
+            return ORJSONResponse(
+                [candidate_document(document) for document in documents[:size]]
+            )
+
+    return app
+
+
+async def measure(path: str, size: int, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=build_app(path, stored_documents(size)))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        await c.get("/all-candidates", params={"size": size})
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await c.get("/all-candidates", params={"size": size})
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - started
+    return {
+        "path": path,
+        "page_size": size,
+        "rps": round(requests / elapsed, 1),
+        "us_per_request": round(elapsed / requests * 1e6, 1),
+    }
+
+
+async def main(requests: int):
+    results = []
+    for size in PAGE_SIZES:
+        validated = await measure("validated", size, requests)
+        fast = await measure("fast", size, requests)
+        fast["speedup"] = round(fast["rps"] / validated["rps"], 2)
+        results.extend([validated, fast])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
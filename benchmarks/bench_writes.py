@@ -0,0 +1,243 @@
+"""Round trips and latency of candidate writes: legacy vs atomic.
+
+The legacy flows are the pre-check / read-back sequences the controller
+used before (find_one + insert_one, find_one + update_one, update_one +
+find_one); the atomic flows are single insert_one / find_one_and_update
+calls. By default MongoDB is replaced with an in-memory collection that
+charges a simulated network round trip per call; pass --mongo-url to run
+against a real server (a scratch database is created and dropped):
+
+    poetry run python -m benchmarks.bench_writes --operations 2000
+    poetry run python -m benchmarks.bench_writes --mongo-url mongodb://localhost
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import secrets
+import statistics
+import time
+from types import SimpleNamespace
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument, monitoring
+from pymongo.errors import DuplicateKeyError
+
+UPDATE = {"$set": {"experience": 5}, "$inc": {"version": 1}}
+VERIFY = {"$set": {"is_verified": True, "verification_token": None}}
+
+
+class RoundTripCollection:
+    # In-memory stand-in for the few collection calls the flows make, with
+    # hash "indexes" so lookups cost as little as the simulated round trip
+    INDEXED = ("_id", "email", "verification_token")
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+        self.indexes = {field: {} for field in self.INDEXED}
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    def _find(self, query):
+        field = next(field for field in self.INDEXED if field in query)
+        document = self.indexes[field].get(query[field])
+        if document and all(document.get(k) == v for k, v in query.items()):
+            return document
+        return None
+
+    def _store(self, document):
+        document = copy.deepcopy(document)
+        for field in self.INDEXED:
+            self.indexes[field][document.get(field)] = document
+
+    def _apply(self, document, update):
+        for field in self.INDEXED:
+            self.indexes[field].pop(document.get(field), None)
+        document.update(update.get("$set", {}))
+        for key, step in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + step
+        for field in self.INDEXED:
+            self.indexes[field][document.get(field)] = document
+
+    async def find_one(self, query):
+        await self._round_trip()
+        return copy.deepcopy(self._find(query))
+
+    async def insert_one(self, document):
+        await self._round_trip()
+        if self._find({"email": document["email"]}):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        document.setdefault("_id", ObjectId())
+        self._store(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def insert_many(self, documents):
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self._store(document)
+
+    async def update_one(self, query, update):
+        await self._round_trip()
+        document = self._find(query)
+        if document:
+            self._apply(document, update)
+        return SimpleNamespace(matched_count=int(document is not None))
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        await self._round_trip()
+        document = self._find(query)
+        if document is None:
+            return None
+        before = copy.deepcopy(document)
+        self._apply(document, update)
+        return copy.deepcopy(document) if return_document else before
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.round_trips = 0
+
+    def started(self, event):
+        if event.command_name in ("find", "insert", "update", "findAndModify"):
+            self.round_trips += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_create(collection, document):
+    if await collection.find_one({"email": document["email"]}):
+        return
+    await collection.insert_one(document)
+
+
+async def atomic_create(collection, document):
+    try:
+        await collection.insert_one(document)
+    except DuplicateKeyError:
+        return
+
+
+async def legacy_verify(collection, document):
+    candidate = await collection.find_one(
+        {"verification_token": document["verification_token"], "is_verified": False}
+    )
+    if candidate:
+        await collection.update_one({"_id": candidate["_id"]}, VERIFY)
+
+
+async def atomic_verify(collection, document):
+    await collection.find_one_and_update(
+        {"verification_token": document["verification_token"], "is_verified": False},
+        VERIFY,
+    )
+
+
+async def legacy_update(collection, document):
+    result = await collection.update_one({"_id": document["_id"]}, UPDATE)
+    if result.matched_count:
+        await collection.find_one({"_id": document["_id"]})
+
+
+async def atomic_update(collection, document):
+    await collection.find_one_and_update(
+        {"_id": document["_id"]}, UPDATE, return_document=ReturnDocument.AFTER
+    )
+
+
+FLOWS = {
+    "create": (legacy_create, atomic_create),
+    "verify": (legacy_verify, atomic_verify),
+    "update": (legacy_update, atomic_update),
+}
+
+
+def candidate_documents(count: int):
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Candidate {index}",
+            "email": f"bench-{secrets.token_hex(6)}@example.com",
+            "experience": 1,
+            "is_verified": False,
+            "verification_token": secrets.token_urlsafe(16),
+            "version": 1,
+        }
+        for index in range(count)
+    ]
+
+
+async def run_flow(collection, counter, flow, operations, concurrency, seed):
+    documents = candidate_documents(operations)
+    if seed:
+        await collection.insert_many(copy.deepcopy(documents))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(document):
+        async with semaphore:
+            started = time.perf_counter()
+            await flow(collection, document)
+            latencies.append(time.perf_counter() - started)
+
+    before = counter.round_trips
+    started = time.perf_counter()
+    await asyncio.gather(*(one(document) for document in documents))
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "flow": flow.__name__,
+        "round_trips_per_op": round((counter.round_trips - before) / operations, 2),
+        "ops_per_sec": round(operations / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+async def main(args):
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        counter = CommandCounter()
+        client = AsyncIOMotorClient(args.mongo_url, event_listeners=[counter])
+        database = client[f"bench_writes_{secrets.token_hex(4)}"]
+        collection = database["candidates"]
+        await collection.create_index([("email", ASCENDING)], unique=True)
+        await collection.create_index([("verification_token", ASCENDING)])
+    else:
+        collection = counter = RoundTripCollection(args.rtt_ms / 1000)
+
+    results = []
+    try:
+        for name, (legacy, atomic) in FLOWS.items():
+            seed = name != "create"
+            for flow in (legacy, atomic):
+                results.append(
+                    await run_flow(
+                        collection,
+                        counter,
+                        flow,
+                        args.operations,
+                        args.concurrency,
+                        seed,
+                    )
+                )
+    finally:
+        if args.mongo_url:
+            await client.drop_database(database.name)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--mongo-url", help="Run against this MongoDB instead")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,364 @@
+"""Per-endpoint throughput and latency percentiles for the whole API.
+
+Drives fastapi_assignment.main:app in process through httpx's ASGI
+transport (the app lifespan runs as in production), or a running server
+with --base-url. In process, --stand-ins swaps MongoDB and Redis for
+mongomock-motor and fakeredis (pip install mongomock-motor fakeredis).
+mongomock scans in Python and has no $text, so stand-in runs skip search
+and are only comparable with other stand-in runs. Without it
+MONGO_URL/REDIS_URL are used with a scratch DB_NAME that is dropped
+afterwards. A scratch user and --seed candidates are created,
+then --requests calls are drawn from the weighted --mix:
+
+    poetry run python -m benchmarks.loadtest --stand-ins --requests 2000
+    poetry run python -m benchmarks.loadtest --mix get=6,list=3,create=1
+    poetry run python -m benchmarks.loadtest --base-url http://localhost:8000
+
+send-report queues real report emails to the scratch user (an
+example.com address) unless --stand-ins is used or its weight is 0.
+Results are printed as JSON (and written to --output) for comparing
+releases.
+
+--base-url writes to that server's real database, so it also needs
+--allow-writes. Every candidate the run creates is deleted through
+DELETE /candidate/{id} afterwards, even when the run fails. The scratch
+user cannot be removed through the API and is printed on stderr for
+manual cleanup. The server's outbox relay and worker still send the
+verification emails for created candidates (to example.com addresses)
+and any report emails, so point it at a staging server whose mail goes
+nowhere real.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import secrets
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import httpx
+
+DEFAULT_MIX = "login=1,list=3,search=2,get=6,create=1,update=1,report=0.2"
+PASSWORD = "loadtest-password"
+BULK_CHUNK = 500
+
+
+def install_stand_ins():
+    # Must run before fastapi_assignment is imported: the app builds its
+    # MongoDB and Redis clients at import time
+    import fakeredis
+    import motor.motor_asyncio
+    import redis.asyncio
+    from mongomock_motor import AsyncMongoMockClient
+
+    server = fakeredis.FakeServer()
+
+    class StandInMotorClient(AsyncMongoMockClient):
+        def __init__(self, *args, event_listeners=None, io_loop=None, **kwargs):
+            super().__init__(*args, **kwargs)
+
+    class StandInRedis(fakeredis.FakeAsyncRedis):
+        @classmethod
+        def from_url(cls, url, **kwargs):
+            return cls(server=server, **kwargs)
+
+    motor.motor_asyncio.AsyncIOMotorClient = StandInMotorClient
+    redis.asyncio.Redis = StandInRedis
+    # Nothing consumes the broker, so leave queued tasks in the outbox
+    os.environ["OUTBOX_RELAY_ENABLED"] = "False"
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; use {', '.join(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+def candidate_payload(label: str, rng: random.Random) -> dict:
+    return {
+        "name": f"Loadtest Candidate {label}",
+        "email": f"loadtest-{label}-{secrets.token_hex(4)}@example.com",
+        "experience": rng.randint(0, 15),
+    }
+
+
+async def login(ctx):
+    return await ctx.client.post("/user/login", json=ctx.credentials)
+
+
+async def list_candidates(ctx):
+    page = ctx.rng.randint(1, max(1, len(ctx.candidate_ids) // 10))
+    return await ctx.client.get(
+        "/all-candidates", params={"page": page, "size": 10}, headers=ctx.headers
+    )
+
+
+async def search_candidates(ctx):
+    term = f"Candidate {ctx.rng.randint(1, 99)}"
+    return await ctx.client.get(
+        "/all-candidates", params={"search": term}, headers=ctx.headers
+    )
+
+
+async def get_candidate(ctx):
+    id = ctx.rng.choice(ctx.candidate_ids)
+    return await ctx.client.get(f"/candidate/{id}", headers=ctx.headers)
+
+
+async def create_candidate(ctx):
+    response = await ctx.client.post(
+        "/candidate",
+        json=candidate_payload(secrets.token_hex(3), ctx.rng),
+        headers=ctx.headers,
+    )
+    if response.status_code == 200:
+        ctx.candidate_ids.append(response.json()["id"])
+    return response
+
+
+async def update_candidate(ctx):
+    id = ctx.rng.choice(ctx.candidate_ids)
+    return await ctx.client.put(
+        f"/candidate/{id}",
+        json={"experience": ctx.rng.randint(0, 20)},
+        headers=ctx.headers,
+    )
+
+
+async def send_report(ctx):
+    return await ctx.client.get("/send-report", headers=ctx.headers)
+
+
+SCENARIOS = {
+    "login": login,
+    "list": list_candidates,
+    "search": search_candidates,
+    "get": get_candidate,
+    "create": create_candidate,
+    "update": update_candidate,
+    "report": send_report,
+}
+
+
+async def prepare(client: httpx.AsyncClient, rng: random.Random):
+    credentials = {
+        "email": f"loadtest-{secrets.token_hex(6)}@example.com",
+        "password": PASSWORD,
+    }
+    response = await client.post("/user/register", json=credentials)
+    response.raise_for_status()
+    return SimpleNamespace(
+        client=client,
+        credentials=credentials,
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+        # Every candidate the run creates, so it can be removed afterwards
+        candidate_ids=[],
+        rng=rng,
+    )
+
+
+async def seed_candidates(ctx, seed: int):
+    for start in range(0, seed, BULK_CHUNK):
+        end = min(start + BULK_CHUNK, seed)
+        response = await ctx.client.post(
+            "/candidates/bulk",
+            json=[
+                candidate_payload(str(index), ctx.rng) for index in range(start, end)
+            ],
+            headers=ctx.headers,
+        )
+        response.raise_for_status()
+        ctx.candidate_ids += [
+            item["id"] for item in response.json()["results"] if item["id"]
+        ]
+    if not ctx.candidate_ids:
+        raise SystemExit("No candidates were seeded; use --seed 1 or more")
+
+
+async def remove_candidates(ctx, concurrency: int) -> int:
+    # Returns how many candidates could not be deleted
+    ids = iter(ctx.candidate_ids)
+    left = []
+
+    async def worker():
+        for id in ids:
+            try:
+                response = await ctx.client.delete(
+                    f"/candidate/{id}", headers=ctx.headers
+                )
+                if response.status_code not in (200, 204, 404):
+                    left.append(id)
+            except httpx.HTTPError:
+                left.append(id)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(left)
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list, statuses: Counter, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(ordered) / elapsed, 1),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def run_load(ctx, plan: list, concurrency: int, record: bool = True):
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    calls = iter(plan)
+
+    async def worker():
+        # Workers share one iterator, so each call in the plan runs once
+        for name in calls:
+            started = time.perf_counter()
+            try:
+                status = (await SCENARIOS[name](ctx)).status_code
+            except httpx.HTTPError:
+                # Transport failures (e.g. a refused connection) count as 599
+                status = 599
+            latencies[name].append(time.perf_counter() - started)
+            statuses[name][status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    if not record:
+        return None
+
+    all_statuses = sum(statuses.values(), Counter())
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "total": summarize(all_latencies, all_statuses, elapsed),
+        "endpoints": {
+            name: summarize(latencies[name], statuses[name], elapsed)
+            for name in sorted(latencies)
+        },
+    }
+
+
+async def clean_up_server(ctx, concurrency: int):
+    left = await remove_candidates(ctx, concurrency)
+    if left:
+        print(f"Could not delete {left} loadtest candidates", file=sys.stderr)
+    print(
+        f"Remove the scratch user {ctx.credentials['email']} by hand",
+        file=sys.stderr,
+    )
+
+
+async def main(args):
+    if args.base_url and not args.allow_writes:
+        raise SystemExit(
+            "--base-url writes a user and --seed candidates to that server's "
+            "database and makes its worker send emails; add --allow-writes"
+        )
+    mix = parse_mix(args.mix)
+    if args.stand_ins and mix.pop("search", None):
+        print("Skipping search: mongomock has no $text support", file=sys.stderr)
+    rng = random.Random(args.random_seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    warmup = rng.choices(list(mix), weights=list(mix.values()), k=args.warmup)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    scratch_db = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        lifespan = None
+        target = args.base_url
+    else:
+        if args.stand_ins:
+            install_stand_ins()
+        else:
+            scratch_db = f"loadtest_{secrets.token_hex(4)}"
+            os.environ["DB_NAME"] = scratch_db
+        # Keep load-test errors out of Sentry
+        os.environ["SENTRY_DSN"] = ""
+        # Import-time prints would break the JSON on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            from fastapi_assignment.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            timeout=args.timeout,
+        )
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        target = "asgi"
+
+    try:
+        async with client:
+            ctx = await prepare(client, rng)
+            try:
+                await seed_candidates(ctx, args.seed)
+                await run_load(ctx, warmup, args.concurrency, record=False)
+                result = await run_load(ctx, plan, args.concurrency)
+            finally:
+                if args.base_url:
+                    await clean_up_server(ctx, args.concurrency)
+    finally:
+        if lifespan:
+            await lifespan.__aexit__(None, None, None)
+        if scratch_db:
+            from fastapi_assignment.utils.dependencies import mongodb_client
+
+            await mongodb_client.drop_database(scratch_db)
+
+    report = {
+        "started_at": started_at,
+        "target": target,
+        "backend": "stand-ins" if args.stand_ins else "services",
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "random_seed": args.random_seed,
+        "mix": mix,
+        **result,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1000, help="Candidates to seed")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--base-url", help="Load a running server instead")
+    parser.add_argument(
+        "--allow-writes",
+        action="store_true",
+        help="Allow --base-url runs to write to the server's database",
+    )
+    parser.add_argument("--stand-ins", action="store_true")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    asyncio.run(main(parser.parse_args()))
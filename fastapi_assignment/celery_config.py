@@ -22,4 +22,10 @@ celery.conf.update(
         "taskmeta_collection": config.CELERY_RESULT_COLLECTION,
     },
     imports=("fastapi_assignment.tasks",),
+    beat_schedule={
+        "reconcile-candidate-stats": {
+            "task": "reconcile_candidate_stats",
+            "schedule": config.CANDIDATE_STATS_RECONCILE_INTERVAL,
+        },
+    },
 )
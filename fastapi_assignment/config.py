@@ -32,6 +32,11 @@ MAIL_CONFIG = ConnectionConfig(
     MAIL_FROM_NAME=MAIL_FROM_NAME,
 )
 
+# SMTP connection pool used for verification emails
+MAIL_POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", 4))
+MAIL_POOL_IDLE_TIMEOUT = float(os.getenv("MAIL_POOL_IDLE_TIMEOUT", 60))
+MAIL_POOL_MAX_MESSAGES = int(os.getenv("MAIL_POOL_MAX_MESSAGES", 100))
+
 # JWT secret key
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "secret_key")
 
@@ -41,11 +46,20 @@ JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 # JWT access token expiration time
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Maximum number of verified tokens cached in-process (0 disables the cache)
+JWT_CACHE_MAX_SIZE = int(os.getenv("JWT_CACHE_MAX_SIZE", 10000))
+
+# Password hashing pool: bcrypt threads and how many extra requests may wait
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
 # MongoDB
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://mongodb:27017")
 TEST_DB_NAME = os.getenv("TEST_DB_NAME", "test_db")
 DB_NAME = os.getenv("DB_NAME", "assignment_db")
 CELERY_RESULT_COLLECTION = os.getenv("CELERY_RESULT_COLLECTION", "celery_results")
+# Create/verify the registered indexes when the API starts
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "True") == "True"
 
 # Redis connection string
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
@@ -53,6 +67,81 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
 # Celery broker URL
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 
+# Transactional outbox for Celery tasks, drained by a relay in the API
+OUTBOX_RELAY_ENABLED = os.getenv("OUTBOX_RELAY_ENABLED", "True") == "True"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 0.5))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", 30))
+OUTBOX_MAX_BACKOFF = int(os.getenv("OUTBOX_MAX_BACKOFF", 60))
+# Seconds an entry may wait for the candidates it names before it is
+# treated as left behind by a failed create and dropped
+OUTBOX_ORPHAN_GRACE = int(os.getenv("OUTBOX_ORPHAN_GRACE", 300))
+# Write the candidate and its outbox entry in one transaction (needs a
+# replica set; the bundled docker-compose MongoDB is standalone)
+OUTBOX_TRANSACTIONS = os.getenv("OUTBOX_TRANSACTIONS", "False") == "True"
+
+# Seconds a candidate verification link stays valid
+VERIFICATION_TOKEN_TTL = int(os.getenv("VERIFICATION_TOKEN_TTL", 7 * 24 * 3600))
+
+# Bulk candidate creation
+BULK_CREATE_MAX_ITEMS = int(os.getenv("BULK_CREATE_MAX_ITEMS", 10000))
+VERIFICATION_EMAIL_BATCH_SIZE = int(os.getenv("VERIFICATION_EMAIL_BATCH_SIZE", 500))
+
+# Number of candidates encoded per chunk by the streaming export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+# Report generation
+REPORT_DIR = os.getenv("REPORT_DIR", "/tmp/reports")
+REPORT_BATCH_SIZE = int(os.getenv("REPORT_BATCH_SIZE", 1000))
+REPORT_COMPRESSION_CODEC = os.getenv("REPORT_COMPRESSION_CODEC", "gzip")
+REPORT_COMPRESSION_LEVEL = int(os.getenv("REPORT_COMPRESSION_LEVEL", 6))
+# Upper bound on how long a report job may hold the coalescing lock
+REPORT_JOB_LOCK_TTL = int(os.getenv("REPORT_JOB_LOCK_TTL", 900))
+
+# Two-tier read cache for GET /candidate/{id}
+CANDIDATE_CACHE_ENABLED = os.getenv("CANDIDATE_CACHE_ENABLED", "True") == "True"
+CANDIDATE_CACHE_LOCAL_SIZE = int(os.getenv("CANDIDATE_CACHE_LOCAL_SIZE", 1000))
+CANDIDATE_CACHE_LOCAL_TTL = float(os.getenv("CANDIDATE_CACHE_LOCAL_TTL", 5))
+CANDIDATE_CACHE_REDIS_TTL = int(os.getenv("CANDIDATE_CACHE_REDIS_TTL", 300))
+
+# Cache for /all-candidates pages (entries are versioned, not invalidated)
+CANDIDATE_LIST_CACHE_ENABLED = (
+    os.getenv("CANDIDATE_LIST_CACHE_ENABLED", "True") == "True"
+)
+CANDIDATE_LIST_CACHE_LOCAL_SIZE = int(os.getenv("CANDIDATE_LIST_CACHE_LOCAL_SIZE", 500))
+CANDIDATE_LIST_CACHE_LOCAL_TTL = float(os.getenv("CANDIDATE_LIST_CACHE_LOCAL_TTL", 30))
+CANDIDATE_LIST_CACHE_REDIS_TTL = int(os.getenv("CANDIDATE_LIST_CACHE_REDIS_TTL", 300))
+
+# Upper bound on results returned by /candidates/suggest
+SUGGEST_MAX_RESULTS = int(os.getenv("SUGGEST_MAX_RESULTS", 25))
+
+# How often (seconds) Celery beat recounts the materialized candidate stats
+CANDIDATE_STATS_RECONCILE_INTERVAL = int(
+    os.getenv("CANDIDATE_STATS_RECONCILE_INTERVAL", 3600)
+)
+
+# Readiness probe: per-dependency timeout (seconds) and the limits past which
+# /health/ready reports this worker as not ready
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 0.5))
+HEALTH_MAX_LOOP_LAG = float(os.getenv("HEALTH_MAX_LOOP_LAG", 0.25))
+HEALTH_MAX_POOL_WAITING = int(os.getenv("HEALTH_MAX_POOL_WAITING", 20))
+HEALTH_MAX_IN_FLIGHT = int(os.getenv("HEALTH_MAX_IN_FLIGHT", 500))
+HEALTH_LOOP_LAG_INTERVAL = float(os.getenv("HEALTH_LOOP_LAG_INTERVAL", 0.5))
+
+# MongoDB commands slower than this (ms) are logged for /admin/slow-queries;
+# the first slow command of each query shape is explained
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", 200))
+SLOW_QUERY_EXPLAIN_SIZE = int(os.getenv("SLOW_QUERY_EXPLAIN_SIZE", 100))
+
+# Comma-separated emails allowed to use the /admin endpoints
+ADMIN_EMAILS = frozenset(
+    email.strip() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+)
+
+# Port on which Celery workers serve Prometheus metrics (0 disables)
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", 9101))
+
 # Backend URL
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
@@ -68,5 +157,7 @@ SECURE_PATH_PATTERNS = [
     re.compile(r"^/send-report$"),
     re.compile(r"^/all-candidates$"),
     re.compile(r"^/candidate(/[\w-]+)?$"),  # Matches /candidate and /candidate/<id>
+    re.compile(r"^/candidates/[\w-]+$"),  # Matches /candidates/bulk etc.
+    re.compile(r"^/admin/[\w-]+$"),
     # Add other regex patterns as needed
 ]
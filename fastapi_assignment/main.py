@@ -1,15 +1,26 @@
+import asyncio
+import logging
 import sentry_sdk
 from fastapi import FastAPI
-from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+from pymongo.errors import PyMongoError
 from contextlib import asynccontextmanager
-from fastapi_assignment.routers import health, user, candidate, report
-from fastapi_assignment.middleware.auth_middleware import JWTAuthenticationMiddleware
-from fastapi_assignment import config
-from fastapi_assignment.middleware.sentry_logging_middleware import (
-    SentryLoggingMiddleware,
+from fastapi_assignment.routers import (
+    admin,
+    candidate,
+    health,
+    metrics,
+    report,
+    user,
 )
+from fastapi_assignment.middleware.request_middleware import RequestGuardMiddleware
+from fastapi_assignment import config
+from fastapi_assignment.utils.candidate_stats import ensure_candidate_stats
+from fastapi_assignment.utils.dependencies import candidate_cache, db, outbox_relay
+from fastapi_assignment.utils.indexes import ensure_indexes, missing_unique_indexes
+from fastapi_assignment.utils.runtime_stats import loop_lag_monitor
+from fastapi_assignment.utils.slow_queries import slow_query_log
 
-# Initialize Sentry
+# Initialize Sentry (its Starlette/FastAPI integrations are enabled automatically)
 sentry_sdk.init(
     dsn=config.SENTRY_DSN,
     traces_sample_rate=config.SENTRY_TRACES_SAMPLE_RATE,
@@ -21,7 +32,55 @@ sentry_sdk.init(
 # Define lifespan to initialize resources (no need to close MongoDB here)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if config.ENSURE_INDEXES_ON_STARTUP:
+        try:
+            await ensure_indexes(db)
+        except PyMongoError as e:
+            # Do not block startup; hot lookups degrade but the API stays up
+            logging.error(f"Index check failed at startup: {e}")
+
+    try:
+        missing = await missing_unique_indexes(db)
+    except PyMongoError as e:
+        # Readiness keeps checking until MongoDB answers
+        logging.error(f"Unique index check failed at startup: {e}")
+        missing = []
+    if missing:
+        # Duplicates would be accepted silently; remove them and rerun
+        # python -m fastapi_assignment.utils.indexes
+        raise RuntimeError(
+            f"Refusing to start without unique indexes: {', '.join(missing)}"
+        )
+
+    try:
+        await ensure_candidate_stats(db)
+    except PyMongoError as e:
+        # The periodic reconciliation seeds the stats later instead
+        logging.error(f"Candidate stats seeding failed at startup: {e}")
+
+    # Drop locally cached candidates when another worker invalidates them
+    listener = None
+    if config.CANDIDATE_CACHE_ENABLED:
+        listener = asyncio.create_task(candidate_cache.listen())
+
+    # Publish queued Celery tasks in the background; entries survive restarts
+    relay = None
+    if config.OUTBOX_RELAY_ENABLED:
+        relay = asyncio.create_task(outbox_relay.run())
+
+    # Explain slow queries through the app's client and loop
+    slow_query_log.attach(db)
+
+    # Sample event-loop lag for /health/ready
+    lag_monitor = asyncio.create_task(loop_lag_monitor.run())
+
     yield  # Only yield as we already manage MongoDB client in the dependency
+
+    if listener:
+        listener.cancel()
+    if relay:
+        relay.cancel()
+    lag_monitor.cancel()
     # MongoDB client close is not needed here, as it’s a singleton
 
 
@@ -40,15 +99,15 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT",
     },
 )
-app.add_middleware(SentryAsgiMiddleware)
-app.add_middleware(JWTAuthenticationMiddleware)
-app.add_middleware(SentryLoggingMiddleware)
+app.add_middleware(RequestGuardMiddleware)
 
 # Register routers
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(user.router)
 app.include_router(candidate.router)
 app.include_router(report.router)
+app.include_router(admin.router)
 
 
 # Endpoint to test Sentry error capture
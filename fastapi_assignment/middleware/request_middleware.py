@@ -0,0 +1,116 @@
+import logging
+import re
+import time
+from typing import Iterable, Optional, Pattern, Tuple
+from jose import JWTError
+from sentry_sdk import capture_exception
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from fastapi_assignment.config import SECURE_PATH_PATTERNS
+from fastapi_assignment.utils.jwt_utils import decode_access_token_cached
+from fastapi_assignment.utils.metrics import http_metrics
+from fastapi_assignment.utils.runtime_stats import in_flight_requests
+from fastapi_assignment.utils.slow_queries import request_scope
+
+
+def compile_secure_paths(patterns: Iterable[Pattern]) -> Pattern:
+    # One alternation is matched once per request instead of every pattern
+    return re.compile("|".join(f"(?:{pattern.pattern})" for pattern in patterns))
+
+
+class RequestGuardMiddleware:
+    # Pure ASGI middleware handling route protection, bearer-token validation,
+    # request metrics and unhandled-exception capture in a single layer
+
+    def __init__(self, app: ASGIApp, secure_patterns=SECURE_PATH_PATTERNS):
+        self.app = app
+        self.secure_path = compile_secure_paths(secure_patterns)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Requests that fail before a response starts end up as a 500
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # Lets the slow-query log name the route behind each command
+        scope_token = request_scope.set(scope)
+        started = time.perf_counter()
+        try:
+            with in_flight_requests:
+                await self.handle(scope, receive, send_with_status)
+        finally:
+            http_metrics.observe(scope, status, time.perf_counter() - started)
+            request_scope.reset(scope_token)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send):
+        if self.secure_path.match(scope["path"]):
+            email, error = self.authenticate(scope)
+            if error:
+                response = JSONResponse(status_code=403, content={"detail": error})
+                await response(scope, receive, send)
+                return
+            # Exposed to handlers as request.state.email
+            scope.setdefault("state", {})["email"] = email
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Log the exception to Sentry
+            capture_exception(e)
+            logging.error(f"Unhandled error: {e}")
+            if response_started:
+                raise
+            # Return a generic error response
+            response = JSONResponse(
+                status_code=500,
+                content={
+                    "detail": "An internal server error occurred. Our team has "
+                    "been notified."
+                },
+            )
+            await response(scope, receive, send)
+
+    @staticmethod
+    def authenticate(scope: Scope) -> Tuple[Optional[str], Optional[str]]:
+        # Returns (email, None) on success or (None, error detail)
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+        if not authorization:
+            return None, "Authorization header missing"
+
+        try:
+            # Extract and validate the Bearer token
+            scheme, token = authorization.split()
+            if scheme.lower() != "bearer":
+                return None, "Invalid authentication scheme"
+
+            # Decode the JWT token, reusing earlier verifications of it
+            payload = decode_access_token_cached(token)
+        except (JWTError, ValueError):
+            return None, "Invalid token"
+        if payload is None:
+            return None, "Invalid token"
+
+        email = payload.get("email")
+        if not email:
+            return None, "Token does not contain an email"
+        return email, None
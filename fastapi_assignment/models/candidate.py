@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, Field, create_model
+from typing import Dict, List, Optional, Tuple, Type
 
 
 class CandidateCreate(BaseModel):
@@ -18,3 +20,62 @@ class CandidateUpdate(BaseModel):
 
 class CandidateInDB(CandidateCreate):
     id: str
+    # Bumped on every write; documents created before versioning read as 0
+    version: int = 0
+
+
+# Never read back from the database by the candidate read endpoints
+SECRET_CANDIDATE_FIELDS = frozenset({"verification_token"})
+# Stored alongside candidates for lookups only, never part of a response
+INTERNAL_CANDIDATE_FIELDS = frozenset({"name_prefixes", "email_prefixes"})
+PUBLIC_CANDIDATE_FIELDS = tuple(
+    name for name in CandidateInDB.model_fields if name not in SECRET_CANDIDATE_FIELDS
+)
+
+
+@lru_cache(maxsize=None)
+def candidate_fields_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    # Response model trimmed to a sparse fieldset; one class per distinct set
+    return create_model(
+        "CandidateFields",
+        **{
+            name: (
+                CandidateInDB.model_fields[name].annotation,
+                CandidateInDB.model_fields[name],
+            )
+            for name in fields
+        },
+    )
+
+
+class CandidateSuggestion(BaseModel):
+    id: str
+    name: str
+    email: str
+
+
+class CandidatePage(BaseModel):
+    items: List[CandidateInDB]
+    next_cursor: Optional[str] = None
+
+
+class BulkCandidateResult(BaseModel):
+    index: int
+    email: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkCandidateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkCandidateResult]
+
+
+class CandidateStats(BaseModel):
+    total: int
+    verified: int
+    verified_ratio: float
+    # Candidate counts keyed by experience bucket label, e.g. "1-2", "10+"
+    experience: Dict[str, int]
+    reconciled_at: Optional[datetime] = None
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi_assignment import config
+from fastapi_assignment.utils.slow_queries import slow_query_log
+
+router = APIRouter(prefix="/admin")
+
+
+def require_admin(request: Request):
+    # The request middleware has already authenticated the caller
+    if request.state.email not in config.ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+@router.get(
+    "/slow-queries",
+    summary="Slow MongoDB Queries",
+    description="Recent MongoDB commands slower than SLOW_QUERY_THRESHOLD_MS "
+    "on this worker, newest first, with the explain plan summary captured "
+    "for each slow query shape. Literal values are replaced by '?'.",
+)
+async def slow_queries(request: Request):
+    require_admin(request)
+    return slow_query_log.report()
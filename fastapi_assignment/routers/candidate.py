@@ -1,28 +1,179 @@
-import secrets
-from typing import List, Optional
+import hashlib
+from collections import Counter
+import json
+from typing import List, Optional, Tuple, Union
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from fastapi_assignment.models.candidate import (
+    BulkCandidateResponse,
+    BulkCandidateResult,
     CandidateCreate,
     CandidateInDB,
+    CandidatePage,
+    CandidateStats,
+    CandidateSuggestion,
     CandidateUpdate,
 )
-from fastapi_assignment.utils.dependencies import get_database
-from fastapi_assignment.tasks import send_verification_email_task
+from fastapi_assignment.utils.dataset_version import (
+    bump_dataset_version,
+    get_dataset_version,
+)
+from fastapi_assignment.utils.cache import TieredCache
+from fastapi_assignment.utils.candidate_stats import (
+    apply_stats_delta,
+    candidate_delta,
+    change_delta,
+    get_candidate_stats,
+)
+from fastapi_assignment.utils.dependencies import (
+    get_candidate_cache,
+    get_candidate_list_cache,
+    get_database,
+)
+from fastapi_assignment.utils.etag import (
+    candidate_etag,
+    etag_matches,
+    list_etag,
+    versions_from_if_match,
+)
+from fastapi_assignment.utils.export import (
+    EXPORT_PROJECTION,
+    MEDIA_TYPES,
+    stream_export,
+)
+from fastapi_assignment.utils.fieldsets import (
+    build_projection,
+    parse_fields,
+    trim_candidate,
+)
+from fastapi_assignment.utils.outbox import discard_tasks, enqueue_tasks, outbox_entry
+from fastapi_assignment.utils.pagination import decode_cursor, encode_cursor
+from fastapi_assignment.utils.serialization import candidate_document
+from fastapi_assignment.utils.suggest import prefix_fields, suggest_query
+from fastapi_assignment.utils.verification_tokens import (
+    consume_verification_token,
+    discard_verification_tokens,
+    new_verification_token,
+    store_verification_tokens,
+)
+from fastapi_assignment.tasks import (
+    send_verification_email_task,
+    send_verification_emails_task,
+)
 from fastapi_assignment import config
 
+DUPLICATE_EMAIL_DETAIL = "A candidate with this email already exists."
+FIELDS_DESCRIPTION = (
+    "Comma-separated fields to return, e.g. `name,email`; `id` and `version` "
+    "are always included"
+)
+
+
+def build_verification_link(verification_token: str) -> str:
+    # Generate backend verification link
+    return f"{config.BACKEND_URL}/verify-email?token={verification_token}"
+
+
+def new_candidate_document(candidate: CandidateCreate) -> dict:
+    # Verification tokens live in their own collection, not on the candidate
+    candidate_data = candidate.model_dump(exclude={"verification_token"})
+    candidate_data["_id"] = ObjectId()
+    candidate_data["is_verified"] = False
+    candidate_data["version"] = 1
+    candidate_data.update(prefix_fields(candidate_data))
+    return candidate_data
+
 
 class CandidateController:
-    def __init__(self, db: AsyncIOMotorClient):
+    def __init__(
+        self,
+        db: AsyncIOMotorClient,
+        cache: Optional[TieredCache] = None,
+        list_cache: Optional[TieredCache] = None,
+    ):
+        self.db = db
         self.collection = db["candidates"]
+        self.cache = cache
+        self.list_cache = list_cache
+
+    async def _in_transaction(self, callback):
+        # Runs callback(session) atomically when transactions are enabled
+        if not config.OUTBOX_TRANSACTIONS:
+            return await callback()
+        async with await self.db.client.start_session() as session:
+            return await session.with_transaction(callback)
+
+    async def _after_write(self, *ids: str, stats: Optional[Counter] = None):
+        # Keep derived state (dataset version, cached documents, materialized
+        # stats) in step
+        await bump_dataset_version(self.db)
+        if stats:
+            await apply_stats_delta(self.db, stats)
+        if self.cache:
+            for id in ids:
+                await self.cache.invalidate(id)
+
+    async def list_key(
+        self,
+        search: Optional[str] = None,
+        page: int = 1,
+        size: int = 10,
+        cursor: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> str:
+        # Keys embed the dataset version, so any write changes every list
+        # key at once (used for both the list cache and list ETags)
+        generation = await get_dataset_version(self.db)
+        params = {
+            # $text matching is case-insensitive and ignores extra spaces
+            "search": " ".join(search.lower().split()) if search else None,
+            "page": page if cursor is None else None,
+            "size": size,
+            "cursor": cursor,
+            "fields": fields,
+        }
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode())
+        return f"{generation}:{digest.hexdigest()}"
+
+    async def _cached_list(self, list_key: Optional[str], params: dict, loader):
+        if not self.list_cache:
+            return await loader()
+        # Stale keys are never read again after a write and simply expire
+        key = list_key or await self.list_key(**params)
+        return await self.list_cache.get(key, loader)
 
     async def get_all_candidates(
         self,
         search: Optional[str] = None,
         page: int = 1,
         size: int = 10,
-    ) -> List[CandidateInDB]:
+        list_key: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[dict]:
+        return await self._cached_list(
+            list_key,
+            {"search": search, "page": page, "size": size, "fields": fields},
+            lambda: self._find_candidates(search, page, size, fields),
+        )
+
+    def _serialize_candidate(
+        self, candidate: dict, fields: Optional[Tuple[str, ...]]
+    ) -> dict:
+        if fields is not None:
+            return trim_candidate(candidate, fields)
+        return candidate_document(candidate)
+
+    async def _find_candidates(
+        self,
+        search: Optional[str],
+        page: int,
+        size: int,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[dict]:
         query = {}
         if search:
             query = {
@@ -30,66 +181,344 @@ class CandidateController:
             }  # Assumes MongoDB text index is set up
 
         skip = (page - 1) * size
-        cursor = self.collection.find(query).skip(skip).limit(size)
+        cursor = (
+            self.collection.find(query, build_projection(fields)).skip(skip).limit(size)
+        )
         candidates = await cursor.to_list(size)
 
         return [
-            CandidateInDB(id=str(candidate["_id"]), **candidate)
-            for candidate in candidates
+            self._serialize_candidate(candidate, fields) for candidate in candidates
         ]
 
-    async def create_candidate(self, candidate: CandidateCreate) -> CandidateInDB:
-        # Check if a candidate with the same email already exists
-        existing_candidate = await self.collection.find_one({"email": candidate.email})
-        if existing_candidate:
-            raise HTTPException(
-                status_code=400, detail="A candidate with this email already exists."
-            )
+    async def get_candidates_page(
+        self,
+        search: Optional[str] = None,
+        size: int = 10,
+        cursor: Optional[str] = None,
+        list_key: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> dict:
+        return await self._cached_list(
+            list_key,
+            {"search": search, "size": size, "cursor": cursor, "fields": fields},
+            lambda: self._find_candidates_page(search, size, cursor, fields),
+        )
 
-        # Generate a verification token
-        verification_token = secrets.token_urlsafe(32)
-        candidate_data = candidate.model_dump()
-        candidate_data["is_verified"] = False
-        candidate_data["verification_token"] = verification_token
+    async def _find_candidates_page(
+        self,
+        search: Optional[str],
+        size: int,
+        cursor: Optional[str],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> dict:
+        query = {}
+        if search:
+            query["$text"] = {"$search": search}
+        if cursor:
+            # Keyset pagination: seek past the last _id instead of skipping
+            query["_id"] = {"$gt": decode_cursor(cursor)}
+
+        # Fetch one extra document to know whether another page exists
+        db_cursor = (
+            self.collection.find(query, build_projection(fields))
+            .sort("_id", 1)
+            .limit(size + 1)
+        )
+        candidates = await db_cursor.to_list(size + 1)
+
+        next_cursor = None
+        if len(candidates) > size:
+            candidates = candidates[:size]
+            next_cursor = encode_cursor(candidates[-1]["_id"])
+
+        return {
+            "items": [
+                self._serialize_candidate(candidate, fields) for candidate in candidates
+            ],
+            "next_cursor": next_cursor,
+        }
 
-        # Insert the new candidate into the database
-        result = await self.collection.insert_one(candidate_data)
+    def export_candidates(self, fmt: str, compress: bool = False):
+        cursor = self.collection.find(
+            {}, EXPORT_PROJECTION, batch_size=config.EXPORT_BATCH_SIZE
+        )
+        return stream_export(cursor, fmt, config.EXPORT_BATCH_SIZE, compress)
 
-        # Generate backend verification link
-        backend_url = config.BACKEND_URL
-        verification_link = f"{backend_url}/verify-email?token={verification_token}"
+    async def create_candidate(self, candidate: CandidateCreate) -> CandidateInDB:
+        candidate_data = new_candidate_document(candidate)
+        token = new_verification_token(candidate_data["_id"])
+
+        verification_link = build_verification_link(token["_id"])
+        # The email task is written to the outbox and published by the
+        # relay, so the request never waits on the broker
+        email_task = outbox_entry(
+            send_verification_email_task.name,
+            [candidate.email, verification_link],
+            candidate_ids=[candidate_data["_id"]],
+        )
 
-        # Offload email-sending to Celery for asynchronous handling
-        send_verification_email_task.delay(candidate.email, verification_link)
+        async def insert(session=None):
+            # Token and email go first, keyed to the candidate's _id: without
+            # a transaction a failure after them leaves an entry the relay
+            # drops, where the other order could lose the email
+            await store_verification_tokens(self.db, [token], session=session)
+            await enqueue_tasks(self.db, [email_task], session=session)
+            return await self.collection.insert_one(candidate_data, session=session)
+
+        # Insert the new candidate; the unique email index rejects duplicates
+        # atomically, so no racy find_one pre-check is needed
+        try:
+            result = await self._in_transaction(insert)
+        except DuplicateKeyError:
+            await discard_verification_tokens(self.db, [token])
+            await discard_tasks(self.db, [email_task])
+            raise HTTPException(status_code=400, detail=DUPLICATE_EMAIL_DETAIL)
+        await self._after_write(stats=candidate_delta(candidate_data))
 
         return CandidateInDB(id=str(result.inserted_id), **candidate_data)
 
-    async def get_candidate(self, id: str) -> CandidateInDB:
-        candidate = await self.collection.find_one({"_id": ObjectId(id)})
+    async def create_candidates_bulk(
+        self, candidates: List[CandidateCreate]
+    ) -> BulkCandidateResponse:
+        results = [
+            BulkCandidateResult(index=index, email=candidate.email)
+            for index, candidate in enumerate(candidates)
+        ]
+
+        # Dedupe against the database with a single query
+        emails = list({candidate.email for candidate in candidates})
+        existing = await self.collection.find(
+            {"email": {"$in": emails}}, {"email": 1, "_id": 0}
+        ).to_list(None)
+        seen = {doc["email"] for doc in existing}
+
+        documents, positions, tokens = [], [], []
+        for index, candidate in enumerate(candidates):
+            if candidate.email in seen:
+                results[index].error = DUPLICATE_EMAIL_DETAIL
+                continue
+            seen.add(candidate.email)
+            document = new_candidate_document(candidate)
+            documents.append(document)
+            positions.append(index)
+            tokens.append(new_verification_token(document["_id"]))
+
+        # Same order as a single create: tokens and email chunks are written
+        # before the candidates they name. No transaction even when enabled,
+        # since one rejected document would abort the whole batch
+        email_tasks = self._verification_email_tasks(documents, tokens)
+        await store_verification_tokens(self.db, tokens)
+        await enqueue_tasks(self.db, email_tasks)
+
+        failed_positions = set()
+        if documents:
+            # Unordered so one rejected document does not abort the rest
+            try:
+                await self.collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed_positions.add(write_error["index"])
+                    results[positions[write_error["index"]]].error = (
+                        DUPLICATE_EMAIL_DETAIL
+                        if write_error.get("code") == 11000
+                        else write_error.get("errmsg", "Insert failed")
+                    )
+
+        if failed_positions:
+            # Rewrite the chunks without the rejected candidates, rather than
+            # have their entries wait out the relay's orphan grace period
+            await discard_verification_tokens(
+                self.db, [tokens[position] for position in failed_positions]
+            )
+            await discard_tasks(self.db, email_tasks)
+            kept = [
+                position
+                for position in range(len(documents))
+                if position not in failed_positions
+            ]
+            await enqueue_tasks(
+                self.db,
+                self._verification_email_tasks(
+                    [documents[position] for position in kept],
+                    [tokens[position] for position in kept],
+                ),
+            )
+
+        created, stats = 0, Counter()
+        for position, document in enumerate(documents):
+            if position in failed_positions:
+                continue
+            created += 1
+            results[positions[position]].id = str(document["_id"])
+            stats.update(candidate_delta(document))
+
+        if created:
+            await self._after_write(stats=stats)
+
+        return BulkCandidateResponse(
+            created=created,
+            failed=len(candidates) - created,
+            results=results,
+        )
+
+    def _verification_email_tasks(
+        self, documents: List[dict], tokens: List[dict]
+    ) -> List[dict]:
+        # One outbox entry (and broker message) per chunk, not per candidate
+        batch_size = config.VERIFICATION_EMAIL_BATCH_SIZE
+        pairs = list(zip(documents, tokens))
+        email_tasks = []
+        for start in range(0, len(pairs), batch_size):
+            end = start + batch_size
+            chunk = pairs[start:end]
+            email_tasks.append(
+                outbox_entry(
+                    send_verification_emails_task.name,
+                    [
+                        [
+                            [document["email"], build_verification_link(token["_id"])]
+                            for document, token in chunk
+                        ]
+                    ],
+                    candidate_ids=[document["_id"] for document, _ in chunk],
+                    batch=True,
+                )
+            )
+        return email_tasks
+
+    async def _load_candidate(self, id: str) -> Optional[dict]:
+        candidate = await self.collection.find_one(
+            {"_id": ObjectId(id)}, build_projection(None)
+        )
+        if candidate is None:
+            return None
+        return candidate_document(candidate)
+
+    async def get_candidate_fields(self, id: str, fields: Tuple[str, ...]) -> dict:
+        # Serve from an already cached document, else project in MongoDB;
+        # partial documents are never written to the cache
+        candidate = await self.cache.peek(id) if self.cache else None
+        if candidate is None:
+            candidate = await self.collection.find_one(
+                {"_id": ObjectId(id)}, build_projection(fields)
+            )
         if candidate is None:
             raise HTTPException(status_code=404, detail="Candidate not found")
-        return CandidateInDB(id=str(candidate["_id"]), **candidate)
+        return trim_candidate(candidate, fields)
+
+    async def get_candidate(self, id: str) -> dict:
+        if self.cache:
+            candidate = await self.cache.get(id, lambda: self._load_candidate(id))
+        else:
+            candidate = await self._load_candidate(id)
+        if candidate is None:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        return candidate
+
+    async def get_candidate_version(self, id: str) -> Optional[int]:
+        # Answers conditional GETs without fetching the full document
+        if self.cache:
+            cached = await self.cache.peek(id)
+            if cached is not None:
+                return cached.get("version", 0)
+        candidate = await self.collection.find_one(
+            {"_id": ObjectId(id)}, {"version": 1}
+        )
+        if candidate is None:
+            return None
+        return candidate.get("version", 0)
 
     async def update_candidate(
-        self, id: str, candidate_update: CandidateUpdate
+        self,
+        id: str,
+        candidate_update: CandidateUpdate,
+        expected_versions: Optional[List[int]] = None,
     ) -> CandidateInDB:
         update_data = {
             k: v for k, v in candidate_update.model_dump().items() if v is not None
         }
-        result = await self.collection.update_one(
-            {"_id": ObjectId(id)}, {"$set": update_data}
-        )
-        if result.matched_count == 0:
+        query = {"_id": ObjectId(id)}
+        if expected_versions is not None:
+            # Optimistic concurrency: only overwrite the version the client
+            # saw (documents from before versioning have no version field)
+            if 0 in expected_versions:
+                expected_versions = expected_versions + [None]
+            query["version"] = {"$in": expected_versions}
+        update = {"$inc": {"version": 1}}
+        if update_data:
+            # Prefix keys change in the same atomic write as name/email
+            update["$set"] = {**update_data, **prefix_fields(update_data)}
+        # One round trip: the previous state tells the stats which buckets to
+        # move between, and the updated document is derived from it
+        try:
+            before = await self.collection.find_one_and_update(
+                query,
+                update,
+                projection=build_projection(None),
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail=DUPLICATE_EMAIL_DETAIL)
+        if before is None:
+            if expected_versions is not None and await self.collection.find_one(
+                {"_id": ObjectId(id)}, {"_id": 1}
+            ):
+                raise HTTPException(
+                    status_code=412,
+                    detail="Candidate was modified by another request",
+                )
             raise HTTPException(status_code=404, detail="Candidate not found")
-        candidate = await self.collection.find_one({"_id": ObjectId(id)})
+        candidate = {**before, **update_data, "version": before.get("version", 0) + 1}
+        await self._after_write(id, stats=change_delta(before, candidate))
         return CandidateInDB(id=str(candidate["_id"]), **candidate)
 
     async def delete_candidate(self, id: str) -> dict:
-        result = await self.collection.delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
+        candidate = await self.collection.find_one_and_delete(
+            {"_id": ObjectId(id)}, projection={"experience": 1, "is_verified": 1}
+        )
+        if candidate is None:
             raise HTTPException(status_code=404, detail="Candidate not found")
+        await self._after_write(id, stats=candidate_delta(candidate, -1))
         return {"message": "Candidate deleted successfully"}
 
+    async def suggest(self, q: str, limit: int) -> List[dict]:
+        # Equality match on a multikey prefix index, already sorted by name
+        cursor = (
+            self.collection.find(suggest_query(q), {"name": 1, "email": 1})
+            .sort("name", 1)
+            .limit(limit)
+        )
+        return [
+            {"id": str(doc["_id"]), "name": doc["name"], "email": doc["email"]}
+            for doc in await cursor.to_list(limit)
+        ]
+
+    async def get_stats(self) -> dict:
+        return await get_candidate_stats(self.db)
+
+    async def verify_email(self, token: str) -> dict:
+        # Tokens are single use: consuming one is an atomic delete by _id
+        candidate_id = await consume_verification_token(self.db, token)
+        if candidate_id is not None:
+            query = {"_id": candidate_id}
+        else:
+            # Candidates created before the token collection carry the token
+            query = {"verification_token": token}
+        candidate = await self.collection.find_one_and_update(
+            {**query, "is_verified": False},
+            {
+                "$set": {"is_verified": True},
+                "$unset": {"verification_token": ""},
+                "$inc": {"version": 1},
+            },
+            projection={"_id": 1},
+        )
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Invalid or expired token")
+        await self._after_write(str(candidate["_id"]), stats=Counter(verified=1))
+
+        return {"message": "Email successfully verified"}
+
 
 # Create APIRouter instance
 router = APIRouter()
@@ -98,25 +527,52 @@ router = APIRouter()
 # Dependency to initialize the controller
 async def get_controller(
     db: AsyncIOMotorClient = Depends(get_database),
+    cache: Optional[TieredCache] = Depends(get_candidate_cache),
+    list_cache: Optional[TieredCache] = Depends(get_candidate_list_cache),
 ) -> CandidateController:
-    return CandidateController(db)
+    return CandidateController(db, cache, list_cache)
 
 
 @router.get(
     "/all-candidates",
-    response_model=List[CandidateInDB],
+    response_model=Union[List[CandidateInDB], CandidatePage],
     summary="List All Candidates",
     description="Retrieve a paginated list of all candidates in the database, "
-    "with optional search functionality across candidate fields. Only "
-    "accessible to authenticated users.",
+    "with optional search functionality across candidate fields. Passing "
+    "`cursor` (empty for the first page) switches to keyset pagination and "
+    "returns the page together with a `next_cursor`; otherwise `page` and "
+    "`size` are used. `fields` limits each candidate to a sparse fieldset. "
+    "Responses carry an ETag and honour If-None-Match. Only accessible to "
+    "authenticated users.",
 )
 async def get_all_candidates(
     search: Optional[str] = Query(None, min_length=3, description="Search term"),
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor returned as `next_cursor`"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     controller: CandidateController = Depends(get_controller),
 ):
-    return await controller.get_all_candidates(search=search, page=page, size=size)
+    fieldset = parse_fields(fields)
+    list_key = await controller.list_key(search, page, size, cursor, fieldset)
+    etag = list_etag(list_key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if cursor is not None:
+        result = await controller.get_candidates_page(
+            search=search, size=size, cursor=cursor, list_key=list_key, fields=fieldset
+        )
+    else:
+        result = await controller.get_all_candidates(
+            search=search, page=page, size=size, list_key=list_key, fields=fieldset
+        )
+    # Already JSON-ready; skip response_model revalidation (it still
+    # documents the schema) and encode with orjson
+    return ORJSONResponse(result, headers={"ETag": etag})
 
 
 @router.post(
@@ -134,17 +590,115 @@ async def create_candidate(
     return await controller.create_candidate(candidate)
 
 
+@router.post(
+    "/candidates/bulk",
+    response_model=BulkCandidateResponse,
+    summary="Create Candidates in Bulk",
+    description="Create many candidate profiles in one request. Emails that "
+    "already exist (or repeat within the request) are reported per item "
+    "instead of failing the whole batch, and verification emails are queued "
+    "in chunks. Only accessible to authenticated users.",
+)
+async def create_candidates_bulk(
+    candidates: List[CandidateCreate],
+    controller: CandidateController = Depends(get_controller),
+):
+    if not candidates:
+        raise HTTPException(status_code=400, detail="No candidates provided")
+    if len(candidates) > config.BULK_CREATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {config.BULK_CREATE_MAX_ITEMS} candidates per request",
+        )
+    return await controller.create_candidates_bulk(candidates)
+
+
+@router.get(
+    "/candidates/suggest",
+    response_model=List[CandidateSuggestion],
+    summary="Suggest Candidates",
+    description="As-you-type suggestions: candidates whose name (any word) or "
+    "email starts with `q`, case-insensitively, sorted by name. Requires "
+    "authentication.",
+)
+async def suggest_candidates(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=config.SUGGEST_MAX_RESULTS),
+    controller: CandidateController = Depends(get_controller),
+):
+    if not q.strip():
+        return ORJSONResponse([])
+    return ORJSONResponse(await controller.suggest(q, limit))
+
+
+@router.get(
+    "/candidates/stats",
+    response_model=CandidateStats,
+    summary="Candidate Statistics",
+    description="Total candidates, verified ratio and an experience histogram, "
+    "read from a materialized stats document kept up to date on every write. "
+    "Requires authentication.",
+)
+async def get_candidate_stats_endpoint(
+    controller: CandidateController = Depends(get_controller),
+):
+    return await controller.get_stats()
+
+
+@router.get(
+    "/candidates/export",
+    summary="Export Candidates",
+    description="Stream every candidate as NDJSON or CSV straight from the "
+    "database cursor, optionally gzip-compressed. Only accessible to "
+    "authenticated users.",
+    response_class=StreamingResponse,
+)
+async def export_candidates(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(False, alias="gzip", description="Gzip the stream"),
+    controller: CandidateController = Depends(get_controller),
+):
+    filename = f"candidates.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        controller.export_candidates(fmt, compress),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
+
+
 @router.get(
     "/candidate/{id}",
     response_model=CandidateInDB,
     summary="Get Candidate by ID",
-    description="Retrieve a candidate's information by their unique ID. Only "
-    "accessible to authenticated users.",
+    description="Retrieve a candidate's information by their unique ID. "
+    "`fields` limits the response to a sparse fieldset. Responses carry an "
+    "ETag; a matching If-None-Match returns 304 without reading the document. "
+    "Only accessible to authenticated users.",
 )
 async def get_candidate(
-    id: str, controller: CandidateController = Depends(get_controller)
+    id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    controller: CandidateController = Depends(get_controller),
 ):
-    return await controller.get_candidate(id)
+    fieldset = parse_fields(fields)
+    if if_none_match:
+        version = await controller.get_candidate_version(id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        etag = candidate_etag(id, version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    if fieldset is not None:
+        candidate = await controller.get_candidate_fields(id, fieldset)
+    else:
+        candidate = await controller.get_candidate(id)
+    etag = candidate_etag(candidate["id"], candidate["version"])
+    return ORJSONResponse(candidate, headers={"ETag": etag})
 
 
 @router.put(
@@ -152,14 +706,23 @@ async def get_candidate(
     response_model=CandidateInDB,
     summary="Update Candidate by ID",
     description="Update an existing candidate's information by their ID. Only "
-    "specified fields will be updated. Requires authentication.",
+    "specified fields will be updated. Send the candidate's ETag in If-Match "
+    "to reject the update (412) if it changed meanwhile. Requires "
+    "authentication.",
 )
 async def update_candidate(
     id: str,
     candidate_update: CandidateUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     controller: CandidateController = Depends(get_controller),
 ):
-    return await controller.update_candidate(id, candidate_update)
+    expected_versions = versions_from_if_match(if_match, id) if if_match else None
+    candidate = await controller.update_candidate(
+        id, candidate_update, expected_versions
+    )
+    response.headers["ETag"] = candidate_etag(candidate.id, candidate.version)
+    return candidate
 
 
 @router.delete(
@@ -182,16 +745,4 @@ async def delete_candidate(
 async def verify_email(
     token: str, controller: CandidateController = Depends(get_controller)
 ):
-    candidate = await controller.collection.find_one(
-        {"verification_token": token, "is_verified": False}
-    )
-    if not candidate:
-        raise HTTPException(status_code=404, detail="Invalid or expired token")
-
-    # Update the candidate to set them as verified
-    await controller.collection.update_one(
-        {"_id": candidate["_id"]},
-        {"$set": {"is_verified": True, "verification_token": None}},
-    )
-
-    return {"message": "Email successfully verified"}
+    return await controller.verify_email(token)
@@ -1,8 +1,63 @@
-from fastapi import APIRouter
+import asyncio
+import time
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from fastapi_assignment import config
+from fastapi_assignment.utils.dependencies import (
+    candidate_cache,
+    candidate_list_cache,
+    get_broker_client,
+    get_database,
+    get_redis,
+    outbox_relay,
+)
+from fastapi_assignment.utils.indexes import missing_unique_indexes
+from fastapi_assignment.utils.jwt_utils import token_cache
+from fastapi_assignment.utils.runtime_stats import (
+    in_flight_requests,
+    loop_lag_monitor,
+    pool_stats,
+)
 
 router = APIRouter()
 
 
+async def timed_check(check) -> dict:
+    # Runs one dependency ping under the probe timeout
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(check, timeout=config.HEALTH_CHECK_TIMEOUT)
+        error = None
+    except asyncio.TimeoutError:
+        error = f"timed out after {config.HEALTH_CHECK_TIMEOUT}s"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    result = {
+        "ok": error is None,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+async def unique_indexes_check(db):
+    missing = await missing_unique_indexes(db)
+    if missing:
+        raise RuntimeError(f"missing {', '.join(missing)}")
+
+
+def saturation_failures(pool: dict, loop: dict, requests: dict) -> list:
+    failures = []
+    if pool["waiting"] > config.HEALTH_MAX_POOL_WAITING:
+        failures.append("mongodb_pool")
+    if loop["lag"] > config.HEALTH_MAX_LOOP_LAG:
+        failures.append("event_loop")
+    if requests["current"] > config.HEALTH_MAX_IN_FLIGHT:
+        failures.append("in_flight_requests")
+    return failures
+
+
 @router.get(
     "/health",
     summary="Health Check",
@@ -11,3 +66,72 @@ router = APIRouter()
 )
 async def health_check():
     return {"status": "healthy"}
+
+
+@router.get(
+    "/health/live",
+    summary="Liveness Probe",
+    description="Answers as long as the event loop is serving requests. Does "
+    "not touch MongoDB, Redis or the broker.",
+)
+async def liveness():
+    return {"status": "alive"}
+
+
+@router.get(
+    "/health/ready",
+    summary="Readiness Probe",
+    description="Pings MongoDB, Redis and the Celery broker with a strict "
+    "timeout, checks the unique indexes writes rely on, and reports "
+    "connection pool usage, event-loop lag and in-flight requests. Returns "
+    "503 when a dependency fails or a limit is exceeded.",
+)
+async def readiness(
+    db=Depends(get_database),
+    redis=Depends(get_redis),
+    broker=Depends(get_broker_client),
+):
+    mongodb, redis_check, broker_check, indexes = await asyncio.gather(
+        timed_check(db.command("ping")),
+        timed_check(redis.ping()),
+        timed_check(broker.ping()),
+        timed_check(unique_indexes_check(db)),
+    )
+    dependencies = {
+        "mongodb": mongodb,
+        "redis": redis_check,
+        "broker": broker_check,
+        "unique_indexes": indexes,
+    }
+    pool = pool_stats.stats()
+    loop = loop_lag_monitor.stats()
+    requests = in_flight_requests.stats()
+
+    failures = [name for name, check in dependencies.items() if not check["ok"]]
+    failures += saturation_failures(pool, loop, requests)
+    return JSONResponse(
+        status_code=503 if failures else 200,
+        content={
+            "status": "not_ready" if failures else "ready",
+            "failures": failures,
+            "dependencies": dependencies,
+            "mongodb_pool": pool,
+            "event_loop": loop,
+            "in_flight_requests": requests,
+            "outbox_relay": outbox_relay.stats(),
+        },
+    )
+
+
+@router.get(
+    "/health/cache",
+    summary="Cache Statistics",
+    description="Hit ratios, sizes and staleness of the in-process and Redis "
+    "caches used by this worker.",
+)
+async def cache_stats():
+    return {
+        "candidate": candidate_cache.stats(),
+        "candidate_list": candidate_list_cache.stats(),
+        "token": token_cache.stats(),
+    }
@@ -0,0 +1,139 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from fastapi_assignment.utils.dependencies import (
+    candidate_cache,
+    candidate_list_cache,
+    outbox_relay,
+)
+from fastapi_assignment.utils.jwt_utils import token_cache
+from fastapi_assignment.utils.metrics import StatsCollector, counter_collector
+from fastapi_assignment.utils.password_hashing import password_hasher
+from fastapi_assignment.utils.runtime_stats import (
+    in_flight_requests,
+    loop_lag_monitor,
+    pool_stats,
+)
+
+router = APIRouter()
+
+TIERED_CACHES = {"candidate": candidate_cache, "candidate_list": candidate_list_cache}
+
+
+def cache_entries():
+    for name, cache in TIERED_CACHES.items():
+        yield (name,), len(cache.local)
+    yield ("token",), len(token_cache)
+
+
+def cache_lookups():
+    for name, cache in TIERED_CACHES.items():
+        yield (name, "local", "hit"), cache.local.hits
+        yield (name, "local", "miss"), cache.local.misses
+        yield (name, "redis", "hit"), cache.redis_hits
+        yield (name, "redis", "miss"), cache.redis_misses
+    yield ("token", "local", "hit"), token_cache.hits
+    yield ("token", "local", "miss"), token_cache.misses
+
+
+def pool_connections():
+    yield ("open",), pool_stats.open
+    yield ("checked_out",), pool_stats.checked_out
+    yield ("waiting",), pool_stats.waiting
+
+
+def requests_in_flight():
+    yield (), in_flight_requests.current
+
+
+def event_loop_lag():
+    yield (), loop_lag_monitor.lag
+
+
+def outbox_publishes():
+    yield ("published",), outbox_relay.published
+    yield ("failed",), outbox_relay.failed
+    yield ("orphaned",), outbox_relay.orphaned
+
+
+def password_hash_pending():
+    yield (), password_hasher.stats()["pending"]
+
+
+def password_hash_jobs():
+    stats = password_hasher.stats()
+    yield ("completed",), stats["completed"]
+    yield ("rejected",), stats["rejected"]
+
+
+def password_hash_seconds():
+    stats = password_hasher.stats()
+    yield ("queued",), stats["queued_seconds_total"]
+    yield ("hashing",), stats["hash_seconds_total"]
+
+
+for collector in (
+    StatsCollector(
+        "cache_entries", "Entries in the in-process caches.", ("cache",), cache_entries
+    ),
+    counter_collector(
+        "cache_lookups",
+        "Cache lookups by cache, tier and result.",
+        ("cache", "tier", "result"),
+        cache_lookups,
+    ),
+    StatsCollector(
+        "mongodb_pool_connections",
+        "MongoDB connections by pool state.",
+        ("state",),
+        pool_connections,
+    ),
+    StatsCollector(
+        "http_requests_in_flight",
+        "Requests being handled by this worker.",
+        (),
+        requests_in_flight,
+    ),
+    StatsCollector(
+        "event_loop_lag_seconds",
+        "Latest event-loop lag sample.",
+        (),
+        event_loop_lag,
+    ),
+    counter_collector(
+        "outbox_publishes",
+        "Outbox entries handed to Celery, by outcome.",
+        ("outcome",),
+        outbox_publishes,
+    ),
+    StatsCollector(
+        "password_hash_pending",
+        "Password hash and verify jobs running or queued.",
+        (),
+        password_hash_pending,
+    ),
+    counter_collector(
+        "password_hash_jobs",
+        "Password hash and verify jobs, by outcome (rejected when the queue "
+        "is full).",
+        ("outcome",),
+        password_hash_jobs,
+    ),
+    counter_collector(
+        "password_hash_seconds",
+        "Time password jobs spent queued for and running on the hash pool.",
+        ("phase",),
+        password_hash_seconds,
+    ),
+):
+    REGISTRY.register(collector)
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    description="Request, MongoDB, Celery, cache and pool metrics of this "
+    "worker in the Prometheus text format.",
+    include_in_schema=False,
+)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
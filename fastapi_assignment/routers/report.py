@@ -1,12 +1,37 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from redis.asyncio import Redis
 from fastapi_assignment.tasks import generate_and_send_report_task
+from fastapi_assignment.utils.dependencies import get_database, get_redis
+from fastapi_assignment.utils.outbox import enqueue_tasks, outbox_entry
+from fastapi_assignment.utils.report_queue import (
+    enqueue_report_request,
+    release_job_lock,
+)
 
 router = APIRouter()
 
 
 @router.get("/send-report")
-async def send_report(request: Request):
+async def send_report(
+    request: Request,
+    redis: Redis = Depends(get_redis),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+):
     # Retrieve the email from the request state set by the JWT middleware
     email = request.state.email
-    generate_and_send_report_task.delay(email)
+    # Only the first request of a burst starts a job; the others join it
+    lock_token = await enqueue_report_request(redis, email)
+    if lock_token:
+        try:
+            # Published by the outbox relay, off the request path; the job
+            # owns the lock through its token
+            await enqueue_tasks(
+                db,
+                [outbox_entry(generate_and_send_report_task.name, [None, lock_token])],
+            )
+        except Exception:
+            # Let the next request start the job instead of waiting on the lock
+            await release_job_lock(redis, lock_token)
+            raise
     return {"message": "Report will be sent to your email once it is generated"}
@@ -1,10 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from motor.motor_asyncio import AsyncIOMotorClient
-from fastapi_assignment.utils.jwt_utils import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
-)
+from pymongo.errors import DuplicateKeyError
+from fastapi_assignment.utils.jwt_utils import create_access_token
+from fastapi_assignment.utils.password_hashing import password_hasher
 from fastapi_assignment.models.user import UserCreate, Token
 from fastapi_assignment.utils.dependencies import get_database
 
@@ -16,15 +14,19 @@ class UserService:
         self.collection = db["user"]
 
     async def register_user(self, user: UserCreate) -> dict:
-        # Check if user already exists
+        # Check if user already exists (cheaper than hashing for a duplicate;
+        # the unique index still settles concurrent registrations)
         existing_user = await self.collection.find_one({"email": user.email})
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
-        # Hash password and insert new user
-        hashed_password = get_password_hash(user.password)
+        # Hash password off the event loop and insert new user
+        hashed_password = await password_hasher.hash(user.password)
         user_data = {"email": user.email, "hashed_password": hashed_password}
-        result = await self.collection.insert_one(user_data)
+        try:
+            result = await self.collection.insert_one(user_data)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email already registered")
 
         # Create JWT token for the user
         data_for_token = {"id": str(result.inserted_id), "email": user.email}
@@ -33,7 +35,7 @@ class UserService:
 
     async def login_user(self, user: UserCreate) -> dict:
         db_user = await self.collection.find_one({"email": user.email})
-        if not db_user or not verify_password(
+        if not db_user or not await password_hasher.verify(
             user.password, db_user["hashed_password"]
         ):
             raise HTTPException(status_code=400, detail="Invalid credentials")
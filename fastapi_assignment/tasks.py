@@ -1,80 +1,276 @@
-import csv
 import os
-import gzip
-import shutil
-import asyncio
-from datetime import datetime
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+import aiosmtplib
 from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
 from fastapi_mail import FastMail, MessageSchema
 from fastapi_assignment.celery_config import celery
-from fastapi_assignment.utils.email_utils import send_report_email
+from fastapi_assignment.utils.candidate_stats import reconcile_candidate_stats
+from fastapi_assignment.utils.dataset_version import get_dataset_version
+from fastapi_assignment.utils.email_utils import (
+    SMTPConnectionPool,
+    build_verification_message,
+    send_report_email,
+)
+from fastapi_assignment.utils.export import (
+    COMPRESSION_CODECS,
+    CSV_HEADER,
+    EXPORT_PROJECTION,
+    candidate_row,
+    encode_csv_rows,
+    open_compressed,
+)
+from fastapi_assignment.utils.worker_resources import resources, run_async
+from fastapi_assignment.utils.report_queue import (
+    PENDING_RECIPIENTS_KEY,
+    drain_pending_recipients,
+    release_job_lock,
+    release_report_job,
+    requeue_recipients,
+)
 from fastapi_assignment import config
 
+logger = logging.getLogger(__name__)
+
+# Generated report files, keyed by dataset version and codec
+REPORT_ARTIFACTS_COLLECTION = "report_artifacts"
+
+# Retry policy for verification emails
+EMAIL_RETRY_KWARGS = {"max_retries": 3, "countdown": 60}
+
 
 class ReportGeneratorTask:
-    def __init__(self, recipient_email: str):
+    def __init__(
+        self,
+        recipient_email: Optional[str] = None,
+        db=None,
+        redis: Optional[Redis] = None,
+        lock_token: Optional[str] = None,
+        smtp_pool: Optional[SMTPConnectionPool] = None,
+    ):
         self.recipient_email = recipient_email
-        self.client = AsyncIOMotorClient(config.MONGO_URL)
-        self.db = self.client[config.DB_NAME]
-
-    async def generate_report(self):
-        timestamp = datetime.now(datetime.timezone.utc).strftime("%Y%m%d%H%M%S")
-        report_basename = f"candidate_report_{timestamp}"
-        csv_path = f"/tmp/reports/{report_basename}.csv"
-        compressed_csv_path = f"/tmp/reports/{report_basename}.csv.gz"
-        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-
-        with open(csv_path, mode="w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(["ID", "Name", "Email", "Experience", "Is Verified"])
-
-            async for candidate in self.db["candidates"].find(batch_size=1000):
-                writer.writerow(
-                    [
-                        str(candidate["_id"]),
-                        candidate.get("name", ""),
-                        candidate.get("email", ""),
-                        candidate.get("experience", 0),
-                        candidate.get("is_verified", False),
-                    ]
-                )
+        # Token of the report job lock taken by /send-report for this job
+        self.lock_token = lock_token
+        # Shared worker clients are passed in; standalone use opens its own
+        self.owns_clients = db is None
+        self.client = AsyncIOMotorClient(config.MONGO_URL) if db is None else None
+        self.db = self.client[config.DB_NAME] if db is None else db
+        self.redis = Redis.from_url(config.REDIS_URL) if redis is None else redis
+        self.owns_smtp_pool = smtp_pool is None
+        self.smtp_pool = SMTPConnectionPool() if smtp_pool is None else smtp_pool
+
+    async def close(self):
+        if self.owns_clients:
+            self.client.close()
+            await self.redis.close()
+        if self.owns_smtp_pool:
+            await self.smtp_pool.close()
+
+    async def generate_report(self) -> dict:
+        report = await self.get_or_create_report()
+        await self.send_report(report["path"])
+        await self.close()
+        return report
+
+    async def process_pending_requests(self):
+        # Serve every recipient queued by /send-report with one report per
+        # round; keep going while new requests arrive during a round
+        if self.recipient_email:
+            await self.redis.sadd(PENDING_RECIPIENTS_KEY, self.recipient_email)
+        recipients = []
+        try:
+            while True:
+                recipients = await drain_pending_recipients(self.redis)
+                if recipients:
+                    report = await self.get_or_create_report()
+                    errors = await self.send_report(report["path"], recipients)
+                    failed = []
+                    for recipient, error in zip(recipients, errors):
+                        if error:
+                            logger.error(
+                                f"Failed to send report to {recipient}: {error}"
+                            )
+                            failed.append(recipient)
+                    if failed:
+                        # The pool reports SMTP outages per message rather
+                        # than raising; requeue just the failed recipients
+                        # (below) and fail the task so Celery retries it
+                        recipients = failed
+                        raise aiosmtplib.SMTPException(
+                            f"Failed to send report to {len(failed)} of "
+                            f"{len(errors)} recipients"
+                        )
+                recipients = []
+                self.lock_token = await release_report_job(self.redis, self.lock_token)
+                if not self.lock_token:
+                    break
+        except Exception:
+            # Hand the round's recipients back and free the lock, so the
+            # retry (or the next /send-report) serves them instead of every
+            # request waiting out the lock TTL
+            await requeue_recipients(self.redis, recipients)
+            await release_job_lock(self.redis, self.lock_token)
+            raise
+        finally:
+            await self.close()
+
+    async def get_or_create_report(self) -> dict:
+        # Reports are keyed by the candidates dataset version, so a report is
+        # only regenerated after the data has actually changed
+        codec = config.REPORT_COMPRESSION_CODEC
+        version = await get_dataset_version(self.db)
+        artifacts = self.db[REPORT_ARTIFACTS_COLLECTION]
+        artifact_id = f"{version}:{codec}"
+
+        artifact = await artifacts.find_one({"_id": artifact_id})
+        if artifact and os.path.exists(artifact["path"]):
+            logger.info(f"Reusing report {artifact['path']} for version {version}")
+            return artifact
+
+        stats = await self.write_report()
+        artifact = {"_id": artifact_id, "version": version, "codec": codec, **stats}
+        await artifacts.replace_one({"_id": artifact_id}, artifact, upsert=True)
+
+        # Drop artifacts of older dataset versions
+        async for stale in artifacts.find({"version": {"$lt": version}}):
+            if os.path.exists(stale["path"]):
+                os.remove(stale["path"])
+        await artifacts.delete_many({"version": {"$lt": version}})
+        return artifact
+
+    async def write_report(self) -> dict:
+        codec = config.REPORT_COMPRESSION_CODEC
+        extension, _ = COMPRESSION_CODECS[codec]
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        report_path = os.path.join(
+            config.REPORT_DIR, f"candidate_report_{timestamp}.csv.{extension}"
+        )
+        os.makedirs(config.REPORT_DIR, exist_ok=True)
 
-        with open(csv_path, "rb") as f_in:
-            with gzip.open(compressed_csv_path, "wb") as f_out:
-                shutil.copyfileobj(f_in, f_out)
+        started = time.monotonic()
+        rows = 0
+        batch_size = config.REPORT_BATCH_SIZE
 
-        await self.send_report(compressed_csv_path)
-        self.client.close()
-        os.remove(csv_path)
+        # Rows are encoded a batch at a time and written straight into the
+        # compressed stream, so no uncompressed copy ever touches the disk
+        with open_compressed(
+            report_path, codec, config.REPORT_COMPRESSION_LEVEL
+        ) as file:
+            file.write(encode_csv_rows([CSV_HEADER]).encode())
 
-    async def send_report(self, compressed_csv_path: str):
+            batch = []
+            async for candidate in self.db["candidates"].find(
+                {}, EXPORT_PROJECTION, batch_size=batch_size
+            ):
+                batch.append(candidate_row(candidate))
+                if len(batch) >= batch_size:
+                    file.write(encode_csv_rows(batch).encode())
+                    rows += len(batch)
+                    batch = []
+
+            if batch:
+                file.write(encode_csv_rows(batch).encode())
+                rows += len(batch)
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        stats = {
+            "path": report_path,
+            "rows": rows,
+            "bytes_written": os.path.getsize(report_path),
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed,
+        }
+        logger.info(
+            f"Generated report {report_path}: {rows} rows in {elapsed:.2f}s "
+            f"({stats['rows_per_second']:.0f} rows/s), "
+            f"{stats['bytes_written']} bytes written"
+        )
+        return stats
+
+    async def send_report(
+        self, compressed_csv_path: str, recipients: Optional[list[str]] = None
+    ) -> list[Optional[str]]:
+        # All recipients share the pool's SMTP sessions; returns one error
+        # (or None) per recipient
         subject = "Your Compressed Candidate Report"
         body = (
             "<p>Hello,</p><p>Attached is your candidate report in "
             "compressed format.</p>"
         )
-        await send_report_email(
-            [self.recipient_email], subject, body, compressed_csv_path
+        return await send_report_email(
+            self.smtp_pool,
+            recipients or [self.recipient_email],
+            subject,
+            body,
+            compressed_csv_path,
         )
 
 
 @celery.task(
     name="generate_and_send_report",
-    auto_retry_for=(Exception,),
+    autoretry_for=(Exception,),
     retry_kwargs={"max_retries": 3, "countdown": 60},
 )
-def generate_and_send_report_task(recipient_email: str):
-    task = ReportGeneratorTask(recipient_email)
-    asyncio.run(task.generate_report())
+def generate_and_send_report_task(
+    recipient_email: Optional[str] = None, lock_token: Optional[str] = None
+):
+    task = ReportGeneratorTask(
+        recipient_email,
+        db=resources.db,
+        redis=resources.redis,
+        lock_token=lock_token,
+        smtp_pool=resources.smtp_pool,
+    )
+    run_async(task.process_pending_requests())
+
+
+@celery.task(name="reconcile_candidate_stats")
+def reconcile_candidate_stats_task():
+    # Corrects drift in the incrementally maintained stats document
+    result = run_async(reconcile_candidate_stats(resources.db))
+    if result["drift"]:
+        logger.warning(f"Corrected candidate stats drift: {result['drift']}")
+    return result["drift"]
 
 
 class VerificationEmailTask:
-    def __init__(self, recipient_email: str, verification_link: str):
+    def __init__(
+        self,
+        recipient_email: str,
+        verification_link: str,
+        fm: Optional[FastMail] = None,
+        smtp_pool: Optional[SMTPConnectionPool] = None,
+    ):
         self.recipient_email = recipient_email
         self.verification_link = verification_link
-        self.fm = FastMail(config.MAIL_CONFIG)
+        self.smtp_pool = smtp_pool
+        # Only the unpooled path needs its own client
+        if fm is None and smtp_pool is None:
+            fm = FastMail(config.MAIL_CONFIG)
+        self.fm = fm
 
     async def send_email(self):
+        if self.smtp_pool:
+            # Reuse a pooled SMTP session instead of a fresh handshake
+            [error] = await self.smtp_pool.send_messages(
+                [
+                    build_verification_message(
+                        self.recipient_email, self.verification_link
+                    )
+                ]
+            )
+            if error:
+                # Raised so the task's autoretry sends it again
+                raise aiosmtplib.SMTPException(
+                    f"Failed to send verification email to "
+                    f"{self.recipient_email}: {error}"
+                )
+            logger.info(f"Sent verification email to {self.recipient_email}")
+            return
+
         message = MessageSchema(
             subject="Verify Your Email",
             recipients=[self.recipient_email],
@@ -83,18 +279,56 @@ class VerificationEmailTask:
             subtype="html",
         )
 
-        try:
-            await self.fm.send_message(message)
-            print(f"Sent verification email to {self.recipient_email}")
-        except Exception as e:
-            print(f"Failed to send verification email: {e}")
+        await self.fm.send_message(message)
+        logger.info(f"Sent verification email to {self.recipient_email}")
 
 
 @celery.task(
     name="send_verification_email_task",
-    auto_retry_for=(Exception,),
-    retry_kwargs={"max_retries": 3, "countdown": 60},
+    autoretry_for=(Exception,),
+    retry_kwargs=EMAIL_RETRY_KWARGS,
 )
 def send_verification_email_task(recipient_email: str, verification_link: str):
-    task = VerificationEmailTask(recipient_email, verification_link)
-    asyncio.run(task.send_email())
+    resources.open()
+    task = VerificationEmailTask(
+        recipient_email, verification_link, smtp_pool=resources.smtp_pool
+    )
+    run_async(task.send_email())
+
+
+@celery.task(
+    name="send_verification_emails_task",
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs=EMAIL_RETRY_KWARGS,
+)
+def send_verification_emails_task(self, recipients: list[list[str]]):
+    resources.open()
+    failed = run_async(send_verification_batch(resources.smtp_pool, recipients))
+    if failed:
+        # Retry only the recipients that were not sent
+        raise self.retry(args=[failed], **EMAIL_RETRY_KWARGS)
+
+
+async def send_verification_batch(
+    smtp_pool: SMTPConnectionPool, recipients: list[list[str]]
+) -> list[list[str]]:
+    # Returns the [email, link] pairs that failed
+    # The pool sends the whole batch over a handful of SMTP sessions
+    messages = [
+        build_verification_message(recipient_email, verification_link)
+        for recipient_email, verification_link in recipients
+    ]
+    errors = await smtp_pool.send_messages(messages)
+    failed = []
+    for recipient, error in zip(recipients, errors):
+        if error:
+            logger.warning(
+                f"Failed to send verification email to {recipient[0]}: {error}"
+            )
+            failed.append(list(recipient))
+    logger.info(
+        f"Sent {len(recipients) - len(failed)} of {len(recipients)} "
+        "verification emails"
+    )
+    return failed
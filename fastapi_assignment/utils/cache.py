@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    # Bounded in-process cache with least-recently-used eviction and a
+    # per-entry expiry timestamp (seconds, on the clock passed in)
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry else None
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    # Read-through cache: a small per-process LRU in front of Redis in front
+    # of the real loader. Invalidations delete the Redis entry and are
+    # broadcast over pub/sub so every worker drops its local copy.
+    #
+    # A loader can read a document just before a write invalidates it and
+    # store the old value afterwards. Invalidations therefore also bump a
+    # per-key generation in Redis; entries are stored with the generation
+    # seen before loading, and reads ignore entries from older generations.
+
+    def __init__(
+        self,
+        redis: Redis,
+        namespace: str,
+        local_max_size: int,
+        local_ttl: float,
+        redis_ttl: int,
+    ):
+        self.redis = redis
+        self.namespace = namespace
+        self.channel = f"{namespace}:invalidate"
+        self.local = LRUCache(local_max_size)
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.loads = 0
+        self.invalidations_received = 0
+        # Bumped on every local or remote invalidation; a load that spans a
+        # bump may hold a stale value and is not kept in process memory
+        self.invalidation_epoch = 0
+        self.stale_fills = 0
+        self.local_age_total = 0.0
+        self.local_age_max = 0.0
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.namespace}:generation:{key}"
+
+    async def _read(self, key: str) -> Tuple[Optional[dict], int]:
+        # One round trip for the entry and the key's current generation
+        raw, generation = await self.redis.mget(
+            self._redis_key(key), self._generation_key(key)
+        )
+        generation = int(generation or 0)
+        if raw is not None:
+            entry = json.loads(raw)
+            # Entries are [generation, value]; anything else predates them
+            if isinstance(entry, list) and entry[0] == generation:
+                return entry[1], generation
+            self.stale_fills += 1
+        return None, generation
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Optional[dict]]]):
+        now = time.time()
+        entry = self.local.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            # Staleness: how old the value served from process memory is
+            age = now - fetched_at
+            self.local_age_total += age
+            self.local_age_max = max(self.local_age_max, age)
+            return value
+
+        epoch = self.invalidation_epoch
+        try:
+            value, generation = await self._read(key)
+        except (RedisError, OSError) as e:
+            self.redis_errors += 1
+            logger.warning(f"Redis cache read failed for {key}: {e}")
+            # Without the generation a fill cannot be checked; skip it
+            generation = None
+        else:
+            if value is not None:
+                self.redis_hits += 1
+                self.local.set(key, (value, now), now + self.local_ttl)
+                return value
+            self.redis_misses += 1
+
+        self.loads += 1
+        value = await loader()
+        if value is None:
+            return value
+        if self.invalidation_epoch == epoch:
+            now = time.time()
+            self.local.set(key, (value, now), now + self.local_ttl)
+        if generation is not None:
+            await self._write(key, value, generation)
+        return value
+
+    async def peek(self, key: str) -> Optional[dict]:
+        # Cached value from either tier, without falling back to the loader
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry[0]
+        try:
+            value, _ = await self._read(key)
+        except (RedisError, OSError) as e:
+            self.redis_errors += 1
+            logger.warning(f"Redis cache read failed for {key}: {e}")
+            return None
+        return value
+
+    async def set(self, key: str, value: dict, generation: int = 0):
+        # generation is the key's generation read before value was loaded
+        now = time.time()
+        self.local.set(key, (value, now), now + self.local_ttl)
+        await self._write(key, value, generation)
+
+    async def _write(self, key: str, value: dict, generation: int):
+        try:
+            await self.redis.set(
+                self._redis_key(key),
+                json.dumps([generation, value]),
+                ex=self.redis_ttl,
+            )
+        except (RedisError, OSError) as e:
+            self.redis_errors += 1
+            logger.warning(f"Redis cache write failed for {key}: {e}")
+
+    async def invalidate(self, key: str):
+        self.local.delete(key)
+        self.invalidation_epoch += 1
+        generation_key = self._generation_key(key)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(generation_key)
+                # Outlives any entry written under the previous generation
+                pipe.expire(generation_key, self.redis_ttl * 2)
+                pipe.delete(self._redis_key(key))
+                pipe.publish(self.channel, key)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            # Other workers fall back to their short local TTL
+            self.redis_errors += 1
+            logger.warning(f"Redis cache invalidation failed for {key}: {e}")
+
+    async def listen(self, retry_delay: float = 1.0):
+        # Long-running task: drop local entries invalidated by other workers
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything cached before (re)subscribing may have missed events
+                self.local.clear()
+                self.invalidation_epoch += 1
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    key = message["data"]
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    self.local.delete(key)
+                    self.invalidation_epoch += 1
+                    self.invalidations_received += 1
+            except (RedisError, OSError) as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+                self.local.clear()
+                await asyncio.sleep(retry_delay)
+            finally:
+                await pubsub.reset()
+
+    def stats(self) -> dict:
+        local = self.local.stats()
+        lookups = local["hits"] + local["misses"]
+        redis_lookups = self.redis_hits + self.redis_misses
+        return {
+            "local": local,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "redis_hit_ratio": (
+                self.redis_hits / redis_lookups if redis_lookups else 0.0
+            ),
+            "redis_errors": self.redis_errors,
+            "hit_ratio": (
+                (local["hits"] + self.redis_hits) / lookups if lookups else 0.0
+            ),
+            "loads": self.loads,
+            "invalidations_received": self.invalidations_received,
+            "stale_fills": self.stale_fills,
+            "local_age_mean_seconds": (
+                self.local_age_total / local["hits"] if local["hits"] else 0.0
+            ),
+            "local_age_max_seconds": self.local_age_max,
+        }
@@ -0,0 +1,146 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Single materialized document, updated with $inc on every candidate write
+STATS_COLLECTION = "candidate_stats"
+STATS_ID = "candidates"
+
+# Lower bounds (years) of the experience histogram buckets; the last is open
+EXPERIENCE_BOUNDARIES = (0, 1, 3, 5, 10)
+
+
+def _bucket_label(index: int) -> str:
+    low = EXPERIENCE_BOUNDARIES[index]
+    if index == len(EXPERIENCE_BOUNDARIES) - 1:
+        return f"{low}+"
+    high = EXPERIENCE_BOUNDARIES[index + 1] - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+EXPERIENCE_BUCKETS = {
+    low: _bucket_label(index) for index, low in enumerate(EXPERIENCE_BOUNDARIES)
+}
+
+
+def experience_bucket(experience: Optional[int]) -> str:
+    years = experience or 0
+    for low in reversed(EXPERIENCE_BOUNDARIES):
+        if years >= low:
+            return EXPERIENCE_BUCKETS[low]
+    return EXPERIENCE_BUCKETS[EXPERIENCE_BOUNDARIES[0]]
+
+
+def candidate_delta(candidate: dict, sign: int = 1) -> Counter:
+    # Contribution of one candidate document to the stats counters
+    delta = Counter(
+        {
+            "total": sign,
+            f"experience.{experience_bucket(candidate.get('experience'))}": sign,
+        }
+    )
+    if candidate.get("is_verified"):
+        delta["verified"] += sign
+    return delta
+
+
+def change_delta(before: dict, after: dict) -> Counter:
+    delta = candidate_delta(after)
+    delta.subtract(candidate_delta(before))
+    return delta
+
+
+async def apply_stats_delta(db: AsyncIOMotorDatabase, delta: Counter) -> None:
+    inc = {field: count for field, count in delta.items() if count}
+    if not inc:
+        return
+    await db[STATS_COLLECTION].update_one({"_id": STATS_ID}, {"$inc": inc}, upsert=True)
+
+
+def format_stats(document: Optional[dict]) -> dict:
+    document = document or {}
+    total = document.get("total", 0)
+    verified = document.get("verified", 0)
+    histogram = document.get("experience", {})
+    return {
+        "total": total,
+        "verified": verified,
+        "verified_ratio": round(verified / total, 4) if total else 0.0,
+        "experience": {
+            label: histogram.get(label, 0) for label in EXPERIENCE_BUCKETS.values()
+        },
+        "reconciled_at": document.get("reconciled_at"),
+    }
+
+
+async def get_candidate_stats(db: AsyncIOMotorDatabase) -> dict:
+    # One primary-key read, independent of the collection size
+    return format_stats(await db[STATS_COLLECTION].find_one({"_id": STATS_ID}))
+
+
+STATS_PIPELINE = [
+    {
+        "$facet": {
+            "totals": [
+                {
+                    "$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "verified": {"$sum": {"$cond": ["$is_verified", 1, 0]}},
+                    }
+                }
+            ],
+            "experience": [
+                {
+                    "$bucket": {
+                        "groupBy": {"$ifNull": ["$experience", 0]},
+                        "boundaries": list(EXPERIENCE_BOUNDARIES),
+                        "default": EXPERIENCE_BUCKETS[EXPERIENCE_BOUNDARIES[-1]],
+                        "output": {"count": {"$sum": 1}},
+                    }
+                }
+            ],
+        }
+    }
+]
+
+
+async def reconcile_candidate_stats(db: AsyncIOMotorDatabase) -> dict:
+    # Recount from scratch in one aggregation and overwrite the counters.
+    # Writes landing between the aggregation and the replace can leave a
+    # small drift, which the next run corrects.
+    [facets] = await db["candidates"].aggregate(STATS_PIPELINE).to_list(1)
+    totals = facets["totals"][0] if facets["totals"] else {}
+    histogram = {
+        EXPERIENCE_BUCKETS.get(bucket["_id"], bucket["_id"]): bucket["count"]
+        for bucket in facets["experience"]
+    }
+    document = {
+        "total": totals.get("total", 0),
+        "verified": totals.get("verified", 0),
+        "experience": histogram,
+        "reconciled_at": datetime.now(timezone.utc),
+    }
+    previous = await db[STATS_COLLECTION].find_one_and_replace(
+        {"_id": STATS_ID}, document, upsert=True
+    )
+    drift = stats_drift(previous, document)
+    return {"stats": format_stats(document), "drift": drift}
+
+
+async def ensure_candidate_stats(db: AsyncIOMotorDatabase) -> None:
+    # Seed the counters from the data on first start; afterwards writes and
+    # the periodic reconciliation keep them current
+    if await db[STATS_COLLECTION].find_one({"_id": STATS_ID}, {"_id": 1}) is None:
+        await reconcile_candidate_stats(db)
+
+
+def stats_drift(previous: Optional[dict], current: dict) -> dict:
+    # Per-counter correction applied by a reconciliation run
+    previous = format_stats(previous)
+    current = format_stats(current)
+    drift = {field: current[field] - previous[field] for field in ("total", "verified")}
+    for label, count in current["experience"].items():
+        drift[f"experience.{label}"] = count - previous["experience"][label]
+    return {field: count for field, count in drift.items() if count}
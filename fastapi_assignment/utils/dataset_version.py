@@ -0,0 +1,19 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Monotonic change counters, one document per tracked collection
+VERSIONS_COLLECTION = "dataset_versions"
+
+
+async def bump_dataset_version(
+    db: AsyncIOMotorDatabase, name: str = "candidates"
+) -> None:
+    await db[VERSIONS_COLLECTION].update_one(
+        {"_id": name}, {"$inc": {"version": 1}}, upsert=True
+    )
+
+
+async def get_dataset_version(
+    db: AsyncIOMotorDatabase, name: str = "candidates"
+) -> int:
+    document = await db[VERSIONS_COLLECTION].find_one({"_id": name})
+    return document["version"] if document else 0
@@ -1,15 +1,77 @@
 from fastapi.security import OAuth2PasswordBearer
 from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
 
 from fastapi_assignment import config
+from fastapi_assignment.celery_config import celery
+from fastapi_assignment.utils.cache import TieredCache
+from fastapi_assignment.utils.metrics import command_metrics
+from fastapi_assignment.utils.outbox import OutboxRelay
+from fastapi_assignment.utils.runtime_stats import pool_stats
+from fastapi_assignment.utils.slow_queries import slow_query_log
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="user/login")
 
-# Singleton MongoDB client
-mongodb_client = AsyncIOMotorClient(config.MONGO_URL)
+# Singleton MongoDB client (pool events feed the readiness probe, command
+# events the /metrics latency histograms and the slow-query log)
+mongodb_client = AsyncIOMotorClient(
+    config.MONGO_URL, event_listeners=[pool_stats, command_metrics, slow_query_log]
+)
 db = mongodb_client[config.DB_NAME]
 
 
 # Dependency function to provide the database instance
 def get_database():
     return db
+
+
+# Publishes outbox entries to Celery; started by the app lifespan
+outbox_relay = OutboxRelay(db)
+
+
+# Singleton Redis client (connections are opened lazily)
+redis_client = Redis.from_url(config.REDIS_URL)
+
+
+# Dependency function to provide the Redis client
+def get_redis():
+    return redis_client
+
+
+# Client for the Celery broker, used only to check it is reachable
+broker_client = Redis.from_url(celery.conf.broker_url)
+
+
+# Dependency function to provide the broker client
+def get_broker_client():
+    return broker_client
+
+
+# Per-process read cache for candidate documents, backed by Redis
+candidate_cache = TieredCache(
+    redis_client,
+    namespace="candidate",
+    local_max_size=config.CANDIDATE_CACHE_LOCAL_SIZE,
+    local_ttl=config.CANDIDATE_CACHE_LOCAL_TTL,
+    redis_ttl=config.CANDIDATE_CACHE_REDIS_TTL,
+)
+
+
+# Dependency function to provide the candidate cache (None when disabled)
+def get_candidate_cache():
+    return candidate_cache if config.CANDIDATE_CACHE_ENABLED else None
+
+
+# Cache for list and search pages, keyed by the candidates dataset version
+candidate_list_cache = TieredCache(
+    redis_client,
+    namespace="candidate-list",
+    local_max_size=config.CANDIDATE_LIST_CACHE_LOCAL_SIZE,
+    local_ttl=config.CANDIDATE_LIST_CACHE_LOCAL_TTL,
+    redis_ttl=config.CANDIDATE_LIST_CACHE_REDIS_TTL,
+)
+
+
+# Dependency function to provide the list cache (None when disabled)
+def get_candidate_list_cache():
+    return candidate_list_cache if config.CANDIDATE_LIST_CACHE_ENABLED else None
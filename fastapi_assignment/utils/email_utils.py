@@ -1,4 +1,11 @@
-from fastapi_mail import FastMail, MessageSchema
+import asyncio
+import os
+import time
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional, Tuple
+import aiosmtplib
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema
 import fastapi_assignment.config as config
 
 conf = config.MAIL_CONFIG
@@ -16,16 +23,166 @@ async def send_verification_email(recipient_email: str, verification_link: str):
     await fm.send_message(message)
 
 
-async def send_report_email(
-    recipients: list[str], subject: str, body: str, attachment_path: str
-):
-    with open(attachment_path, "rb") as _:
-        message = MessageSchema(
-            subject=subject,
-            recipients=recipients,
-            body=body,
-            subtype="html",
-            attachments=[attachment_path],
+def build_report_messages(
+    recipients: List[str], subject: str, body: str, attachment_path: str
+) -> List[EmailMessage]:
+    # The attachment is read once and shared by every recipient's message
+    with open(attachment_path, "rb") as file:
+        attachment = file.read()
+    filename = os.path.basename(attachment_path)
+    messages = []
+    for recipient in recipients:
+        message = EmailMessage()
+        message["From"] = formataddr((conf.MAIL_FROM_NAME or "", conf.MAIL_FROM))
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body, subtype="html")
+        message.add_attachment(
+            attachment,
+            maintype="application",
+            subtype="octet-stream",
+            filename=filename,
         )
-    fm = FastMail(conf)
-    await fm.send_message(message)
+        messages.append(message)
+    return messages
+
+
+def build_verification_message(
+    recipient_email: str, verification_link: str
+) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME or "", conf.MAIL_FROM))
+    message["To"] = recipient_email
+    message["Subject"] = "Verify Your Email"
+    message.set_content(
+        "Please click the following link to verify your email: "
+        f"<a href='{verification_link}'>{verification_link}</a>",
+        subtype="html",
+    )
+    return message
+
+
+class SMTPConnectionPool:
+    # Keeps authenticated SMTP sessions open so many messages share one
+    # connect/TLS/login handshake. Bound to the event loop it is used on.
+
+    def __init__(
+        self,
+        connection_config: ConnectionConfig = conf,
+        max_size: int = config.MAIL_POOL_SIZE,
+        idle_timeout: float = config.MAIL_POOL_IDLE_TIMEOUT,
+        max_messages_per_connection: int = config.MAIL_POOL_MAX_MESSAGES,
+    ):
+        self.config = connection_config
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle: List[Tuple[aiosmtplib.SMTP, float, int]] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self.connections_opened = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        use_credentials = self.config.USE_CREDENTIALS
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            username=self.config.MAIL_USERNAME if use_credentials else None,
+            password=(
+                self.config.MAIL_PASSWORD.get_secret_value()
+                if use_credentials
+                else None
+            ),
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+            timeout=self.config.TIMEOUT,
+        )
+        # connect() also performs STARTTLS and login when configured
+        await smtp.connect()
+        self.connections_opened += 1
+        return smtp
+
+    async def _acquire(self) -> Tuple[aiosmtplib.SMTP, int]:
+        now = time.monotonic()
+        while self._idle:
+            smtp, last_used, sent = self._idle.pop()
+            if smtp.is_connected and now - last_used < self.idle_timeout:
+                return smtp, sent
+            await self._quit(smtp)
+        return await self._connect(), 0
+
+    async def _release(self, smtp: aiosmtplib.SMTP, sent: int):
+        if smtp.is_connected and sent < self.max_messages_per_connection:
+            self._idle.append((smtp, time.monotonic(), sent))
+        else:
+            await self._quit(smtp)
+
+    async def _quit(self, smtp: aiosmtplib.SMTP):
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except aiosmtplib.SMTPException:
+            smtp.close()
+
+    async def _send_group(self, messages: List[EmailMessage]) -> List[Optional[str]]:
+        async with self._semaphore:
+            try:
+                smtp, sent = await self._acquire()
+            except (aiosmtplib.SMTPException, OSError) as e:
+                return [str(e)] * len(messages)
+
+            errors: List[Optional[str]] = []
+            try:
+                for message in messages:
+                    if sent >= self.max_messages_per_connection:
+                        await self._quit(smtp)
+                        smtp, sent = await self._connect(), 0
+                    try:
+                        await smtp.send_message(message)
+                    except aiosmtplib.SMTPServerDisconnected:
+                        # The server dropped the session; reconnect and retry once
+                        smtp, sent = await self._connect(), 0
+                        await smtp.send_message(message)
+                    except (
+                        aiosmtplib.SMTPRecipientsRefused,
+                        aiosmtplib.SMTPResponseException,
+                    ) as e:
+                        # Rejected message; the session itself is still usable
+                        errors.append(str(e))
+                        continue
+                    sent += 1
+                    errors.append(None)
+            except (aiosmtplib.SMTPException, OSError) as e:
+                # Session-level failure: the remaining messages were not sent
+                errors.extend([str(e)] * (len(messages) - len(errors)))
+            finally:
+                await self._release(smtp, sent)
+            return errors
+
+    async def send_messages(self, messages: List[EmailMessage]) -> List[Optional[str]]:
+        # Split into per-session groups and send them over up to max_size
+        # concurrent sessions; returns one error (or None) per message
+        size = self.max_messages_per_connection
+        groups = []
+        for start in range(0, len(messages), size):
+            end = start + size
+            groups.append(messages[start:end])
+        results = await asyncio.gather(*(self._send_group(g) for g in groups))
+        return [error for group_errors in results for error in group_errors]
+
+    async def close(self):
+        while self._idle:
+            smtp, _, _ = self._idle.pop()
+            await self._quit(smtp)
+
+
+async def send_report_email(
+    smtp_pool: SMTPConnectionPool,
+    recipients: List[str],
+    subject: str,
+    body: str,
+    attachment_path: str,
+) -> List[Optional[str]]:
+    # Returns one error (or None) per recipient
+    messages = build_report_messages(recipients, subject, body, attachment_path)
+    return await smtp_pool.send_messages(messages)
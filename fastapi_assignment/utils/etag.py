@@ -0,0 +1,43 @@
+from typing import List, Optional
+
+
+def candidate_etag(id: str, version: int) -> str:
+    # Strong validator: changes whenever the document's version is bumped
+    return f'"{id}-{version}"'
+
+
+def list_etag(list_key: str) -> str:
+    # List pages are identified by dataset version plus query parameters
+    return '"list-{}"'.format(list_key.replace(":", "-"))
+
+
+def parse_etags(header: str) -> List[str]:
+    # Split an If-Match / If-None-Match header into its entity tags
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    # If-None-Match uses weak comparison (W/ prefixes ignored), If-Match strong
+    if not header:
+        return False
+    for tag in parse_etags(header):
+        if tag == "*":
+            return True
+        if weak and tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def versions_from_if_match(header: str, id: str) -> Optional[List[int]]:
+    # Versions of this candidate the client is willing to overwrite;
+    # None means any version ("*")
+    versions = []
+    for tag in parse_etags(header):
+        if tag == "*":
+            return None
+        prefix, _, version = tag.strip('"').rpartition("-")
+        if prefix == id and tag.startswith('"') and version.isdigit():
+            versions.append(int(version))
+    return versions
@@ -0,0 +1,97 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import zlib
+from typing import AsyncIterator, Iterable, List
+
+# Columns shared by the streaming export and the emailed report
+CSV_HEADER = ["ID", "Name", "Email", "Experience", "Is Verified"]
+
+# Only the exported columns are read from MongoDB
+EXPORT_PROJECTION = {"name": 1, "email": 1, "experience": 1, "is_verified": 1}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Compression codecs available for report files: codec -> (extension, opener)
+COMPRESSION_CODECS = {
+    "gzip": ("gz", lambda path, level: gzip.open(path, "wb", compresslevel=level)),
+    "bz2": ("bz2", lambda path, level: bz2.open(path, "wb", compresslevel=level)),
+    "xz": ("xz", lambda path, level: lzma.open(path, "wb", preset=level)),
+}
+
+
+def open_compressed(path: str, codec: str, level: int):
+    try:
+        _, opener = COMPRESSION_CODECS[codec]
+    except KeyError:
+        raise ValueError(f"Unsupported compression codec: {codec}")
+    return opener(path, level)
+
+
+def candidate_row(candidate: dict) -> list:
+    return [
+        str(candidate["_id"]),
+        candidate.get("name", ""),
+        candidate.get("email", ""),
+        candidate.get("experience", 0),
+        candidate.get("is_verified", False),
+    ]
+
+
+def encode_csv_rows(rows: Iterable[list]) -> str:
+    # Encode a whole batch with one writerows call instead of one per row
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def encode_ndjson(candidates: Iterable[dict]) -> str:
+    return "".join(
+        json.dumps(
+            {
+                "id": str(candidate["_id"]),
+                "name": candidate.get("name", ""),
+                "email": candidate.get("email", ""),
+                "experience": candidate.get("experience", 0),
+                "is_verified": candidate.get("is_verified", False),
+            }
+        )
+        + "\n"
+        for candidate in candidates
+    )
+
+
+def encode_batch(candidates: List[dict], fmt: str) -> bytes:
+    if fmt == "csv":
+        return encode_csv_rows(candidate_row(c) for c in candidates).encode()
+    return encode_ndjson(candidates).encode()
+
+
+async def stream_export(
+    cursor, fmt: str, batch_size: int, compress: bool = False
+) -> AsyncIterator[bytes]:
+    # A chunk is only produced once the previous one has been sent, so the
+    # Motor cursor is drained at the pace of the client.
+    compressor = zlib.compressobj(wbits=31) if compress else None  # gzip framing
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    pending = encode_csv_rows([CSV_HEADER]).encode() if fmt == "csv" else b""
+    batch: List[dict] = []
+    async for candidate in cursor:
+        batch.append(candidate)
+        if len(batch) >= batch_size:
+            chunk = emit(pending + encode_batch(batch, fmt))
+            pending, batch = b"", []
+            if chunk:
+                yield chunk
+
+    tail = emit(pending + (encode_batch(batch, fmt) if batch else b""))
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,44 @@
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from fastapi_assignment.models.candidate import (
+    INTERNAL_CANDIDATE_FIELDS,
+    PUBLIC_CANDIDATE_FIELDS,
+    SECRET_CANDIDATE_FIELDS,
+    candidate_fields_model,
+)
+
+# Identity and validator are part of every fieldset so ETags keep working
+ALWAYS_INCLUDED_FIELDS = frozenset({"id", "version"})
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    # "email,name" -> ("id", "name", "email", "version"); None means all fields
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(PUBLIC_CANDIDATE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    requested |= ALWAYS_INCLUDED_FIELDS
+    return tuple(name for name in PUBLIC_CANDIDATE_FIELDS if name in requested)
+
+
+def build_projection(fields: Optional[Tuple[str, ...]]) -> dict:
+    # Full reads still drop secrets and lookup keys; sparse reads fetch only
+    # what was asked
+    if fields is None:
+        excluded = SECRET_CANDIDATE_FIELDS | INTERNAL_CANDIDATE_FIELDS
+        return {name: 0 for name in sorted(excluded)}
+    projection = {"_id": 1}
+    projection.update({name: 1 for name in fields if name != "id"})
+    return projection
+
+
+def trim_candidate(document: dict, fields: Tuple[str, ...]) -> dict:
+    # Validate only the requested fields of a raw or cached candidate
+    values = {name: document[name] for name in fields if name in document}
+    if "_id" in document:
+        values["id"] = str(document["_id"])
+    return candidate_fields_model(fields)(**values).model_dump()
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Declarative registry of the indexes every collection is expected to carry.
+# Index names are explicit so drift can be detected by name.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "candidates": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # Backs the `$text` search on /all-candidates
+        IndexModel([("name", TEXT), ("email", TEXT)], name="name_email_text"),
+        # Backs /verify-email for tokens issued before the token collection
+        IndexModel(
+            [("verification_token", ASCENDING)],
+            name="verification_token_sparse",
+            sparse=True,
+        ),
+        # Back /candidates/suggest; multikey on the prefix arrays with name
+        # second so results come back already sorted
+        IndexModel(
+            [("name_prefixes", ASCENDING), ("name", ASCENDING)],
+            name="name_prefixes_name",
+        ),
+        IndexModel(
+            [("email_prefixes", ASCENDING), ("name", ASCENDING)],
+            name="email_prefixes_name",
+        ),
+    ],
+    "verification_tokens": [
+        # Tokens are looked up by _id; this only drives expiry
+        IndexModel(
+            [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+        ),
+    ],
+    "outbox": [
+        # Backs the relay's scan for due entries
+        IndexModel([("available_at", ASCENDING)], name="available_at"),
+    ],
+    "user": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+}
+
+# Unique indexes that correctness depends on, not just speed: candidate
+# creates rely on email_unique alone to reject duplicate emails
+REQUIRED_UNIQUE_INDEXES: Dict[str, List[str]] = {"candidates": ["email_unique"]}
+
+
+def _normalize_key(key) -> List[tuple]:
+    # Text indexes are reported by MongoDB as _fts/_ftsx keys
+    if any(direction == TEXT for _, direction in key):
+        return [("_fts", TEXT), ("_ftsx", 1)]
+    return [(field, direction) for field, direction in key]
+
+
+async def diff_indexes(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, list]]:
+    report = {}
+    for collection_name, models in INDEXES.items():
+        existing = await db[collection_name].index_information()
+        existing.pop("_id_", None)
+        expected = {model.document["name"]: model.document for model in models}
+
+        missing, mismatched = [], []
+        for name, spec in expected.items():
+            if name not in existing:
+                missing.append(name)
+            elif _normalize_key(spec["key"].items()) != _normalize_key(
+                existing[name]["key"]
+            ):
+                mismatched.append(name)
+
+        report[collection_name] = {
+            "missing": missing,
+            "mismatched": mismatched,
+            "extra": sorted(set(existing) - set(expected)),
+        }
+    return report
+
+
+async def missing_unique_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    # An existing index that cannot be built (e.g. duplicate emails already
+    # stored) stays missing; the API must not run as if it were enforced
+    missing = []
+    for collection_name, names in REQUIRED_UNIQUE_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name in names:
+            if not existing.get(name, {}).get("unique"):
+                missing.append(f"{collection_name}.{name}")
+    return missing
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, list]]:
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            # Create one by one so a single conflicting index (e.g. duplicate
+            # emails blocking a unique index) does not block the others.
+            # createIndexes is a no-op for indexes that already exist.
+            try:
+                await db[collection_name].create_indexes([model])
+            except PyMongoError as e:
+                logger.error(
+                    f"Failed to create index {model.document['name']} on "
+                    f"{collection_name}: {e}"
+                )
+
+    report = await diff_indexes(db)
+    for collection_name, drift in report.items():
+        for kind in ("missing", "mismatched", "extra"):
+            if drift[kind]:
+                logger.warning(
+                    f"{collection_name} has {kind} indexes: {', '.join(drift[kind])}"
+                )
+    return report
+
+
+async def _main(check_only: bool):
+    from fastapi_assignment.utils.dependencies import db
+
+    report = await (diff_indexes(db) if check_only else ensure_indexes(db))
+    for collection_name, drift in report.items():
+        print(f"{collection_name}: {drift}")
+    return not any(drift["missing"] or drift["mismatched"] for drift in report.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply or check MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="Only report index drift")
+    args = parser.parse_args()
+    raise SystemExit(0 if asyncio.run(_main(args.check)) else 1)
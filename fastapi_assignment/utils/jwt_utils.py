@@ -3,12 +3,17 @@ from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi_assignment import config
+from fastapi_assignment.utils.cache import LRUCache
 
 # Secret key for JWT signing : TODO
 SECRET_KEY = config.JWT_SECRET_KEY
 ALGORITHM = config.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = config.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
 
+# Tokens whose signature and claims were already verified, kept until
+# their own exp so repeat requests skip the crypto
+token_cache = LRUCache(config.JWT_CACHE_MAX_SIZE)
+
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -35,3 +40,15 @@ def decode_access_token(token: str):
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+
+def decode_access_token_cached(token: str):
+    # The full token string is the key, so a tampered token never matches
+    # a cached entry and always goes through verification
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = decode_access_token(token)
+    if payload is not None and "exp" in payload:
+        token_cache.set(token, payload, payload["exp"])
+    return payload
@@ -0,0 +1,200 @@
+import logging
+import time
+from typing import Callable, Iterable, Tuple
+from celery.signals import after_task_publish, task_postrun, task_prerun, worker_init
+from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from fastapi_assignment import config
+
+logger = logging.getLogger(__name__)
+
+# Route label for requests that matched no route (or were rejected before
+# routing); raw paths would give every candidate id its own series
+UNMATCHED_ROUTE = "unmatched"
+
+# MongoDB commands mostly finish well under the default HTTP buckets
+MONGODB_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+# Reports can take minutes, emails a few seconds
+TASK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request, by route template.",
+    ["method", "route"],
+)
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "HTTP responses sent, by route template and status code.",
+    ["method", "route", "status"],
+)
+MONGODB_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency reported by pymongo command monitoring.",
+    ["command", "collection"],
+    buckets=MONGODB_BUCKETS,
+)
+MONGODB_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures",
+    "MongoDB commands that returned an error.",
+    ["command", "collection"],
+)
+CELERY_TASKS_PUBLISHED = Counter(
+    "celery_tasks_published",
+    "Celery tasks handed to the broker by this process.",
+    ["task"],
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time in the worker, by final state.",
+    ["task", "state"],
+    buckets=TASK_BUCKETS,
+)
+
+
+class HTTPMetrics:
+    # Label lookups validate and hash every value; caching the children per
+    # (method, route, status) keeps a request down to two observations
+
+    def __init__(self):
+        self._durations = {}
+        self._responses = {}
+
+    def observe(self, scope: dict, status: int, duration: float):
+        route = scope.get("route")
+        # FastAPI leaves the matched route (and its path template) in scope
+        template = getattr(route, "path", None) or UNMATCHED_ROUTE
+        method = scope["method"]
+
+        key = (method, template)
+        histogram = self._durations.get(key)
+        if histogram is None:
+            histogram = self._durations[key] = HTTP_REQUEST_DURATION.labels(*key)
+        histogram.observe(duration)
+
+        key = (method, template, status)
+        counter = self._responses.get(key)
+        if counter is None:
+            counter = self._responses[key] = HTTP_REQUESTS.labels(*key)
+        counter.inc()
+
+
+def command_collection(command_name: str, command: dict) -> str:
+    # Most commands name their collection as the command's own value;
+    # getMore names it separately
+    if command_name == "getMore":
+        collection = command.get("collection")
+    else:
+        collection = command.get(command_name)
+    return collection if isinstance(collection, str) else ""
+
+
+class CommandMetrics(monitoring.CommandListener):
+    # Times every MongoDB command on the clients it is registered with.
+    # Collections are only known from the started event, so they are held
+    # per in-flight command until it completes
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        self._collections[(event.connection_id, event.request_id)] = command_collection(
+            event.command_name, event.command
+        )
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGODB_COMMAND_DURATION.labels(event.command_name, collection).observe(
+            event.duration_micros / 1e6
+        )
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGODB_COMMAND_DURATION.labels(event.command_name, collection).observe(
+            event.duration_micros / 1e6
+        )
+        MONGODB_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+class StatsCollector:
+    # Exposes existing stats() counters at scrape time, so caches, pools and
+    # the outbox relay record nothing extra per operation. read() yields
+    # (label values, value) pairs
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        read: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]],
+        family=GaugeMetricFamily,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.read = read
+        self.family = family
+
+    def collect(self):
+        family = self.family(self.name, self.documentation, labels=self.labelnames)
+        for labels, value in self.read():
+            family.add_metric(labels, value)
+        yield family
+
+    def describe(self):
+        return [self.family(self.name, self.documentation, labels=self.labelnames)]
+
+
+def counter_collector(name, documentation, labelnames, read):
+    return StatsCollector(name, documentation, labelnames, read, CounterMetricFamily)
+
+
+http_metrics = HTTPMetrics()
+command_metrics = CommandMetrics()
+
+
+@after_task_publish.connect
+def count_published_task(sender=None, **kwargs):
+    # sender is the task name
+    CELERY_TASKS_PUBLISHED.labels(sender).inc()
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+
+@worker_init.connect
+def start_worker_metrics_server(**kwargs):
+    # Serves the worker's task and MongoDB metrics. Task metrics are recorded
+    # in the process running the task, which is this one under the solo pool
+    # used by docker-compose
+    if config.CELERY_METRICS_PORT:
+        start_http_server(config.CELERY_METRICS_PORT)
+        logger.info(f"Serving worker metrics on port {config.CELERY_METRICS_PORT}")
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi_assignment.celery_config import celery
+from fastapi_assignment import config
+
+logger = logging.getLogger(__name__)
+
+# Celery tasks waiting to be published; an entry is deleted once the broker
+# has accepted it, so at worst a task is published twice, never lost
+OUTBOX_COLLECTION = "outbox"
+
+
+def outbox_entry(
+    task: str,
+    args: list,
+    candidate_ids: Optional[List[ObjectId]] = None,
+    batch: bool = False,
+) -> dict:
+    now = datetime.now(timezone.utc)
+    entry = {
+        "_id": ObjectId(),
+        "task": task,
+        "args": args,
+        "created_at": now,
+        # Relays pick up entries whose available_at has passed; claiming
+        # and retry backoff both work by pushing it into the future
+        "available_at": now,
+        "attempts": 0,
+    }
+    if candidate_ids is not None:
+        # Candidates the task is about. Entries may be written before their
+        # candidates, and are only published once those exist. For a batch
+        # the ids line up with the items of args[0], which are trimmed to
+        # the candidates that exist
+        entry["candidate_ids"] = candidate_ids
+        entry["batch"] = batch
+    return entry
+
+
+async def enqueue_tasks(db: AsyncIOMotorDatabase, entries: List[dict], session=None):
+    if entries:
+        await db[OUTBOX_COLLECTION].insert_many(entries, session=session)
+
+
+async def discard_tasks(db: AsyncIOMotorDatabase, entries: List[dict]):
+    if entries:
+        await db[OUTBOX_COLLECTION].delete_many(
+            {"_id": {"$in": [entry["_id"] for entry in entries]}}
+        )
+
+
+def publish_to_celery(task: str, args: list):
+    celery.send_task(task, args=args)
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        publish: Callable[[str, list], None] = publish_to_celery,
+        batch_size: int = config.OUTBOX_BATCH_SIZE,
+        poll_interval: float = config.OUTBOX_POLL_INTERVAL,
+        lease_seconds: int = config.OUTBOX_LEASE_SECONDS,
+        max_backoff: int = config.OUTBOX_MAX_BACKOFF,
+        orphan_grace: int = config.OUTBOX_ORPHAN_GRACE,
+    ):
+        self.collection = db[OUTBOX_COLLECTION]
+        self.candidates = db["candidates"]
+        self.publish = publish
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_backoff = max_backoff
+        self.orphan_grace = orphan_grace
+        self.published = 0
+        self.failed = 0
+        self.orphaned = 0
+
+    async def claim(self) -> List[dict]:
+        # Lease a batch of due entries so relays in other processes skip it;
+        # a relay that dies mid-batch lets the lease expire and others retry
+        now = datetime.now(timezone.utc)
+        due = (
+            await self.collection.find({"available_at": {"$lte": now}}, {"_id": 1})
+            .sort("available_at", 1)
+            .limit(self.batch_size)
+            .to_list(self.batch_size)
+        )
+        if not due:
+            return []
+        ids = [entry["_id"] for entry in due]
+        lease = ObjectId()
+        await self.collection.update_many(
+            {"_id": {"$in": ids}, "available_at": {"$lte": now}},
+            {
+                "$set": {
+                    "available_at": now + timedelta(seconds=self.lease_seconds),
+                    "lease": lease,
+                }
+            },
+        )
+        return await self.collection.find(
+            {"_id": {"$in": ids}, "lease": lease}
+        ).to_list(None)
+
+    async def resolve_candidates(self, entries: List[dict]) -> List[dict]:
+        # Returns the entries ready to publish. Entries whose candidates do
+        # not exist yet wait for them; after orphan_grace the create that
+        # wrote them has failed, so they are trimmed or dropped
+        ids = {id for entry in entries for id in entry.get("candidate_ids", [])}
+        if not ids:
+            return entries
+        existing = {
+            document["_id"]
+            for document in await self.candidates.find(
+                {"_id": {"$in": list(ids)}}, {"_id": 1}
+            ).to_list(None)
+        }
+
+        now = datetime.now(timezone.utc)
+        ready, waiting, orphans = [], [], []
+        for entry in entries:
+            candidate_ids = entry.get("candidate_ids", [])
+            if existing.issuperset(candidate_ids):
+                ready.append(entry)
+            elif now - entry["_id"].generation_time < timedelta(
+                seconds=self.orphan_grace
+            ):
+                waiting.append(entry["_id"])
+            elif entry["batch"] and existing.intersection(candidate_ids):
+                entry["args"] = [
+                    [
+                        item
+                        for id, item in zip(candidate_ids, entry["args"][0])
+                        if id in existing
+                    ],
+                    *entry["args"][1:],
+                ]
+                ready.append(entry)
+            else:
+                orphans.append(entry["_id"])
+
+        if waiting:
+            # Usually the create is still between its writes; look again soon
+            await self.collection.update_many(
+                {"_id": {"$in": waiting}},
+                {"$set": {"available_at": now + timedelta(seconds=self.poll_interval)}},
+            )
+        if orphans:
+            logger.warning(
+                f"Dropping {len(orphans)} outbox tasks for missing candidates"
+            )
+            await self.collection.delete_many({"_id": {"$in": orphans}})
+            self.orphaned += len(orphans)
+        return ready
+
+    def publish_batch(self, entries: List[dict]) -> Tuple[list, Optional[str]]:
+        # Runs in a worker thread: broker publishes are blocking calls
+        published = []
+        for entry in entries:
+            try:
+                self.publish(entry["task"], entry["args"])
+            except Exception as e:
+                # The broker is most likely unavailable; retry the rest later
+                return published, str(e)
+            published.append(entry["_id"])
+        return published, None
+
+    async def relay_once(self) -> int:
+        claimed = await self.claim()
+        if not claimed:
+            return 0
+        entries = await self.resolve_candidates(claimed)
+        published, error = await asyncio.to_thread(self.publish_batch, entries)
+        if published:
+            await self.collection.delete_many({"_id": {"$in": published}})
+            self.published += len(published)
+
+        pending = [entry for entry in entries if entry["_id"] not in set(published)]
+        if pending:
+            self.failed += len(pending)
+            attempts = max(entry["attempts"] for entry in pending) + 1
+            backoff = min(self.max_backoff, 2**attempts)
+            logger.warning(
+                f"Outbox publish failed, retrying {len(pending)} tasks in "
+                f"{backoff}s: {error}"
+            )
+            await self.collection.update_many(
+                {"_id": {"$in": [entry["_id"] for entry in pending]}},
+                {
+                    "$set": {
+                        "available_at": datetime.now(timezone.utc)
+                        + timedelta(seconds=backoff)
+                    },
+                    "$inc": {"attempts": 1},
+                },
+            )
+        return len(claimed)
+
+    async def run(self):
+        failures = 0
+        while True:
+            try:
+                claimed = await self.relay_once()
+            except Exception as e:
+                # Nothing may end the relay, or queued tasks would sit in the
+                # outbox until a restart; back off while failures persist
+                failures += 1
+                delay = min(self.max_backoff, self.poll_interval * 2**failures)
+                logger.exception(f"Outbox relay failed, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            # Keep draining full batches; otherwise wait for new entries
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "failed": self.failed,
+            "orphaned": self.orphaned,
+        }
@@ -0,0 +1,18 @@
+import base64
+import binascii
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+
+def encode_cursor(last_id: ObjectId) -> str:
+    # Opaque, URL-safe token wrapping the raw 12 bytes of the last seen _id
+    return base64.urlsafe_b64encode(last_id.binary).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        return ObjectId(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from fastapi_assignment import config
+from fastapi_assignment.utils.jwt_utils import get_password_hash, verify_password
+
+
+class PasswordHasher:
+    # Runs bcrypt on a dedicated thread pool (bcrypt releases the GIL) so
+    # password work never blocks the event loop. Work beyond the workers
+    # plus the queue limit is rejected with 503 instead of piling up.
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queued_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication is temporarily overloaded, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, queued, hashing = await loop.run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.queued_seconds_total += queued
+        self.hash_seconds_total += hashing
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queued_seconds_total": self.queued_seconds_total,
+            "hash_seconds_total": self.hash_seconds_total,
+        }
+
+
+password_hasher = PasswordHasher(
+    config.PASSWORD_HASH_WORKERS, config.PASSWORD_HASH_MAX_QUEUE
+)
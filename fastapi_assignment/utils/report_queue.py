@@ -0,0 +1,66 @@
+import secrets
+from typing import List, Optional
+from redis.asyncio import Redis
+from fastapi_assignment import config
+
+# Recipients waiting for the next report run, and the single-job lock.
+# Requests that arrive while a job holds the lock only join the pending set,
+# so any number of concurrent requests are served by one generation job.
+PENDING_RECIPIENTS_KEY = "report:pending-recipients"
+JOB_LOCK_KEY = "report:job-lock"
+
+# Deletes the lock only while it still holds the caller's token, so a job
+# that outlived REPORT_JOB_LOCK_TTL cannot drop its successor's lock
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+async def take_job_lock(redis: Redis, token: str) -> bool:
+    return bool(
+        await redis.set(JOB_LOCK_KEY, token, nx=True, ex=config.REPORT_JOB_LOCK_TTL)
+    )
+
+
+async def enqueue_report_request(redis: Redis, recipient_email: str) -> Optional[str]:
+    # Returns the lock token when the caller must start a new job
+    await redis.sadd(PENDING_RECIPIENTS_KEY, recipient_email)
+    token = secrets.token_hex(16)
+    return token if await take_job_lock(redis, token) else None
+
+
+async def release_job_lock(redis: Redis, token: Optional[str]):
+    if token is None:
+        # Jobs queued before locks carried tokens
+        await redis.delete(JOB_LOCK_KEY)
+        return
+    await redis.eval(RELEASE_LOCK_SCRIPT, 1, JOB_LOCK_KEY, token)
+
+
+async def drain_pending_recipients(redis: Redis) -> List[str]:
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.smembers(PENDING_RECIPIENTS_KEY)
+        pipe.delete(PENDING_RECIPIENTS_KEY)
+        members, _ = await pipe.execute()
+    return sorted(
+        member.decode() if isinstance(member, bytes) else member for member in members
+    )
+
+
+async def requeue_recipients(redis: Redis, recipients: List[str]):
+    # Hands drained recipients back when their round failed
+    if recipients:
+        await redis.sadd(PENDING_RECIPIENTS_KEY, *recipients)
+
+
+async def release_report_job(redis: Redis, token: Optional[str]) -> Optional[str]:
+    # Returns the new lock token when requests arrived meanwhile and the lock
+    # was re-taken, meaning the current job should run another round
+    await release_job_lock(redis, token)
+    if not await redis.scard(PENDING_RECIPIENTS_KEY):
+        return None
+    token = token or secrets.token_hex(16)
+    return token if await take_job_lock(redis, token) else None
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from pymongo import monitoring
+from fastapi_assignment import config
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    # Tracks MongoDB connection pool usage from pymongo's pool events. Motor
+    # runs pymongo on executor threads, so the counters sit behind a lock
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.checkout_failures = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "checkout_failures": self.checkout_failures,
+            }
+            # The peak is per probe interval, not since startup
+            self.max_waiting = self.waiting
+        return stats
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    # Remaining pool events carry nothing we report
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+class LoopLagMonitor:
+    # Measures how late a periodic sleep wakes up; a busy or blocked event
+    # loop delays every request on this worker by about the same amount
+
+    def __init__(self, interval: float = 0.5, clock=time.perf_counter):
+        self.interval = interval
+        self.clock = clock
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def record(self, lag: float):
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+    async def sample(self):
+        started = self.clock()
+        await asyncio.sleep(self.interval)
+        self.record(max(0.0, self.clock() - started - self.interval))
+
+    async def run(self):
+        while True:
+            await self.sample()
+
+    def stats(self) -> dict:
+        stats = {"lag": round(self.lag, 4), "max_lag": round(self.max_lag, 4)}
+        self.max_lag = self.lag
+        return stats
+
+
+class InFlightRequests:
+    # Requests currently being handled by this worker (counted by the
+    # request middleware; the event loop is single threaded)
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.current -= 1
+
+    def stats(self) -> dict:
+        stats = {"current": self.current, "peak": self.peak}
+        self.peak = self.current
+        return stats
+
+
+pool_stats = PoolStats()
+in_flight_requests = InFlightRequests()
+loop_lag_monitor = LoopLagMonitor(config.HEALTH_LOOP_LAG_INTERVAL)
@@ -0,0 +1,19 @@
+from fastapi_assignment.models.candidate import CandidateInDB
+
+# (name, default) for every field of the public candidate representation,
+# in the same order CandidateInDB.model_dump() would produce
+CANDIDATE_FIELD_DEFAULTS = tuple(
+    (name, None if field.is_required() else field.get_default())
+    for name, field in CandidateInDB.model_fields.items()
+)
+
+
+def candidate_document(document: dict) -> dict:
+    # Trusted read path: stored candidates were validated on the way in, so
+    # map the BSON dict straight to its response shape without pydantic.
+    # Unknown stored keys are dropped and missing ones get model defaults.
+    candidate = {
+        name: document.get(name, default) for name, default in CANDIDATE_FIELD_DEFAULTS
+    }
+    candidate["id"] = str(document["_id"])
+    return candidate
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+from fastapi_assignment import config
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being handled, set by the request middleware.
+# Motor copies the context into its executor threads, so command events
+# can see which route issued them
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+# Field holding the filter of each read command
+QUERY_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+}
+
+# Commands explain accepts (inserts have no plan to show)
+EXPLAINABLE_COMMANDS = frozenset({*QUERY_FIELDS, "aggregate", "update", "delete"})
+
+# Where update and delete keep their statements
+STATEMENT_FIELDS = {"update": "updates", "delete": "deletes"}
+
+# Connection bookkeeping never carries a query worth logging
+IGNORED_COMMANDS = frozenset(
+    {
+        "explain",
+        "hello",
+        "isMaster",
+        "ismaster",
+        "ping",
+        "endSessions",
+        "saslStart",
+        "saslContinue",
+        "buildInfo",
+        "getMore",
+        "killCursors",
+    }
+)
+
+# Session, transaction and write concern fields explain does not accept
+DRIVER_FIELDS = frozenset(
+    {
+        "$db",
+        "lsid",
+        "$clusterTime",
+        "txnNumber",
+        "$readPreference",
+        "autocommit",
+        "startTransaction",
+        "writeConcern",
+    }
+)
+
+
+def value_shape(value):
+    # Replaces literal values with "?" so queries differing only in their
+    # arguments share a shape; operators and field names are kept
+    if isinstance(value, dict):
+        return {key: value_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = value_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    if command_name == "aggregate":
+        return {"pipeline": value_shape(command.get("pipeline", []))}
+    if command_name in STATEMENT_FIELDS:
+        statements = command.get(STATEMENT_FIELDS[command_name], [])
+        return {"q": value_shape([statement.get("q") for statement in statements])}
+    shape = {"filter": value_shape(command.get(QUERY_FIELDS.get(command_name), {}))}
+    # Sort directions and projected fields decide index use, so keep them
+    for field in ("sort", "projection"):
+        if command.get(field):
+            shape[field] = dict(command[field])
+    return shape
+
+
+def explainable_command(command_name: str, command: dict) -> dict:
+    explain = {
+        field: value for field, value in command.items() if field not in DRIVER_FIELDS
+    }
+    if command_name in STATEMENT_FIELDS:
+        # explain takes a single update or delete statement
+        field = STATEMENT_FIELDS[command_name]
+        explain[field] = explain[field][:1]
+    return explain
+
+
+def request_route() -> Optional[str]:
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+def plan_stages(plan: dict) -> list:
+    # Flattens a winning plan into stage names, with the index for scans;
+    # filters and bounds are left out since they carry the real values
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+        inputs = plan.get("inputStages") or [plan.get("inputStage")]
+        plan = inputs[0] if inputs else None
+    return stages
+
+
+def explain_summary(explain: dict) -> dict:
+    planner = explain.get("queryPlanner", {})
+    stats = explain.get("executionStats", {})
+    if "stages" in explain:
+        # Aggregations nest the cursor stage's plan under their first stage
+        cursor = explain["stages"][0].get("$cursor", {})
+        planner = cursor.get("queryPlanner", planner)
+        stats = cursor.get("executionStats", stats)
+    winning_plan = planner.get("winningPlan", {})
+    # Slot-based execution wraps the classic plan tree in queryPlan
+    stages = plan_stages(winning_plan.get("queryPlan", winning_plan))
+    return {
+        "stages": stages,
+        "collection_scan": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    # Records MongoDB commands slower than threshold_ms in a bounded ring.
+    # The first time a query shape turns up slow, its command is explained
+    # (executionStats) once on the event loop; explain never applies writes
+
+    def __init__(
+        self,
+        threshold_ms: float = config.SLOW_QUERY_THRESHOLD_MS,
+        max_entries: int = config.SLOW_QUERY_LOG_SIZE,
+        max_explains: int = config.SLOW_QUERY_EXPLAIN_SIZE,
+    ):
+        self.threshold_ms = threshold_ms
+        self.entries = deque(maxlen=max_entries)
+        self.explains = OrderedDict()
+        self.max_explains = max_explains
+        self.db = None
+        self.db_name = None
+        self.loop = None
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def attach(self, db):
+        # Explains run on the app's loop through the app's own client
+        self.db = db
+        self.db_name = db.name
+        self.loop = asyncio.get_running_loop()
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self._commands[(event.connection_id, event.request_id)] = (
+                event.command,
+                event.database_name,
+                request_route(),
+            )
+
+    def succeeded(self, event):
+        self.finished(event)
+
+    def failed(self, event):
+        self.finished(event)
+
+    def finished(self, event):
+        started = self._commands.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.threshold_ms:
+            command, database_name, route = started
+            self.record(event.command_name, command, database_name, route, duration_ms)
+
+    def record(self, command_name, command, database_name, route, duration_ms):
+        collection = command.get(command_name)
+        shape = query_shape(command_name, command)
+        key = f"{collection}.{command_name} {json.dumps(shape, sort_keys=True)}"
+        self.entries.append(
+            {
+                "shape": shape,
+                "command": command_name,
+                "collection": collection,
+                "duration_ms": round(duration_ms, 2),
+                "route": route,
+                "at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        if command_name not in EXPLAINABLE_COMMANDS or database_name != self.db_name:
+            return
+        with self._lock:
+            if key in self.explains:
+                return
+            self.explains[key] = {
+                "shape": shape,
+                "command": command_name,
+                "collection": collection,
+                "route": route,
+                "plan": None,
+            }
+            if len(self.explains) > self.max_explains:
+                self.explains.popitem(last=False)
+        self.loop.call_soon_threadsafe(
+            self.loop.create_task,
+            self.explain(key, explainable_command(command_name, command)),
+        )
+
+    async def explain(self, key: str, command: dict):
+        try:
+            result = await self.db.command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+        except PyMongoError as e:
+            logger.warning(f"Could not explain slow query {key}: {e}")
+            return
+        summary = explain_summary(result)
+        if summary["collection_scan"]:
+            logger.warning(f"Slow query runs a collection scan: {key}")
+        with self._lock:
+            if key in self.explains:
+                self.explains[key]["plan"] = summary
+
+    def report(self) -> dict:
+        with self._lock:
+            explains = list(self.explains.values())
+        return {
+            "threshold_ms": self.threshold_ms,
+            "slow_queries": list(reversed(self.entries)),
+            "explains": explains,
+        }
+
+
+slow_query_log = SlowQueryLog()
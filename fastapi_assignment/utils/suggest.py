@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import unicodedata
+from typing import List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+# Prefix keys are stored up to this length; longer queries match on their
+# first PREFIX_MAX_LENGTH characters
+PREFIX_MAX_LENGTH = 32
+# Local-part separators after which an email is also matched, so "doe"
+# finds john.doe@example.com
+EMAIL_SEPARATORS = ".-_+"
+
+
+def normalize_prefix(text: str) -> str:
+    # Case-insensitive, width-insensitive, single-spaced
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def _prefixes(starts: List[str]) -> List[str]:
+    prefixes = set()
+    for start in starts:
+        start = start[:PREFIX_MAX_LENGTH]
+        prefixes.update(start[:length] for length in range(1, len(start) + 1))
+    return sorted(prefixes)
+
+
+def name_prefixes(name: str) -> List[str]:
+    # Every word starts a key, so "ron" and "john r" both find "John Ronald"
+    words = normalize_prefix(name).split(" ")
+    return _prefixes([" ".join(words[index:]) for index in range(len(words))])
+
+
+def email_prefixes(email: str) -> List[str]:
+    email = normalize_prefix(email)
+    local_part = email.split("@", 1)[0]
+    starts = [email]
+    for index, char in enumerate(local_part, start=1):
+        if char in EMAIL_SEPARATORS and index < len(local_part):
+            starts.append(email[index:])
+    return _prefixes(starts)
+
+
+def prefix_fields(data: dict) -> dict:
+    # Prefix arrays for whichever of name/email are being written, so an
+    # update can $set them alongside the new values in the same operation
+    fields = {}
+    if data.get("name") is not None:
+        fields["name_prefixes"] = name_prefixes(data["name"])
+    if data.get("email") is not None:
+        fields["email_prefixes"] = email_prefixes(data["email"])
+    return fields
+
+
+def suggest_query(q: str) -> dict:
+    key = normalize_prefix(q)[:PREFIX_MAX_LENGTH]
+    return {"$or": [{"name_prefixes": key}, {"email_prefixes": key}]}
+
+
+async def backfill_prefixes(db: AsyncIOMotorDatabase, batch_size: int = 1000) -> int:
+    # Adds prefix keys to candidates written before typeahead existed
+    collection = db["candidates"]
+    cursor = collection.find(
+        {
+            "$or": [
+                {"name_prefixes": {"$exists": False}},
+                {"email_prefixes": {"$exists": False}},
+            ]
+        },
+        {"name": 1, "email": 1},
+    )
+    updated, operations = 0, []
+    async for candidate in cursor:
+        operations.append(
+            UpdateOne({"_id": candidate["_id"]}, {"$set": prefix_fields(candidate)})
+        )
+        if len(operations) >= batch_size:
+            updated += (
+                await collection.bulk_write(operations, ordered=False)
+            ).modified_count
+            operations = []
+    if operations:
+        updated += (
+            await collection.bulk_write(operations, ordered=False)
+        ).modified_count
+    return updated
+
+
+async def _main():
+    from fastapi_assignment.utils.dependencies import db
+
+    print(f"Backfilled prefix keys on {await backfill_prefixes(db)} candidates")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(
+        description="Backfill candidate typeahead prefix keys"
+    ).parse_args()
+    asyncio.run(_main())
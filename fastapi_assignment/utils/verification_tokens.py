@@ -0,0 +1,46 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi_assignment import config
+
+# One document per outstanding token, keyed by the token itself so lookups
+# hit the _id index; a TTL index removes expired tokens in the background
+TOKENS_COLLECTION = "verification_tokens"
+
+
+def new_verification_token(candidate_id: ObjectId) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": secrets.token_urlsafe(32),
+        "candidate_id": candidate_id,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=config.VERIFICATION_TOKEN_TTL),
+    }
+
+
+async def store_verification_tokens(
+    db: AsyncIOMotorDatabase, tokens: List[dict], session=None
+):
+    if tokens:
+        await db[TOKENS_COLLECTION].insert_many(tokens, session=session)
+
+
+async def discard_verification_tokens(db: AsyncIOMotorDatabase, tokens: List[dict]):
+    if tokens:
+        await db[TOKENS_COLLECTION].delete_many(
+            {"_id": {"$in": [token["_id"] for token in tokens]}}
+        )
+
+
+async def consume_verification_token(
+    db: AsyncIOMotorDatabase, token: str
+) -> Optional[ObjectId]:
+    # Atomic single use: of two concurrent clicks only one gets the document.
+    # The expiry filter is exact; the TTL monitor only runs once a minute.
+    document = await db[TOKENS_COLLECTION].find_one_and_delete(
+        {"_id": token, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+        projection={"candidate_id": 1},
+    )
+    return document["candidate_id"] if document else None
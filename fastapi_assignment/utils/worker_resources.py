@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+from celery.signals import (
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
+from fastapi_assignment import config
+from fastapi_assignment.utils.email_utils import SMTPConnectionPool
+from fastapi_assignment.utils.metrics import command_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerResources:
+    # Event loop and clients that live as long as the worker process, so
+    # tasks only pay for their actual work instead of loop creation and
+    # connection handshakes on every run
+
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.mongo_client: Optional[AsyncIOMotorClient] = None
+        self.redis: Optional[Redis] = None
+        self.smtp_pool: Optional[SMTPConnectionPool] = None
+
+    @property
+    def db(self):
+        self.open()
+        return self.mongo_client[config.DB_NAME]
+
+    def open(self):
+        # Resources are per process; a forked child rebuilds its own
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.mongo_client = AsyncIOMotorClient(
+            config.MONGO_URL, io_loop=self.loop, event_listeners=[command_metrics]
+        )
+        self.redis = Redis.from_url(config.REDIS_URL)
+        self.smtp_pool = SMTPConnectionPool()
+        logger.info(f"Opened worker resources for process {self.pid}")
+
+    def run(self, coro):
+        self.open()
+        return self.loop.run_until_complete(coro)
+
+    def close(self):
+        if self.pid != os.getpid():
+            return
+        try:
+            self.loop.run_until_complete(self.smtp_pool.close())
+            self.loop.run_until_complete(self.redis.close())
+            self.mongo_client.close()
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+            self.pid = self.loop = self.mongo_client = self.redis = None
+            self.smtp_pool = None
+            logger.info(f"Closed worker resources for process {os.getpid()}")
+
+
+resources = WorkerResources()
+
+
+def run_async(coro):
+    # Drop-in replacement for asyncio.run inside Celery tasks
+    return resources.run(coro)
+
+
+@worker_process_init.connect
+def open_worker_resources(**kwargs):
+    # Prefork children open eagerly; solo/main-process workers open lazily
+    # on the first task
+    resources.open()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_worker_resources(**kwargs):
+    resources.close()
@@ -1,9 +1,39 @@
 import pytest
+from collections import defaultdict
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from fastapi_assignment.routers.candidate import CandidateController
 from fastapi_assignment.routers.user import UserService
-from fastapi_assignment.utils.dependencies import get_database
+from fastapi_assignment.utils.dependencies import (
+    get_candidate_cache,
+    get_candidate_list_cache,
+    get_database,
+)
+from fastapi_assignment.utils.outbox import OUTBOX_COLLECTION
+from fastapi_assignment.utils.verification_tokens import TOKENS_COLLECTION
+
+
+class FakeCursor:
+    """Async iterator standing in for a Motor cursor"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.consumed = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self.documents):
+            raise StopAsyncIteration
+        self.consumed += 1
+        return self.documents[self.consumed - 1]
+
+
+@pytest.fixture
+def fake_cursor():
+    """Build cursors over a list of documents"""
+    return FakeCursor
 
 
 @pytest.fixture
@@ -14,13 +44,16 @@ def mock_collection():
     collection.insert_one = AsyncMock()
     collection.update_one = AsyncMock()
     collection.delete_one = AsyncMock()
+    collection.find_one_and_update = AsyncMock()
+    collection.find_one_and_delete = AsyncMock()
 
-    # Mock cursor behavior for `find`
-    mock_cursor = AsyncMock()
+    # Mock cursor behavior for `find` (chaining is synchronous on Motor cursors)
+    mock_cursor = MagicMock()
     mock_cursor.skip.return_value = mock_cursor
     mock_cursor.limit.return_value = mock_cursor
-    mock_cursor.to_list.return_value = []
-    collection.find.return_value = mock_cursor
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(return_value=[])
+    collection.find = MagicMock(return_value=mock_cursor)
     return collection
 
 
@@ -33,6 +66,28 @@ def mock_db(mock_collection):
     return db
 
 
+@pytest.fixture
+def side_collections(mock_db, mock_collection):
+    """Give every collection other than candidates its own mock"""
+    collections = defaultdict(AsyncMock)
+    mock_db.__getitem__.side_effect = lambda name: (
+        mock_collection if name == "candidates" else collections[name]
+    )
+    return collections
+
+
+@pytest.fixture
+def outbox_collection(side_collections):
+    """Mock outbox collection, separate from the candidates mock"""
+    return side_collections[OUTBOX_COLLECTION]
+
+
+@pytest.fixture
+def token_collection(side_collections):
+    """Mock verification token collection"""
+    return side_collections[TOKENS_COLLECTION]
+
+
 @pytest.fixture
 def mock_candidate_controller(mock_db):
     """Create a CandidateController instance with mock database"""
@@ -60,6 +115,8 @@ def app(mock_db):
         return mock_db
 
     app.dependency_overrides[get_database] = override_get_database
+    app.dependency_overrides[get_candidate_cache] = lambda: None
+    app.dependency_overrides[get_candidate_list_cache] = lambda: None
     return app
 
 
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import fakeredis
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from redis.exceptions import ConnectionError as RedisConnectionError
+from fastapi_assignment.routers.candidate import CandidateController
+from fastapi_assignment.utils.cache import LRUCache, TieredCache
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the cache stays bounded and evicts the coldest entry"""
+    cache = LRUCache(2, clock=FakeClock())
+    cache.set("a", 1, 2000)
+    cache.set("b", 2, 2000)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3, 2000)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries():
+    """Test entries are dropped once their expiry passes"""
+    clock = FakeClock()
+    cache = LRUCache(10, clock=clock)
+    cache.set("a", 1, clock.now + 5)
+
+    assert cache.get("a") == 1
+    clock.now += 5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+@pytest.fixture
+def cache_redis():
+    """Create a mock async Redis client for the tiered cache"""
+    redis = MagicMock()
+    redis.mget = AsyncMock(return_value=[None, None])
+    redis.set = AsyncMock()
+    redis.delete = AsyncMock()
+    redis.publish = AsyncMock()
+    return redis
+
+
+@pytest.fixture
+def tiered_cache(cache_redis):
+    """Create a tiered cache over the mock Redis client"""
+    return TieredCache(
+        cache_redis, "candidate", local_max_size=10, local_ttl=60, redis_ttl=300
+    )
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_reads_through_tiers(tiered_cache, cache_redis):
+    """Test a miss loads once, then memory serves repeat reads"""
+    loader = AsyncMock(return_value={"id": "1", "name": "A"})
+
+    assert await tiered_cache.get("1", loader) == {"id": "1", "name": "A"}
+    assert await tiered_cache.get("1", loader) == {"id": "1", "name": "A"}
+
+    loader.assert_called_once()
+    cache_redis.mget.assert_called_once_with("candidate:1", "candidate:generation:1")
+    cache_redis.set.assert_called_once_with(
+        "candidate:1", json.dumps([0, {"id": "1", "name": "A"}]), ex=300
+    )
+    stats = tiered_cache.stats()
+    assert stats["loads"] == 1
+    assert stats["local"]["hits"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_uses_redis_before_loader(tiered_cache, cache_redis):
+    """Test a Redis hit fills the local tier without calling the loader"""
+    cache_redis.mget.return_value = [json.dumps([3, {"id": "1"}]).encode(), b"3"]
+    loader = AsyncMock()
+
+    assert await tiered_cache.get("1", loader) == {"id": "1"}
+    assert await tiered_cache.get("1", loader) == {"id": "1"}
+
+    loader.assert_not_called()
+    cache_redis.mget.assert_called_once()
+    assert tiered_cache.stats()["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_survives_redis_outage(tiered_cache, cache_redis):
+    """Test Redis errors fall back to the loader instead of failing reads"""
+    cache_redis.mget.side_effect = RedisConnectionError("down")
+    loader = AsyncMock(return_value={"id": "1"})
+
+    assert await tiered_cache.get("1", loader) == {"id": "1"}
+    assert tiered_cache.stats()["redis_errors"] == 1
+    # Without a generation the fill is not written back to Redis
+    cache_redis.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_drops_fill_that_raced_an_invalidation():
+    """Test a load that read the old document cannot re-cache it"""
+    redis = fakeredis.FakeAsyncRedis()
+    loading_worker = TieredCache(redis, "candidate", 10, 60, 300)
+    writing_worker = TieredCache(redis, "candidate", 10, 60, 300)
+    loaded, resume = asyncio.Event(), asyncio.Event()
+    listener = asyncio.ensure_future(loading_worker.listen())
+    while not await redis.pubsub_numsub("candidate:invalidate") == [
+        (b"candidate:invalidate", 1)
+    ]:
+        await asyncio.sleep(0)
+
+    async def slow_loader():
+        # Reads the old document, then stalls while the update lands
+        loaded.set()
+        await resume.wait()
+        return {"id": "1", "v": 1}
+
+    read = asyncio.ensure_future(loading_worker.get("1", slow_loader))
+    await loaded.wait()
+    await writing_worker.invalidate("1")
+    while not loading_worker.invalidations_received:
+        await asyncio.sleep(0)
+    resume.set()
+    assert await read == {"id": "1", "v": 1}
+    listener.cancel()
+
+    # Neither tier serves the stale fill; the next read loads the new value
+    assert loading_worker.local.get("1") is None
+    assert await writing_worker.peek("1") is None
+    assert writing_worker.stats()["stale_fills"] == 1
+    fresh = AsyncMock(return_value={"id": "1", "v": 2})
+    assert await writing_worker.get("1", fresh) == {"id": "1", "v": 2}
+    assert await loading_worker.peek("1") == {"id": "1", "v": 2}
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_invalidation_is_broadcast(tiered_cache, cache_redis):
+    """Test invalidation clears both tiers and notifies other workers"""
+    await tiered_cache.set("1", {"id": "1"})
+
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    cache_redis.pipeline.return_value.__aenter__.return_value = pipe
+
+    await tiered_cache.invalidate("1")
+
+    assert len(tiered_cache.local) == 0
+    pipe.incr.assert_called_once_with("candidate:generation:1")
+    pipe.delete.assert_called_once_with("candidate:1")
+    pipe.publish.assert_called_once_with("candidate:invalidate", "1")
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_listener_drops_remote_invalidations(
+    tiered_cache, cache_redis
+):
+    """Test pub/sub messages from other workers evict local entries"""
+    received = asyncio.Event()
+
+    async def messages():
+        yield {"type": "subscribe", "data": 1}
+        await tiered_cache.set("1", {"id": "1"})
+        await tiered_cache.set("2", {"id": "2"})
+        yield {"type": "message", "data": b"1"}
+        received.set()
+        await asyncio.Event().wait()
+
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.reset = AsyncMock()
+    pubsub.listen = messages
+    cache_redis.pubsub.return_value = pubsub
+
+    listener = asyncio.ensure_future(tiered_cache.listen())
+    await asyncio.wait_for(received.wait(), 1)
+    listener.cancel()
+
+    assert tiered_cache.local.get("1") is None
+    assert tiered_cache.local.get("2") is not None
+    assert tiered_cache.stats()["invalidations_received"] == 1
+
+
+@pytest.mark.asyncio
+async def test_controller_caches_candidate_reads(mock_db, mock_collection):
+    """Test get_candidate reads through the cache and writes invalidate it"""
+    candidate_id = ObjectId()
+    mock_collection.find_one.return_value = {
+        "_id": candidate_id,
+        "name": "John Doe",
+        "email": "john@example.com",
+        "experience": 5,
+        "is_verified": False,
+    }
+    mock_collection.find_one_and_delete.return_value = (
+        mock_collection.find_one.return_value
+    )
+
+    async def read_through(key, loader):
+        return await loader()
+
+    cache = MagicMock()
+    cache.get = AsyncMock(side_effect=read_through)
+    cache.invalidate = AsyncMock()
+    controller = CandidateController(mock_db, cache)
+
+    result = await controller.get_candidate(str(candidate_id))
+    await controller.delete_candidate(str(candidate_id))
+
+    assert result["id"] == str(candidate_id)
+    assert cache.get.call_args.args[0] == str(candidate_id)
+    cache.invalidate.assert_called_once_with(str(candidate_id))
+
+
+@pytest.mark.asyncio
+async def test_list_cache_keys_on_generation(
+    mock_db, mock_collection, tiered_cache, cache_redis
+):
+    """Test repeat searches are cached until the dataset version changes"""
+    mock_collection.find.return_value.to_list.return_value = [
+        {"_id": ObjectId(), "name": "John Doe", "email": "john@example.com"}
+    ]
+    mock_collection.find_one.return_value = {"_id": "candidates", "version": 1}
+    controller = CandidateController(mock_db, list_cache=tiered_cache)
+
+    first = await controller.get_all_candidates(search="John  Doe", size=5)
+    second = await controller.get_all_candidates(search="john doe", size=5)
+
+    assert first == second
+    mock_collection.find.assert_called_once()
+    assert cache_redis.mget.call_args.args[0].startswith("candidate:1:")
+
+    # A write bumps the version, so the same search now misses
+    mock_collection.find_one.return_value = {"_id": "candidates", "version": 2}
+    await controller.get_all_candidates(search="john doe", size=5)
+
+    assert mock_collection.find.call_count == 2
+    assert cache_redis.mget.call_args.args[0].startswith("candidate:2:")
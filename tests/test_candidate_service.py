@@ -1,11 +1,16 @@
 import pytest
+from unittest.mock import patch
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from fastapi_assignment.models.candidate import (
     CandidateCreate,
     CandidateInDB,
+    CandidatePage,
     CandidateUpdate,
 )
+from fastapi_assignment.utils.fieldsets import build_projection, parse_fields
+from fastapi_assignment.utils.pagination import decode_cursor, encode_cursor
 
 # Test data
 test_candidate = CandidateCreate(
@@ -25,8 +30,8 @@ async def test_create_candidate_success(mock_candidate_controller, mock_collecti
     # Call the controller method
     result = await mock_candidate_controller.create_candidate(test_candidate)
 
-    # Verify database calls
-    mock_collection.find_one.assert_called_once_with({"email": test_candidate.email})
+    # Verify database calls: a single insert, no duplicate pre-check
+    mock_collection.find_one.assert_not_called()
     assert mock_collection.insert_one.called
 
     # Verify response
@@ -41,8 +46,8 @@ async def test_create_candidate_duplicate_email(
     mock_candidate_controller, mock_collection
 ):
     """Test creation with existing email"""
-    # Setup mock response for existing candidate
-    mock_collection.find_one.return_value = {"email": test_candidate.email}
+    # The unique email index rejects the insert
+    mock_collection.insert_one.side_effect = DuplicateKeyError("E11000 duplicate key")
 
     # Test creation with duplicate email
     with pytest.raises(HTTPException) as exc_info:
@@ -70,13 +75,14 @@ async def test_get_candidate_success(mock_candidate_controller, mock_collection)
 
     # Verify database call
     mock_collection.find_one.assert_called_once_with(
-        {"_id": ObjectId(test_candidate_id)}
+        {"_id": ObjectId(test_candidate_id)}, build_projection(None)
     )
 
-    # Verify response
-    assert isinstance(result, CandidateInDB)
-    assert result.id == test_candidate_id
-    assert result.email == test_candidate.email
+    # Verify response: a plain dict that still matches the declared schema
+    assert result == CandidateInDB(**result).model_dump()
+    assert result["id"] == test_candidate_id
+    assert result["email"] == test_candidate.email
+    assert result["version"] == 0
 
 
 @pytest.mark.asyncio
@@ -98,10 +104,10 @@ async def test_update_candidate_success(mock_candidate_controller, mock_collecti
     """Test successful candidate update"""
     # Setup mock responses
     update_data = CandidateUpdate(name="Updated Name")
-    mock_collection.update_one.return_value.matched_count = 1
-    mock_collection.find_one.return_value = {
+    # The state before the update is returned by find_one_and_update
+    mock_collection.find_one_and_update.return_value = {
         "_id": ObjectId(test_candidate_id),
-        "name": "Updated Name",
+        "name": test_candidate.name,
         "email": test_candidate.email,
         "experience": test_candidate.experience,
         "is_verified": False,
@@ -121,7 +127,11 @@ async def test_update_candidate_success(mock_candidate_controller, mock_collecti
 async def test_delete_candidate_success(mock_candidate_controller, mock_collection):
     """Test successful candidate deletion"""
     # Setup mock response
-    mock_collection.delete_one.return_value.deleted_count = 1
+    mock_collection.find_one_and_delete.return_value = {
+        "_id": ObjectId(test_candidate_id),
+        "experience": test_candidate.experience,
+        "is_verified": False,
+    }
 
     # Call the controller method
     result = await mock_candidate_controller.delete_candidate(test_candidate_id)
@@ -130,6 +140,178 @@ async def test_delete_candidate_success(mock_candidate_controller, mock_collecti
     assert result["message"] == "Candidate deleted successfully"
 
 
+def _candidate_docs(count):
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "experience": i,
+            "is_verified": False,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_candidates_page_returns_next_cursor(
+    mock_candidate_controller, mock_collection
+):
+    """Test keyset pagination returns a cursor when more documents exist"""
+    docs = _candidate_docs(3)
+    mock_cursor = mock_collection.find.return_value
+    mock_cursor.to_list.return_value = docs
+
+    result = await mock_candidate_controller.get_candidates_page(size=2, cursor="")
+
+    mock_collection.find.assert_called_once_with({}, build_projection(None))
+    mock_cursor.sort.assert_called_once_with("_id", 1)
+    mock_cursor.limit.assert_called_once_with(3)
+    mock_cursor.skip.assert_not_called()
+    assert result == CandidatePage(**result).model_dump()
+    assert [c["id"] for c in result["items"]] == [str(d["_id"]) for d in docs[:2]]
+    assert decode_cursor(result["next_cursor"]) == docs[1]["_id"]
+
+
+@pytest.mark.asyncio
+async def test_get_candidates_page_seeks_past_cursor(
+    mock_candidate_controller, mock_collection
+):
+    """Test keyset pagination filters on _id instead of skipping"""
+    last_id = ObjectId()
+    mock_cursor = mock_collection.find.return_value
+    mock_cursor.to_list.return_value = _candidate_docs(1)
+
+    result = await mock_candidate_controller.get_candidates_page(
+        search="john", size=2, cursor=encode_cursor(last_id)
+    )
+
+    mock_collection.find.assert_called_once_with(
+        {"$text": {"$search": "john"}, "_id": {"$gt": last_id}},
+        build_projection(None),
+    )
+    assert len(result["items"]) == 1
+    assert result["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_candidates_page_invalid_cursor(mock_candidate_controller):
+    """Test a malformed cursor is rejected"""
+    with pytest.raises(HTTPException) as exc_info:
+        await mock_candidate_controller.get_candidates_page(cursor="not-a-cursor")
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
+
+
+def test_get_all_candidates_endpoint_modes(client, mock_collection):
+    """Test page/size keeps returning a list while cursor returns a page"""
+    mock_collection.find.return_value.to_list.return_value = _candidate_docs(2)
+
+    response = client.get("/all-candidates?page=2&size=2")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+    mock_collection.find.return_value.skip.assert_called_once_with(2)
+
+    response = client.get("/all-candidates?size=2&cursor=")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 2
+    assert data["next_cursor"] is None
+
+
+def _assign_ids(documents, ordered=True):
+    # Mimic pymongo assigning _id client-side on insert_many
+    for document in documents:
+        document.setdefault("_id", ObjectId())
+
+
+@pytest.mark.asyncio
+async def test_create_candidates_bulk_dedupes_emails(
+    mock_candidate_controller, mock_collection, outbox_collection, token_collection
+):
+    """Test bulk creation skips existing and repeated emails in one query"""
+    mock_collection.find.return_value.to_list.return_value = [
+        {"email": "taken@example.com"}
+    ]
+    mock_collection.insert_many.side_effect = _assign_ids
+    candidates = [
+        CandidateCreate(name="A", email="a@example.com"),
+        CandidateCreate(name="Taken", email="taken@example.com"),
+        CandidateCreate(name="A again", email="a@example.com"),
+        CandidateCreate(name="B", email="b@example.com"),
+    ]
+
+    result = await mock_candidate_controller.create_candidates_bulk(candidates)
+
+    mock_collection.find.assert_called_once()
+    mock_collection.find_one.assert_not_called()
+    inserted = mock_collection.insert_many.call_args.args[0]
+    assert [doc["email"] for doc in inserted] == ["a@example.com", "b@example.com"]
+    assert mock_collection.insert_many.call_args.kwargs == {"ordered": False}
+
+    assert result.created == 2
+    assert result.failed == 2
+    assert [r.error is None for r in result.results] == [True, False, False, True]
+    assert result.results[0].id == str(inserted[0]["_id"])
+
+    tokens = token_collection.insert_many.call_args.args[0]
+    assert [token["candidate_id"] for token in tokens] == [
+        doc["_id"] for doc in inserted
+    ]
+    assert all("verification_token" not in doc for doc in inserted)
+
+    [entry] = outbox_collection.insert_many.call_args.args[0]
+    assert entry["task"] == "send_verification_emails_task"
+    # The task takes the whole chunk as its one argument
+    [recipients] = entry["args"]
+    assert [email for email, _ in recipients] == ["a@example.com", "b@example.com"]
+    assert recipients[0][1].endswith(f"token={tokens[0]['_id']}")
+    assert entry["candidate_ids"] == [doc["_id"] for doc in inserted]
+
+
+@pytest.mark.asyncio
+async def test_create_candidates_bulk_reports_write_errors(
+    mock_candidate_controller, mock_collection, outbox_collection, token_collection
+):
+    """Test per-item errors from an unordered insert_many"""
+
+    def insert_many(documents, ordered=True):
+        _assign_ids(documents)
+        raise BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000"}]}
+        )
+
+    mock_collection.insert_many.side_effect = insert_many
+    candidates = [
+        CandidateCreate(name=f"C{i}", email=f"c{i}@example.com") for i in range(3)
+    ]
+
+    with patch("fastapi_assignment.config.VERIFICATION_EMAIL_BATCH_SIZE", 1):
+        result = await mock_candidate_controller.create_candidates_bulk(candidates)
+
+    assert result.created == 2
+    assert result.results[1].id is None
+    assert result.results[1].error == "A candidate with this email already exists."
+    # Chunks and tokens are written for every candidate before the insert,
+    # then the rejected candidate's token and chunk are removed
+    first_chunks, kept_chunks = [
+        call.args[0] for call in outbox_collection.insert_many.call_args_list
+    ]
+    assert len(first_chunks) == 3
+    assert [chunk["candidate_ids"] for chunk in kept_chunks] == [
+        [first_chunks[0]["candidate_ids"][0]],
+        [first_chunks[2]["candidate_ids"][0]],
+    ]
+    outbox_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [chunk["_id"] for chunk in first_chunks]}}
+    )
+    tokens = token_collection.insert_many.call_args.args[0]
+    token_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [tokens[1]["_id"]]}}
+    )
+
+
 def test_create_candidate_endpoint_integration(client, mock_collection):
     """Test the create candidate endpoint integration"""
     # Setup mock responses
@@ -168,3 +350,201 @@ def test_get_candidate_endpoint_integration(client, mock_collection):
     data = response.json()
     assert data["id"] == test_candidate_id
     assert data["email"] == test_candidate.email
+
+
+@pytest.mark.asyncio
+async def test_update_candidate_bumps_version(
+    mock_candidate_controller, mock_collection
+):
+    """Test updates increment the version and honour If-Match versions"""
+    mock_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(test_candidate_id),
+        "name": test_candidate.name,
+        "email": test_candidate.email,
+        "experience": test_candidate.experience,
+        "version": 2,
+    }
+
+    result = await mock_candidate_controller.update_candidate(
+        test_candidate_id, CandidateUpdate(name="Updated Name"), [2]
+    )
+
+    query, update = mock_collection.find_one_and_update.call_args.args
+    assert query["version"] == {"$in": [2]}
+    assert update["$inc"] == {"version": 1}
+    assert update["$set"]["name"] == "Updated Name"
+    # Prefix keys are rewritten in the same operation as the name
+    assert "updated n" in update["$set"]["name_prefixes"]
+    assert "email_prefixes" not in update["$set"]
+    assert result.name == "Updated Name"
+    assert result.version == 3
+
+
+@pytest.mark.asyncio
+async def test_update_candidate_version_conflict(
+    mock_candidate_controller, mock_collection
+):
+    """Test a stale If-Match version is rejected with 412"""
+    mock_collection.find_one_and_update.return_value = None
+    mock_collection.find_one.return_value = {"_id": ObjectId(test_candidate_id)}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await mock_candidate_controller.update_candidate(
+            test_candidate_id, CandidateUpdate(name="Updated Name"), [0]
+        )
+
+    assert exc_info.value.status_code == 412
+    query = mock_collection.find_one_and_update.call_args.args[0]
+    assert query["version"] == {"$in": [0, None]}
+
+
+def test_get_candidate_endpoint_conditional(client, mock_collection):
+    """Test ETag round trip: a matching If-None-Match returns 304"""
+    mock_collection.find_one.return_value = {
+        "_id": ObjectId(test_candidate_id),
+        "name": test_candidate.name,
+        "email": test_candidate.email,
+        "experience": test_candidate.experience,
+        "version": 4,
+    }
+
+    response = client.get(f"/candidate/{test_candidate_id}")
+    etag = response.headers["ETag"]
+    assert etag == f'"{test_candidate_id}-4"'
+
+    response = client.get(
+        f"/candidate/{test_candidate_id}", headers={"If-None-Match": f"W/{etag}"}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    # Only the version was read to answer the revalidation
+    assert mock_collection.find_one.call_args.args[1] == {"version": 1}
+
+
+def test_update_candidate_endpoint_if_match(client, mock_collection):
+    """Test If-Match ETags are turned into expected versions"""
+    mock_collection.find_one_and_update.return_value = None
+    mock_collection.find_one.return_value = {"_id": ObjectId(test_candidate_id)}
+
+    response = client.put(
+        f"/candidate/{test_candidate_id}",
+        json={"name": "Updated Name"},
+        headers={"If-Match": f'"{test_candidate_id}-1", "other-2"'},
+    )
+
+    assert response.status_code == 412
+    query = mock_collection.find_one_and_update.call_args.args[0]
+    assert query["version"] == {"$in": [1]}
+
+
+@pytest.mark.asyncio
+async def test_get_all_candidates_sparse_fields(
+    mock_candidate_controller, mock_collection
+):
+    """Test a sparse fieldset becomes a projection and a trimmed response"""
+    mock_collection.find.return_value.to_list.return_value = [
+        {"_id": ObjectId(test_candidate_id), "name": "John Doe", "version": 2}
+    ]
+
+    result = await mock_candidate_controller.get_all_candidates(
+        fields=parse_fields("name")
+    )
+
+    mock_collection.find.assert_called_once_with(
+        {}, {"_id": 1, "name": 1, "version": 1}
+    )
+    assert result == [{"name": "John Doe", "id": test_candidate_id, "version": 2}]
+
+
+def test_parse_fields_rejects_unknown_and_secret_fields():
+    """Test fieldsets only accept public candidate fields"""
+    assert parse_fields(None) is None
+    assert parse_fields(" email ,name") == ("name", "email", "id", "version")
+
+    for raw in ("name,salary", "verification_token"):
+        with pytest.raises(HTTPException) as exc_info:
+            parse_fields(raw)
+        assert exc_info.value.status_code == 400
+
+
+def test_get_candidate_endpoint_sparse_fields(client, mock_collection):
+    """Test GET /candidate/{id}?fields= returns only the requested fields"""
+    mock_collection.find_one.return_value = {
+        "_id": ObjectId(test_candidate_id),
+        "email": test_candidate.email,
+        "version": 1,
+    }
+
+    response = client.get(f"/candidate/{test_candidate_id}?fields=email")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "email": test_candidate.email,
+        "id": test_candidate_id,
+        "version": 1,
+    }
+    assert response.headers["ETag"] == f'"{test_candidate_id}-1"'
+    assert mock_collection.find_one.call_args.args[1] == {
+        "_id": 1,
+        "email": 1,
+        "version": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_verify_email_consumes_stored_token(
+    mock_candidate_controller, mock_collection, token_collection
+):
+    """Test a stored token is consumed by _id and flips its candidate"""
+    candidate_id = ObjectId(test_candidate_id)
+    token_collection.find_one_and_delete.return_value = {"candidate_id": candidate_id}
+    mock_collection.find_one_and_update.return_value = {"_id": candidate_id}
+
+    result = await mock_candidate_controller.verify_email("token")
+
+    assert result == {"message": "Email successfully verified"}
+    token_query = token_collection.find_one_and_delete.call_args.args[0]
+    assert token_query["_id"] == "token"
+    assert "$gt" in token_query["expires_at"]
+    query, update = mock_collection.find_one_and_update.call_args.args
+    assert query == {"_id": candidate_id, "is_verified": False}
+    assert update["$set"] == {"is_verified": True}
+    mock_collection.find_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_verify_email_legacy_and_unknown_tokens(
+    mock_candidate_controller, mock_collection, token_collection
+):
+    """Test tokens stored on older candidates still verify; unknown ones 404"""
+    token_collection.find_one_and_delete.return_value = None
+    mock_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(test_candidate_id)
+    }
+
+    await mock_candidate_controller.verify_email("legacy-token")
+
+    query, update = mock_collection.find_one_and_update.call_args.args
+    assert query == {"verification_token": "legacy-token", "is_verified": False}
+    assert update["$unset"] == {"verification_token": ""}
+
+    # A token already used (or raced by another request) matches nothing
+    mock_collection.find_one_and_update.return_value = None
+    with pytest.raises(HTTPException) as exc_info:
+        await mock_candidate_controller.verify_email("legacy-token")
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_candidate_duplicate_email(
+    mock_candidate_controller, mock_collection
+):
+    """Test changing to a taken email maps the index violation to 400"""
+    mock_collection.find_one_and_update.side_effect = DuplicateKeyError("E11000")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await mock_candidate_controller.update_candidate(
+            test_candidate_id, CandidateUpdate(email="taken@example.com")
+        )
+
+    assert exc_info.value.status_code == 400
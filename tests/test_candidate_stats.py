@@ -0,0 +1,169 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi_assignment.models.candidate import CandidateCreate, CandidateUpdate
+from fastapi_assignment.routers.candidate import CandidateController
+from fastapi_assignment.utils.candidate_stats import (
+    STATS_COLLECTION,
+    STATS_ID,
+    experience_bucket,
+    reconcile_candidate_stats,
+)
+
+
+@pytest.fixture
+def stats_collection():
+    """Create a mock collection holding the materialized stats document"""
+    collection = MagicMock()
+    collection.update_one = AsyncMock()
+    collection.find_one = AsyncMock(return_value=None)
+    collection.find_one_and_replace = AsyncMock(return_value=None)
+    return collection
+
+
+@pytest.fixture
+def stats_db(mock_db, mock_collection, stats_collection):
+    """Route the stats collection to its own mock, everything else shared"""
+    mock_db.__getitem__.side_effect = lambda name: (
+        stats_collection if name == STATS_COLLECTION else mock_collection
+    )
+    return mock_db
+
+
+def _stats_increments(stats_collection):
+    return [
+        call.args[1]["$inc"]
+        for call in stats_collection.update_one.call_args_list
+        if call.args[0] == {"_id": STATS_ID}
+    ]
+
+
+def test_experience_bucket_labels():
+    """Test experience years map onto the histogram buckets"""
+    assert [experience_bucket(years) for years in (None, 0, 1, 2, 4, 9, 10, 25)] == [
+        "0",
+        "0",
+        "1-2",
+        "1-2",
+        "3-4",
+        "5-9",
+        "10+",
+        "10+",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_writes_update_stats_incrementally(
+    stats_db, mock_collection, stats_collection
+):
+    """Test create, update, verify and delete each apply an atomic $inc"""
+    controller = CandidateController(stats_db)
+    candidate_id = ObjectId()
+    mock_collection.find_one.return_value = None
+    mock_collection.insert_one.return_value.inserted_id = candidate_id
+
+    await controller.create_candidate(
+        CandidateCreate(name="John", email="john@example.com", experience=2)
+    )
+
+    mock_collection.find_one_and_update.return_value = {
+        "_id": candidate_id,
+        "name": "John",
+        "email": "john@example.com",
+        "experience": 2,
+        "is_verified": False,
+        "version": 1,
+    }
+    await controller.update_candidate(str(candidate_id), CandidateUpdate(experience=7))
+
+    mock_collection.find_one_and_update.return_value = {"_id": candidate_id}
+    await controller.verify_email("token")
+
+    mock_collection.find_one_and_delete.return_value = {
+        "_id": candidate_id,
+        "experience": 7,
+        "is_verified": True,
+    }
+    await controller.delete_candidate(str(candidate_id))
+
+    assert _stats_increments(stats_collection) == [
+        {"total": 1, "experience.1-2": 1},
+        {"experience.5-9": 1, "experience.1-2": -1},
+        {"verified": 1},
+        {"total": -1, "experience.5-9": -1, "verified": -1},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_without_bucket_change_skips_stats(
+    stats_db, mock_collection, stats_collection
+):
+    """Test updates that do not move any counter do not touch the stats"""
+    controller = CandidateController(stats_db)
+    mock_collection.find_one_and_update.return_value = {
+        "_id": ObjectId(),
+        "name": "John",
+        "email": "john@example.com",
+        "experience": 3,
+    }
+
+    await controller.update_candidate(
+        str(ObjectId()), CandidateUpdate(name="Johnny", experience=4)
+    )
+
+    assert _stats_increments(stats_collection) == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_candidate_stats(stats_db, mock_collection, stats_collection):
+    """Test reconciliation recounts with $facet and reports the drift"""
+    mock_collection.aggregate = MagicMock()
+    mock_collection.aggregate.return_value.to_list = AsyncMock(
+        return_value=[
+            {
+                "totals": [{"_id": None, "total": 5, "verified": 2}],
+                "experience": [
+                    {"_id": 0, "count": 1},
+                    {"_id": 5, "count": 3},
+                    {"_id": "10+", "count": 1},
+                ],
+            }
+        ]
+    )
+    stats_collection.find_one_and_replace.return_value = {
+        "_id": STATS_ID,
+        "total": 4,
+        "verified": 2,
+        "experience": {"0": 1, "5-9": 3},
+    }
+
+    result = await reconcile_candidate_stats(stats_db)
+
+    pipeline = mock_collection.aggregate.call_args.args[0]
+    assert list(pipeline[0]["$facet"]) == ["totals", "experience"]
+    replaced = stats_collection.find_one_and_replace.call_args.args[1]
+    assert replaced["experience"] == {"0": 1, "5-9": 3, "10+": 1}
+    assert result["drift"] == {"total": 1, "experience.10+": 1}
+    assert result["stats"]["verified_ratio"] == 0.4
+
+
+def test_get_candidate_stats_endpoint(client, mock_collection):
+    """Test GET /candidates/stats is a single read of the stats document"""
+    mock_collection.find_one.return_value = {
+        "_id": STATS_ID,
+        "total": 4,
+        "verified": 1,
+        "experience": {"1-2": 3, "10+": 1},
+    }
+
+    response = client.get("/candidates/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 4,
+        "verified": 1,
+        "verified_ratio": 0.25,
+        "experience": {"0": 0, "1-2": 3, "3-4": 0, "5-9": 0, "10+": 1},
+        "reconciled_at": None,
+    }
+    mock_collection.find_one.assert_called_once_with({"_id": STATS_ID})
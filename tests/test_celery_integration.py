@@ -1,5 +1,10 @@
+import csv
+import gzip
+import io
+import lzma
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi_mail import FastMail
 from fastapi_assignment.tasks import ReportGeneratorTask, VerificationEmailTask
@@ -33,6 +38,57 @@ async def test_generate_report_success():
         mock_generate_report.assert_called_once()
 
 
+def _report_task(cursor):
+    task = ReportGeneratorTask("test@example.com")
+    task.db = MagicMock()
+    task.db["candidates"].find.return_value = cursor
+    return task
+
+
+@pytest.mark.asyncio
+async def test_write_report_streams_into_compressed_file(tmp_path, fake_cursor):
+    """Test the report is written in one compressed pass with stats"""
+    documents = [
+        {"_id": ObjectId(), "name": f"C{i}", "email": f"c{i}@example.com"}
+        for i in range(5)
+    ]
+    task = _report_task(fake_cursor(documents))
+
+    with patch("fastapi_assignment.config.REPORT_DIR", str(tmp_path)), patch(
+        "fastapi_assignment.config.REPORT_BATCH_SIZE", 2
+    ):
+        stats = await task.write_report()
+
+    # Only the compressed artifact is ever created
+    assert [p.name for p in tmp_path.iterdir()] == [stats["path"].split("/")[-1]]
+    assert stats["path"].endswith(".csv.gz")
+    assert stats["rows"] == 5
+    assert stats["bytes_written"] > 0
+    assert stats["rows_per_second"] > 0
+
+    with gzip.open(stats["path"], "rt") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["ID", "Name", "Email", "Experience", "Is Verified"]
+    assert [row[2] for row in rows[1:]] == [d["email"] for d in documents]
+
+
+@pytest.mark.asyncio
+async def test_write_report_uses_configured_codec(tmp_path, fake_cursor):
+    """Test the compression codec and level are configurable"""
+    task = _report_task(
+        fake_cursor([{"_id": ObjectId(), "name": "A", "email": "a@x.com"}])
+    )
+
+    with patch("fastapi_assignment.config.REPORT_DIR", str(tmp_path)), patch(
+        "fastapi_assignment.config.REPORT_COMPRESSION_CODEC", "xz"
+    ), patch("fastapi_assignment.config.REPORT_COMPRESSION_LEVEL", 1):
+        stats = await task.write_report()
+
+    assert stats["path"].endswith(".csv.xz")
+    with lzma.open(stats["path"]) as f:
+        assert len(list(csv.reader(io.TextIOWrapper(f)))) == 2
+
+
 @pytest.mark.asyncio
 async def test_send_report_email_error_handling():
     """Test handling of errors during email sending."""
@@ -44,11 +100,11 @@ async def test_send_report_email_error_handling():
     ) as mock_send_message:
         task = VerificationEmailTask(recipient_email, verification_link)
 
-        await task.send_email()
+        # The failure propagates so the task's autoretry can resend it
+        with pytest.raises(Exception, match="Email send failed"):
+            await task.send_email()
 
-        # Check that an error message is printed when the email sending fails
         mock_send_message.assert_called_once()
-        assert mock_send_message.call_count == 1
 
 
 @pytest.mark.asyncio
@@ -69,3 +125,66 @@ async def test_send_verification_email_success():
 
 
 # Additional tests can be added for more edge cases and failure scenarios as needed
+
+
+def test_worker_resources_are_reused_across_tasks():
+    """Test tasks share one event loop and client set per worker process"""
+    from fastapi_assignment.utils.worker_resources import WorkerResources
+
+    resources = WorkerResources()
+
+    async def current_loop():
+        import asyncio
+
+        return asyncio.get_running_loop()
+
+    first_loop = resources.run(current_loop())
+    mongo_client, redis = resources.mongo_client, resources.redis
+    smtp_pool = resources.smtp_pool
+    second_loop = resources.run(current_loop())
+
+    assert first_loop is second_loop is resources.loop
+    assert resources.mongo_client is mongo_client
+    assert resources.redis is redis
+    assert resources.smtp_pool is smtp_pool
+
+    resources.close()
+    assert first_loop.is_closed()
+    assert resources.loop is None
+
+
+def test_verification_task_uses_shared_smtp_pool():
+    """Test the verification task sends through the worker's SMTP pool"""
+    from fastapi_assignment.tasks import send_verification_email_task
+
+    with patch("fastapi_assignment.tasks.resources") as mock_resources, patch(
+        "fastapi_assignment.tasks.run_async"
+    ) as mock_run_async, patch(
+        "fastapi_assignment.tasks.VerificationEmailTask"
+    ) as mock_task_class:
+        send_verification_email_task("test@example.com", "http://example.com")
+
+    mock_task_class.assert_called_once_with(
+        "test@example.com", "http://example.com", smtp_pool=mock_resources.smtp_pool
+    )
+    mock_run_async.assert_called_once_with(
+        mock_task_class.return_value.send_email.return_value
+    )
+
+
+def test_verification_batch_task_retries_failed_recipients():
+    """Test only the recipients that failed are sent again on retry"""
+    from celery.exceptions import Retry
+    from fastapi_assignment.tasks import send_verification_emails_task
+
+    recipients = [["a@example.com", "http://a"], ["b@example.com", "http://b"]]
+    failed = [["b@example.com", "http://b"]]
+    with patch("fastapi_assignment.tasks.resources"), patch(
+        "fastapi_assignment.tasks.run_async", return_value=failed
+    ), patch.object(
+        send_verification_emails_task, "retry", side_effect=Retry()
+    ) as mock_retry:
+        with pytest.raises(Retry):
+            send_verification_emails_task(recipients)
+
+    mock_retry.assert_called_once_with(args=[failed], max_retries=3, countdown=60)
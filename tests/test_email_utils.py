@@ -0,0 +1,150 @@
+import socket
+import pytest
+from fastapi_mail import ConnectionConfig
+from fastapi_assignment.tasks import send_verification_batch
+from fastapi_assignment.utils.email_utils import (
+    SMTPConnectionPool,
+    build_verification_message,
+    send_report_email,
+)
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class RecordingHandler:
+    """SMTP sink that records messages and the sessions they arrived on"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.refused = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_sink():
+    """Run a local SMTP sink for the duration of a test"""
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(
+        handler, hostname="127.0.0.1", port=_free_port()
+    )
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+def _pool(port, **kwargs):
+    connection_config = ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+    )
+    return SMTPConnectionPool(connection_config, **kwargs)
+
+
+def _messages(count):
+    return [
+        build_verification_message(f"user{i}@example.com", f"http://verify/{i}")
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pool_sends_many_messages_over_one_session(smtp_sink):
+    """Test a batch and a later send share one SMTP session"""
+    handler, port = smtp_sink
+    pool = _pool(port, max_size=2, max_messages_per_connection=100)
+
+    assert await pool.send_messages(_messages(5)) == [None] * 5
+    assert await pool.send_messages(_messages(1)) == [None]
+    await pool.close()
+
+    assert len(handler.messages) == 6
+    assert pool.connections_opened == 1
+    assert len(handler.sessions) == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_rotates_sessions_after_message_limit(smtp_sink):
+    """Test sessions are recycled after max_messages_per_connection"""
+    handler, port = smtp_sink
+    pool = _pool(port, max_size=1, max_messages_per_connection=2)
+
+    assert await pool.send_messages(_messages(5)) == [None] * 5
+    await pool.close()
+
+    assert len(handler.messages) == 5
+    assert pool.connections_opened == 3
+
+
+@pytest.mark.asyncio
+async def test_verification_batch_reports_refused_recipients(smtp_sink):
+    """Test one refused recipient does not stop the rest of the batch"""
+    handler, port = smtp_sink
+    handler.refused.add("bad@example.com")
+    pool = _pool(port)
+    recipients = [
+        ["a@example.com", "http://verify/a"],
+        ["bad@example.com", "http://verify/bad"],
+        ["b@example.com", "http://verify/b"],
+    ]
+
+    failed = await send_verification_batch(pool, recipients)
+    await pool.close()
+
+    assert failed == [["bad@example.com", "http://verify/bad"]]
+    assert [m.rcpt_tos for m in handler.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pool_reports_unreachable_server():
+    """Test every message is reported failed when no session can be opened"""
+    pool = _pool(_free_port())
+
+    errors = await pool.send_messages(_messages(2))
+
+    assert len(errors) == 2
+    assert all(errors)
+
+
+@pytest.mark.asyncio
+async def test_report_fan_out_shares_one_session(smtp_sink, tmp_path):
+    """Test a report sent to several recipients pays for one handshake"""
+    handler, port = smtp_sink
+    pool = _pool(port)
+    report = tmp_path / "report.csv.gz"
+    report.write_bytes(b"compressed report")
+    recipients = ["a@example.com", "b@example.com", "c@example.com"]
+
+    errors = await send_report_email(pool, recipients, "Report", "<p>Hi</p>", report)
+    await pool.close()
+
+    assert errors == [None] * 3
+    assert pool.connections_opened == 1
+    assert [m.rcpt_tos for m in handler.messages] == [[r] for r in recipients]
+    assert b'filename="report.csv.gz"' in handler.messages[0].content
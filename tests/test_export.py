@@ -0,0 +1,80 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from bson import ObjectId
+from fastapi_assignment.utils.export import CSV_HEADER, stream_export
+
+
+def _documents(count):
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Candidate {i}",
+            "email": f"c{i}@example.com",
+            "experience": i,
+            "is_verified": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_stream_export_ndjson_batches(fake_cursor):
+    """Test NDJSON export yields one chunk per batch"""
+    documents = _documents(5)
+
+    chunks = await _collect(stream_export(fake_cursor(documents), "ndjson", 2))
+
+    assert len(chunks) == 3
+    records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [r["id"] for r in records] == [str(d["_id"]) for d in documents]
+
+
+@pytest.mark.asyncio
+async def test_stream_export_pulls_cursor_lazily(fake_cursor):
+    """Test the cursor is only advanced as chunks are consumed"""
+    cursor = fake_cursor(_documents(10))
+    stream = stream_export(cursor, "ndjson", 2)
+
+    await stream.__anext__()
+
+    assert cursor.consumed == 2
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_export_gzip_csv(fake_cursor):
+    """Test gzip-compressed CSV export round-trips"""
+    documents = _documents(3)
+
+    chunks = await _collect(stream_export(fake_cursor(documents), "csv", 2, True))
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(b"".join(chunks)).decode())))
+    assert rows[0] == CSV_HEADER
+    assert [row[2] for row in rows[1:]] == [d["email"] for d in documents]
+
+
+def test_export_endpoint_streams_csv(client, mock_collection):
+    """Test the export endpoint streams from the collection cursor"""
+    documents = _documents(2)
+    mock_collection.find.return_value.__aiter__.return_value = documents
+
+    response = client.get("/candidates/export?format=csv")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert mock_collection.find.call_args.args[1] == {
+        "name": 1,
+        "email": 1,
+        "experience": 1,
+        "is_verified": 1,
+    }
+    assert len(response.text.splitlines()) == 3
+
+    assert client.get("/candidates/export?format=xml").status_code == 422
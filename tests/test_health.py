@@ -0,0 +1,181 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_assignment.middleware.request_middleware import RequestGuardMiddleware
+from fastapi_assignment.routers import health
+from fastapi_assignment.utils.dependencies import (
+    get_broker_client,
+    get_database,
+    get_redis,
+)
+from fastapi_assignment.utils.runtime_stats import (
+    InFlightRequests,
+    LoopLagMonitor,
+    PoolStats,
+    in_flight_requests,
+)
+
+
+@pytest.fixture
+def probes():
+    """Mock MongoDB, Redis and broker clients that answer their pings"""
+    db = MagicMock()
+    db.command = AsyncMock(return_value={"ok": 1})
+    db.__getitem__.return_value.index_information = AsyncMock(
+        return_value={"email_unique": {"key": [("email", 1)], "unique": True}}
+    )
+    redis = MagicMock()
+    redis.ping = AsyncMock(return_value=True)
+    broker = MagicMock()
+    broker.ping = AsyncMock(return_value=True)
+    return db, redis, broker
+
+
+@pytest.fixture
+def health_client(probes):
+    """Create a client for the health router with mocked dependencies"""
+    db, redis, broker = probes
+    app = FastAPI()
+    app.include_router(health.router)
+    app.dependency_overrides[get_database] = lambda: db
+    app.dependency_overrides[get_redis] = lambda: redis
+    app.dependency_overrides[get_broker_client] = lambda: broker
+    return TestClient(app)
+
+
+def test_liveness_touches_no_dependency(health_client, probes):
+    """Test /health/live answers without pinging anything"""
+    assert health_client.get("/health/live").json() == {"status": "alive"}
+    for probe in probes:
+        probe.assert_not_called()
+
+
+def test_readiness_reports_dependencies(health_client, probes):
+    """Test a healthy worker is ready and reports latencies and pool usage"""
+    response = health_client.get("/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["failures"] == []
+    assert set(body["dependencies"]) == {
+        "mongodb",
+        "redis",
+        "broker",
+        "unique_indexes",
+    }
+    assert all(check["ok"] for check in body["dependencies"].values())
+    assert {"checked_out", "waiting"} <= set(body["mongodb_pool"])
+    assert "lag" in body["event_loop"]
+    probes[0].command.assert_awaited_once_with("ping")
+
+
+def test_readiness_fails_on_slow_or_broken_dependency(health_client, probes):
+    """Test a hung ping times out and a failing one is named, both as 503"""
+    db, redis, _ = probes
+
+    async def hang(*args):
+        await asyncio.sleep(10)
+
+    db.command.side_effect = hang
+    redis.ping.side_effect = ConnectionError("refused")
+
+    with patch.object(health.config, "HEALTH_CHECK_TIMEOUT", 0.01):
+        response = health_client.get("/health/ready")
+
+    assert response.status_code == 503
+    body = response.json()
+    assert body["failures"] == ["mongodb", "redis"]
+    assert "timed out" in body["dependencies"]["mongodb"]["error"]
+    assert "refused" in body["dependencies"]["redis"]["error"]
+    assert body["dependencies"]["broker"]["ok"]
+
+
+def test_readiness_fails_without_unique_email_index(health_client, probes):
+    """Test a missing unique index (e.g. blocked by duplicates) fails the probe"""
+    probes[0].__getitem__.return_value.index_information.return_value = {
+        "email_unique": {"key": [("email", 1)]}
+    }
+
+    response = health_client.get("/health/ready")
+
+    assert response.status_code == 503
+    body = response.json()
+    assert body["failures"] == ["unique_indexes"]
+    assert "candidates.email_unique" in body["dependencies"]["unique_indexes"]["error"]
+
+
+def test_readiness_fails_when_saturated(health_client):
+    """Test pool waiters and event-loop lag past their limits fail the probe"""
+    with patch.object(health.config, "HEALTH_MAX_POOL_WAITING", 0), patch.object(
+        health.pool_stats, "waiting", 1
+    ), patch.object(health.loop_lag_monitor, "lag", 5.0):
+        response = health_client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["failures"] == ["mongodb_pool", "event_loop"]
+
+
+def test_pool_stats_follow_checkout_events():
+    """Test pool events track open, checked-out and waiting connections"""
+    stats = PoolStats()
+    stats.connection_created(None)
+    stats.connection_check_out_started(None)
+    stats.connection_check_out_started(None)
+    stats.connection_checked_out(None)
+    stats.connection_check_out_failed(None)
+
+    assert stats.stats() == {
+        "open": 1,
+        "checked_out": 1,
+        "waiting": 0,
+        "max_waiting": 2,
+        "checkout_failures": 1,
+    }
+    stats.connection_checked_in(None)
+    assert stats.stats()["checked_out"] == 0
+    # Peaks reset to the current value once reported
+    assert stats.stats()["max_waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_measures_late_wakeups():
+    """Test lag is how much later than requested the sleep returned"""
+    ticks = iter([0.0, 0.75])
+    monitor = LoopLagMonitor(interval=0.5, clock=lambda: next(ticks))
+
+    with patch("fastapi_assignment.utils.runtime_stats.asyncio.sleep", AsyncMock()):
+        await monitor.sample()
+
+    assert monitor.stats() == {"lag": 0.25, "max_lag": 0.25}
+
+
+def test_middleware_counts_in_flight_requests():
+    """Test the request middleware counts requests while they are handled"""
+    app = FastAPI()
+    app.add_middleware(RequestGuardMiddleware)
+    seen = []
+
+    @app.get("/health")
+    async def probe():
+        seen.append(in_flight_requests.current)
+        return {}
+
+    before = in_flight_requests.current
+    TestClient(app).get("/health")
+
+    assert seen == [before + 1]
+    assert in_flight_requests.current == before
+
+
+def test_in_flight_requests_track_peak():
+    """Test the peak survives until reported"""
+    requests = InFlightRequests()
+    with requests:
+        with requests:
+            pass
+
+    assert requests.stats() == {"current": 0, "peak": 2}
+    assert requests.stats() == {"current": 0, "peak": 0}
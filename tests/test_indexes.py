@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo.errors import OperationFailure
+from fastapi_assignment.utils.indexes import (
+    INDEXES,
+    diff_indexes,
+    ensure_indexes,
+    missing_unique_indexes,
+)
+
+
+def _index_information(collection_name):
+    info = {"_id_": {"key": [("_id", 1)]}}
+    for model in INDEXES[collection_name]:
+        spec = model.document
+        key = list(spec["key"].items())
+        if any(direction == "text" for _, direction in key):
+            key = [("_fts", "text"), ("_ftsx", 1)]
+        info[spec["name"]] = {"key": key}
+        if spec.get("unique"):
+            info[spec["name"]]["unique"] = True
+    return info
+
+
+@pytest.fixture
+def index_db():
+    """Create a mock database whose collections report the registered indexes"""
+    collections = {}
+    for name in INDEXES:
+        collection = MagicMock()
+        collection.index_information = AsyncMock(return_value=_index_information(name))
+        collection.create_indexes = AsyncMock()
+        collections[name] = collection
+
+    db = MagicMock()
+    db.__getitem__.side_effect = collections.__getitem__
+    return db
+
+
+@pytest.mark.asyncio
+async def test_diff_indexes_in_sync(index_db):
+    """Test no drift is reported when every registered index exists"""
+    report = await diff_indexes(index_db)
+
+    for drift in report.values():
+        assert drift == {"missing": [], "mismatched": [], "extra": []}
+
+
+@pytest.mark.asyncio
+async def test_diff_indexes_reports_missing_and_extra(index_db):
+    """Test drift detection for missing, mismatched and unknown indexes"""
+    info = _index_information("candidates")
+    del info["email_unique"]
+    info["verification_token_sparse"]["key"] = [("verification_token", -1)]
+    info["legacy_idx"] = {"key": [("name", 1)]}
+    index_db["candidates"].index_information.return_value = info
+
+    report = await diff_indexes(index_db)
+
+    assert report["candidates"] == {
+        "missing": ["email_unique"],
+        "mismatched": ["verification_token_sparse"],
+        "extra": ["legacy_idx"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_continues_after_failure(index_db):
+    """Test one failing index does not stop the others from being created"""
+    candidates = index_db["candidates"]
+    candidates.create_indexes.side_effect = [
+        OperationFailure("E11000 duplicate key error")
+    ] + [None] * (len(INDEXES["candidates"]) - 1)
+
+    await ensure_indexes(index_db)
+
+    assert candidates.create_indexes.call_count == len(INDEXES["candidates"])
+    index_db["user"].create_indexes.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_missing_unique_indexes(index_db):
+    """Test a unique index that could not be built is reported as missing"""
+    assert await missing_unique_indexes(index_db) == []
+
+    # e.g. duplicate emails stored before the index made the build fail
+    info = _index_information("candidates")
+    del info["email_unique"]
+    index_db["candidates"].index_information.return_value = info
+
+    assert await missing_unique_indexes(index_db) == ["candidates.email_unique"]
+
+
+@pytest.mark.asyncio
+async def test_startup_refuses_without_unique_email_index():
+    """Test the API does not start accepting writes it cannot deduplicate"""
+    from fastapi_assignment import main
+
+    with patch.object(main, "ensure_indexes", AsyncMock()), patch.object(
+        main,
+        "missing_unique_indexes",
+        AsyncMock(return_value=["candidates.email_unique"]),
+    ):
+        with pytest.raises(RuntimeError, match="candidates.email_unique"):
+            async with main.lifespan(main.app):
+                pass
@@ -0,0 +1,57 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from fastapi_assignment.utils import jwt_utils
+from fastapi_assignment.utils.cache import LRUCache
+from fastapi_assignment.utils.jwt_utils import (
+    create_access_token,
+    decode_access_token_cached,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_token_cache():
+    """Give every test an empty token cache"""
+    with patch.object(jwt_utils, "token_cache", LRUCache(100)) as cache:
+        yield cache
+
+
+def test_cached_decode_skips_verification_on_repeat(fresh_token_cache):
+    """Test a verified token is served from the cache on later requests"""
+    token = create_access_token({"id": "1", "email": "user@example.com"})
+
+    with patch.object(
+        jwt_utils, "decode_access_token", wraps=jwt_utils.decode_access_token
+    ) as mock_decode:
+        first = decode_access_token_cached(token)
+        second = decode_access_token_cached(token)
+
+    assert first == second
+    assert first["email"] == "user@example.com"
+    mock_decode.assert_called_once_with(token)
+    assert fresh_token_cache.stats()["hits"] == 1
+    assert fresh_token_cache.stats()["misses"] == 1
+
+
+def test_cached_decode_rejects_tampered_token(fresh_token_cache):
+    """Test a modified token is verified (and rejected) rather than cached"""
+    token = create_access_token({"id": "1", "email": "user@example.com"})
+    decode_access_token_cached(token)
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, signature[:-2] + "AA"])
+
+    assert decode_access_token_cached(tampered) is None
+    assert len(fresh_token_cache) == 1
+
+
+def test_cached_decode_expires_with_token(fresh_token_cache):
+    """Test cached entries never outlive the token's exp claim"""
+    token = create_access_token(
+        {"id": "1", "email": "user@example.com"}, timedelta(seconds=30)
+    )
+    payload = decode_access_token_cached(token)
+
+    assert fresh_token_cache.get(token) == payload
+
+    fresh_token_cache.clock = lambda: payload["exp"]
+    assert fresh_token_cache.get(token) is None
@@ -0,0 +1,134 @@
+import re
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from fastapi_assignment.middleware.request_middleware import RequestGuardMiddleware
+from fastapi_assignment.routers import metrics
+from fastapi_assignment.utils.metrics import (
+    CommandMetrics,
+    command_collection,
+    observe_task_duration,
+    start_task_timer,
+    count_published_task,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def metrics_client():
+    """Create a client for a small app with request metrics and /metrics"""
+    app = FastAPI()
+    app.add_middleware(
+        RequestGuardMiddleware, secure_patterns=[re.compile(r"^/private$")]
+    )
+    app.include_router(metrics.router)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def test_requests_are_labelled_by_route_template(metrics_client):
+    """Test every id hits the same series and unknown paths share one label"""
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+    unmatched_before = sample(
+        "http_requests_total", method="GET", route="unmatched", status="404"
+    )
+
+    metrics_client.get("/items/1")
+    metrics_client.get("/items/2")
+    metrics_client.get("/nope")
+
+    assert sample("http_requests_total", status="200", **labels) == before + 2
+    assert sample("http_request_duration_seconds_count", **labels) >= 2
+    assert (
+        sample("http_requests_total", method="GET", route="unmatched", status="404")
+        == unmatched_before + 1
+    )
+
+
+def test_metrics_endpoint_exposes_stats_collectors(metrics_client):
+    """Test /metrics serves the Prometheus text format with scrape-time gauges"""
+    response = metrics_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in (
+        "http_request_duration_seconds_bucket",
+        'cache_lookups_total{cache="candidate",result="hit",tier="local"}',
+        'mongodb_pool_connections{state="waiting"}',
+        "http_requests_in_flight",
+        "event_loop_lag_seconds",
+        'outbox_publishes_total{outcome="published"}',
+        "password_hash_pending",
+        'password_hash_jobs_total{outcome="rejected"}',
+        'password_hash_seconds_total{phase="hashing"}',
+    ):
+        assert name in response.text
+
+
+@pytest.mark.parametrize(
+    "command_name, command, collection",
+    [
+        ("find", {"find": "candidates", "filter": {}}, "candidates"),
+        ("getMore", {"getMore": 123, "collection": "outbox"}, "outbox"),
+        ("ping", {"ping": 1}, ""),
+    ],
+)
+def test_command_collection(command_name, command, collection):
+    """Test the collection label is found for cursor and admin commands"""
+    assert command_collection(command_name, command) == collection
+
+
+def test_command_metrics_time_commands():
+    """Test succeeded and failed commands are observed under their collection"""
+    listener = CommandMetrics()
+    labels = {"command": "insert", "collection": "metrics_test"}
+    count = sample("mongodb_command_duration_seconds_count", **labels)
+    total = sample("mongodb_command_duration_seconds_sum", **labels)
+    failures = sample("mongodb_command_failures_total", **labels)
+
+    for request_id, outcome in ((1, listener.succeeded), (2, listener.failed)):
+        event = SimpleNamespace(
+            connection_id=("localhost", 27017),
+            request_id=request_id,
+            command_name="insert",
+            command={"insert": "metrics_test"},
+            duration_micros=1500,
+        )
+        listener.started(event)
+        outcome(event)
+
+    assert sample("mongodb_command_duration_seconds_count", **labels) == count + 2
+    assert sample("mongodb_command_duration_seconds_sum", **labels) == pytest.approx(
+        total + 0.003
+    )
+    assert sample("mongodb_command_failures_total", **labels) == failures + 1
+    assert listener._collections == {}
+
+
+def test_celery_signals_record_publishes_and_durations():
+    """Test publish counts and task run times come from Celery signals"""
+    task = SimpleNamespace(name="send_verification_email_task")
+    published = sample("celery_tasks_published_total", task=task.name)
+    runs = sample("celery_task_duration_seconds_count", task=task.name, state="SUCCESS")
+
+    count_published_task(sender=task.name)
+    start_task_timer(task_id="t-1", task=task)
+    observe_task_duration(task_id="t-1", task=task, state="SUCCESS")
+    # A postrun without a matching prerun is ignored
+    observe_task_duration(task_id="t-2", task=task, state="SUCCESS")
+
+    assert sample("celery_tasks_published_total", task=task.name) == published + 1
+    assert (
+        sample("celery_task_duration_seconds_count", task=task.name, state="SUCCESS")
+        == runs + 1
+    )
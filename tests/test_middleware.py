@@ -0,0 +1,113 @@
+import re
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from fastapi_assignment.middleware.request_middleware import (
+    RequestGuardMiddleware,
+    compile_secure_paths,
+)
+from fastapi_assignment.utils.jwt_utils import create_access_token
+
+
+@pytest.fixture
+def guarded_client():
+    """Create a client for a small app behind the request guard middleware"""
+    app = FastAPI()
+    app.add_middleware(RequestGuardMiddleware)
+
+    @app.get("/candidate/{id}")
+    async def protected(id: str, request: Request):
+        return {"email": request.state.email}
+
+    @app.get("/health")
+    async def public():
+        return {"status": "healthy"}
+
+    @app.get("/all-candidates")
+    async def failing():
+        raise RuntimeError("boom")
+
+    @app.get("/candidates/export")
+    async def streaming():
+        async def body():
+            for chunk in (b"a\n", b"b\n"):
+                yield chunk
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_compile_secure_paths_matches_any_pattern():
+    """Test the precompiled alternation behaves like the pattern list"""
+    secure_path = compile_secure_paths(
+        [re.compile(r"^/send-report$"), re.compile(r"^/candidate(/[\w-]+)?$")]
+    )
+
+    assert secure_path.match("/send-report")
+    assert secure_path.match("/candidate/abc-1")
+    assert not secure_path.match("/send-report/extra")
+    assert not secure_path.match("/health")
+
+
+def test_public_path_skips_authentication(guarded_client):
+    """Test unprotected routes need no token"""
+    assert guarded_client.get("/health").json() == {"status": "healthy"}
+
+
+@pytest.mark.parametrize(
+    "headers, detail",
+    [
+        ({}, "Authorization header missing"),
+        ({"Authorization": "Basic abc"}, "Invalid authentication scheme"),
+        ({"Authorization": "Bearer"}, "Invalid token"),
+        (_auth("not-a-jwt"), "Invalid token"),
+        (_auth(create_access_token({"id": "1"})), "Token does not contain an email"),
+    ],
+)
+def test_protected_path_rejects_bad_credentials(guarded_client, headers, detail):
+    """Test protected routes reject missing or invalid credentials"""
+    response = guarded_client.get("/candidate/1", headers=headers)
+
+    assert response.status_code == 403
+    assert response.json() == {"detail": detail}
+
+
+def test_protected_path_exposes_email(guarded_client):
+    """Test a valid token makes the email available on request.state"""
+    token = create_access_token({"id": "1", "email": "user@example.com"})
+
+    response = guarded_client.get("/candidate/1", headers=_auth(token))
+
+    assert response.status_code == 200
+    assert response.json() == {"email": "user@example.com"}
+
+
+def test_unhandled_exception_is_captured(guarded_client):
+    """Test unhandled errors are reported and turned into a 500"""
+    token = create_access_token({"id": "1", "email": "user@example.com"})
+
+    with patch(
+        "fastapi_assignment.middleware.request_middleware.capture_exception"
+    ) as mock_capture:
+        response = guarded_client.get("/all-candidates", headers=_auth(token))
+
+    assert response.status_code == 500
+    assert "internal server error" in response.json()["detail"]
+    mock_capture.assert_called_once()
+
+
+def test_streaming_response_passes_through(guarded_client):
+    """Test streamed bodies are forwarded untouched"""
+    token = create_access_token({"id": "1", "email": "user@example.com"})
+
+    response = guarded_client.get("/candidates/export", headers=_auth(token))
+
+    assert response.status_code == 200
+    assert response.text == "a\nb\n"
@@ -0,0 +1,253 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+from fastapi_assignment.models.candidate import CandidateCreate
+from fastapi_assignment.routers.candidate import CandidateController
+from fastapi_assignment.utils.outbox import OutboxRelay, outbox_entry
+
+
+def _outbox_db(entries):
+    """Create a mock database whose outbox holds the given entries"""
+    collection = MagicMock()
+    due_cursor = MagicMock()
+    due_cursor.sort.return_value = due_cursor
+    due_cursor.limit.return_value = due_cursor
+    due_cursor.to_list = AsyncMock(return_value=[{"_id": e["_id"]} for e in entries])
+    claimed_cursor = MagicMock()
+    claimed_cursor.to_list = AsyncMock(return_value=entries)
+    collection.find.side_effect = [due_cursor, claimed_cursor]
+    collection.update_many = AsyncMock()
+    collection.delete_many = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    return db, collection
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_and_deletes_batch():
+    """Test a claimed batch is published in order and then removed"""
+    entries = [outbox_entry("task_a", [1]), outbox_entry("task_b", [2])]
+    db, collection = _outbox_db(entries)
+    publish = MagicMock()
+    relay = OutboxRelay(db, publish=publish, batch_size=10, lease_seconds=30)
+
+    assert await relay.relay_once() == 2
+
+    assert [call.args for call in publish.call_args_list] == [
+        ("task_a", [1]),
+        ("task_b", [2]),
+    ]
+    lease_query, lease_update = collection.update_many.call_args.args
+    assert lease_query["_id"] == {"$in": [e["_id"] for e in entries]}
+    assert isinstance(lease_update["$set"]["lease"], ObjectId)
+    assert lease_update["$set"]["available_at"] > datetime.now(timezone.utc)
+    collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [e["_id"] for e in entries]}}
+    )
+    assert relay.stats() == {"published": 2, "failed": 0, "orphaned": 0}
+
+
+@pytest.mark.asyncio
+async def test_relay_backs_off_when_broker_fails():
+    """Test entries after a failed publish stay queued with a backoff"""
+    entries = [outbox_entry("task_a", []), outbox_entry("task_b", [])]
+    entries[1]["attempts"] = 2
+    db, collection = _outbox_db(entries)
+    publish = MagicMock(side_effect=[None, ConnectionError("broker down")])
+    relay = OutboxRelay(db, publish=publish, max_backoff=60)
+
+    await relay.relay_once()
+
+    collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [entries[0]["_id"]]}}
+    )
+    retry_query, retry_update = collection.update_many.call_args.args
+    assert retry_query == {"_id": {"$in": [entries[1]["_id"]]}}
+    assert retry_update["$inc"] == {"attempts": 1}
+    delay = retry_update["$set"]["available_at"] - datetime.now(timezone.utc)
+    assert 6 < delay.total_seconds() <= 8
+    assert relay.stats() == {"published": 1, "failed": 1, "orphaned": 0}
+
+
+def _aged(entry, seconds):
+    """Backdate an outbox entry by the given number of seconds"""
+    created = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    entry["_id"] = ObjectId.from_datetime(created)
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_relay_waits_for_and_drops_missing_candidates():
+    """Test entries written before their candidates wait, then trim or drop"""
+    present, failed, missing = ObjectId(), ObjectId(), ObjectId()
+    entries = [
+        outbox_entry("single", ["a@x.com", "link"], candidate_ids=[present]),
+        # Still inside the grace period: the create may be mid-write
+        outbox_entry("single", ["b@x.com", "link"], candidate_ids=[missing]),
+        _aged(outbox_entry("single", ["c@x.com", "link"], candidate_ids=[failed]), 600),
+        _aged(
+            outbox_entry(
+                "batch",
+                [[["a@x.com", "link"], ["c@x.com", "link"]]],
+                candidate_ids=[present, failed],
+                batch=True,
+            ),
+            600,
+        ),
+    ]
+    db, collection = _outbox_db(entries)
+    candidates_cursor = MagicMock()
+    candidates_cursor.to_list = AsyncMock(return_value=[{"_id": present}])
+    collection.find.side_effect = [*collection.find.side_effect, candidates_cursor]
+    publish = MagicMock()
+    relay = OutboxRelay(db, publish=publish, orphan_grace=300)
+
+    assert await relay.relay_once() == 4
+
+    assert [call.args for call in publish.call_args_list] == [
+        ("single", ["a@x.com", "link"]),
+        ("batch", [[["a@x.com", "link"]]]),
+    ]
+    waiting_query, waiting_update = collection.update_many.call_args.args
+    assert waiting_query == {"_id": {"$in": [entries[1]["_id"]]}}
+    assert "available_at" in waiting_update["$set"]
+    assert collection.delete_many.call_args_list[0].args[0] == {
+        "_id": {"$in": [entries[2]["_id"]]}
+    }
+    assert relay.stats() == {"published": 2, "failed": 0, "orphaned": 1}
+
+
+@pytest.mark.asyncio
+async def test_relay_survives_unexpected_errors():
+    """Test any relay error is logged and backed off instead of ending the loop"""
+    relay = OutboxRelay(MagicMock(), poll_interval=1, max_backoff=3)
+    relay.relay_once = AsyncMock(
+        side_effect=[
+            KeyError("args"),
+            ServerSelectionTimeoutError("mongodb down"),
+            RuntimeError("again"),
+            0,
+            asyncio.CancelledError(),
+        ]
+    )
+
+    with patch(
+        "fastapi_assignment.utils.outbox.asyncio.sleep", new_callable=AsyncMock
+    ) as sleep:
+        with pytest.raises(asyncio.CancelledError):
+            await relay.run()
+
+    # Doubling backoff capped at max_backoff, then the normal poll interval
+    assert [call.args[0] for call in sleep.call_args_list] == [2, 3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_relay_idle_when_nothing_is_due():
+    """Test an empty outbox costs a single indexed query"""
+    db, collection = _outbox_db([])
+    publish = MagicMock()
+
+    assert await OutboxRelay(db, publish=publish).relay_once() == 0
+
+    publish.assert_not_called()
+    collection.update_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_candidate_writes_outbox_entry(
+    mock_candidate_controller, mock_collection, outbox_collection, token_collection
+):
+    """Test candidate creation queues its email without touching the broker"""
+    mock_collection.find_one.return_value = None
+    with patch(
+        "fastapi_assignment.routers.candidate.send_verification_email_task.delay"
+    ) as mock_delay:
+        await mock_candidate_controller.create_candidate(
+            CandidateCreate(name="Jane", email="jane@example.com")
+        )
+
+    mock_delay.assert_not_called()
+    [entry] = outbox_collection.insert_many.call_args.args[0]
+    assert entry["task"] == "send_verification_email_task"
+    assert entry["args"][0] == "jane@example.com"
+    [token] = token_collection.insert_many.call_args.args[0]
+    assert entry["args"][1].endswith(f"/verify-email?token={token['_id']}")
+    assert token["candidate_id"] == mock_collection.insert_one.call_args.args[0]["_id"]
+    assert entry["candidate_ids"] == [token["candidate_id"]]
+
+
+@pytest.mark.asyncio
+async def test_create_candidate_queues_email_before_insert(
+    mock_candidate_controller, mock_collection, outbox_collection, token_collection
+):
+    """Test a failed insert can orphan the email entry but never lose it"""
+    writes = []
+
+    def record(name):
+        def write(*args, **kwargs):
+            writes.append(name)
+            return MagicMock(inserted_id=ObjectId())
+
+        return write
+
+    token_collection.insert_many.side_effect = record("token")
+    outbox_collection.insert_many.side_effect = record("outbox")
+    mock_collection.insert_one.side_effect = record("candidate")
+
+    await mock_candidate_controller.create_candidate(
+        CandidateCreate(name="Jane", email="jane@example.com")
+    )
+
+    assert writes == ["token", "outbox", "candidate"]
+
+
+@pytest.mark.asyncio
+async def test_create_candidate_duplicate_discards_email(
+    mock_candidate_controller, mock_collection, outbox_collection, token_collection
+):
+    """Test a rejected duplicate removes the token and email it wrote"""
+    mock_collection.insert_one.side_effect = DuplicateKeyError("E11000")
+
+    with pytest.raises(HTTPException):
+        await mock_candidate_controller.create_candidate(
+            CandidateCreate(name="Jane", email="jane@example.com")
+        )
+
+    [entry] = outbox_collection.insert_many.call_args.args[0]
+    [token] = token_collection.insert_many.call_args.args[0]
+    outbox_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [entry["_id"]]}}
+    )
+    token_collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [token["_id"]]}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_candidate_uses_transaction_when_enabled(
+    mock_db, mock_collection, outbox_collection
+):
+    """Test the insert and its outbox entry share one transaction"""
+    session = MagicMock()
+
+    async def with_transaction(callback):
+        return await callback(session)
+
+    session.with_transaction = with_transaction
+    mock_db.client.start_session = AsyncMock(return_value=MagicMock())
+    start = mock_db.client.start_session.return_value
+    start.__aenter__ = AsyncMock(return_value=session)
+    start.__aexit__ = AsyncMock(return_value=False)
+    mock_collection.find_one.return_value = None
+
+    with patch("fastapi_assignment.config.OUTBOX_TRANSACTIONS", True):
+        await CandidateController(mock_db).create_candidate(
+            CandidateCreate(name="Jane", email="jane@example.com")
+        )
+
+    assert mock_collection.insert_one.call_args.kwargs == {"session": session}
+    assert outbox_collection.insert_many.call_args.kwargs == {"session": session}
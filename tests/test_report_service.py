@@ -0,0 +1,193 @@
+import pytest
+from aiosmtplib import SMTPException
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, MagicMock
+from pymongo.errors import ServerSelectionTimeoutError
+from fastapi_assignment.routers.report import send_report
+from fastapi_assignment.tasks import ReportGeneratorTask, generate_and_send_report_task
+from fastapi_assignment.utils.outbox import OUTBOX_COLLECTION
+from fastapi_assignment.utils.report_queue import (
+    JOB_LOCK_KEY,
+    PENDING_RECIPIENTS_KEY,
+    RELEASE_LOCK_SCRIPT,
+    drain_pending_recipients,
+    enqueue_report_request,
+    release_report_job,
+)
+
+
+@pytest.fixture
+def mock_redis():
+    """Create a mock async Redis client"""
+    redis = MagicMock()
+    redis.sadd = AsyncMock()
+    redis.set = AsyncMock(return_value=True)
+    redis.delete = AsyncMock()
+    redis.eval = AsyncMock(return_value=1)
+    redis.scard = AsyncMock(return_value=0)
+    redis.close = AsyncMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[set(), 0])
+    redis.pipeline.return_value.__aenter__.return_value = pipe
+    return redis
+
+
+def _request(email):
+    return SimpleNamespace(state=SimpleNamespace(email=email))
+
+
+@pytest.mark.asyncio
+async def test_send_report_coalesces_concurrent_requests(mock_redis):
+    """Test only the request that takes the job lock enqueues a task"""
+    mock_redis.set.side_effect = [True, None, None]
+
+    db = MagicMock()
+    outbox = db.__getitem__.return_value
+    outbox.insert_many = AsyncMock()
+
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        await send_report(_request(email), mock_redis, db)
+
+    db.__getitem__.assert_called_once_with(OUTBOX_COLLECTION)
+    [entry] = outbox.insert_many.call_args.args[0]
+    assert entry["task"] == "generate_and_send_report"
+    assert mock_redis.sadd.call_count == 3
+    mock_redis.set.assert_called_with(JOB_LOCK_KEY, ANY, nx=True, ex=900)
+    # The job is handed the token it must release the lock with
+    lock_token = mock_redis.set.call_args_list[0].args[1]
+    assert entry["args"] == [None, lock_token]
+
+
+@pytest.mark.asyncio
+async def test_send_report_releases_lock_when_enqueue_fails(mock_redis):
+    """Test a failed enqueue does not leave the job lock behind"""
+    db = MagicMock()
+    db.__getitem__.return_value.insert_many = AsyncMock(
+        side_effect=ServerSelectionTimeoutError("mongodb down")
+    )
+    with pytest.raises(ServerSelectionTimeoutError):
+        await send_report(_request("a@example.com"), mock_redis, db)
+
+    lock_token = mock_redis.set.call_args.args[1]
+    mock_redis.eval.assert_called_once_with(
+        RELEASE_LOCK_SCRIPT, 1, JOB_LOCK_KEY, lock_token
+    )
+
+
+@pytest.mark.asyncio
+async def test_report_queue_round_trip(mock_redis):
+    """Test queue helpers drain recipients and re-take the lock when needed"""
+    pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    pipe.execute.return_value = [{b"b@example.com", b"a@example.com"}, 1]
+
+    lock_token = await enqueue_report_request(mock_redis, "a@example.com")
+    assert lock_token
+    assert await drain_pending_recipients(mock_redis) == [
+        "a@example.com",
+        "b@example.com",
+    ]
+    pipe.delete.assert_called_once_with(PENDING_RECIPIENTS_KEY)
+
+    assert await release_report_job(mock_redis, lock_token) is None
+    mock_redis.eval.assert_called_with(RELEASE_LOCK_SCRIPT, 1, JOB_LOCK_KEY, lock_token)
+    mock_redis.scard.return_value = 1
+    assert await release_report_job(mock_redis, lock_token) == lock_token
+    # Jobs queued before lock tokens delete the lock outright
+    assert await release_report_job(mock_redis, None)
+    mock_redis.delete.assert_called_once_with(JOB_LOCK_KEY)
+
+
+@pytest.mark.asyncio
+async def test_process_pending_requests_generates_once(mock_redis):
+    """Test one report is generated and fanned out to all waiting recipients"""
+    task = ReportGeneratorTask("a@example.com", lock_token="token")
+    task.redis = mock_redis
+    pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    pipe.execute.return_value = [{b"a@example.com", b"b@example.com"}, 1]
+    task.get_or_create_report = AsyncMock(return_value={"path": "/tmp/r.csv.gz"})
+    task.send_report = AsyncMock(return_value=[None, None])
+
+    await task.process_pending_requests()
+
+    mock_redis.sadd.assert_called_once_with(PENDING_RECIPIENTS_KEY, "a@example.com")
+    task.get_or_create_report.assert_called_once()
+    task.send_report.assert_called_once_with(
+        "/tmp/r.csv.gz", ["a@example.com", "b@example.com"]
+    )
+    mock_redis.eval.assert_called_once_with(
+        RELEASE_LOCK_SCRIPT, 1, JOB_LOCK_KEY, "token"
+    )
+
+
+@pytest.mark.asyncio
+async def test_process_pending_requests_retries_failed_sends(mock_redis):
+    """Test recipients the SMTP pool could not reach are requeued and retried"""
+    task = ReportGeneratorTask(lock_token="token")
+    task.redis = mock_redis
+    pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    pipe.execute.return_value = [{b"a@example.com", b"b@example.com"}, 1]
+    task.get_or_create_report = AsyncMock(return_value={"path": "/tmp/r.csv.gz"})
+    task.send_report = AsyncMock(return_value=[None, "connection refused"])
+    task.close = AsyncMock()
+
+    with pytest.raises(SMTPException):
+        await task.process_pending_requests()
+
+    # Only the recipient that was not reached goes back on the queue
+    mock_redis.sadd.assert_called_once_with(PENDING_RECIPIENTS_KEY, "b@example.com")
+    mock_redis.eval.assert_called_once_with(
+        RELEASE_LOCK_SCRIPT, 1, JOB_LOCK_KEY, "token"
+    )
+
+
+@pytest.mark.asyncio
+async def test_process_pending_requests_requeues_on_failure(mock_redis):
+    """Test a failed round hands its recipients back and frees the lock"""
+    task = ReportGeneratorTask(lock_token="token")
+    task.redis = mock_redis
+    pipe = mock_redis.pipeline.return_value.__aenter__.return_value
+    pipe.execute.return_value = [{b"a@example.com", b"b@example.com"}, 1]
+    task.get_or_create_report = AsyncMock(
+        side_effect=ServerSelectionTimeoutError("mongodb down")
+    )
+    task.send_report = AsyncMock()
+    task.close = AsyncMock()
+
+    with pytest.raises(ServerSelectionTimeoutError):
+        await task.process_pending_requests()
+
+    mock_redis.sadd.assert_called_once_with(
+        PENDING_RECIPIENTS_KEY, "a@example.com", "b@example.com"
+    )
+    mock_redis.eval.assert_called_once_with(
+        RELEASE_LOCK_SCRIPT, 1, JOB_LOCK_KEY, "token"
+    )
+    task.send_report.assert_not_called()
+    task.close.assert_called_once()
+    # The exception reaches Celery, which retries the task
+    assert generate_and_send_report_task.autoretry_for == (Exception,)
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_report_reuses_artifact(tmp_path):
+    """Test an artifact for the current dataset version is reused"""
+    report_path = tmp_path / "candidate_report.csv.gz"
+    report_path.write_bytes(b"report")
+    versions, artifacts = MagicMock(), MagicMock()
+    versions.find_one = AsyncMock(return_value={"version": 7})
+    artifacts.find_one = AsyncMock(
+        return_value={"_id": "7:gzip", "path": str(report_path)}
+    )
+    task = ReportGeneratorTask()
+    task.db = MagicMock()
+    task.db.__getitem__.side_effect = {
+        "dataset_versions": versions,
+        "report_artifacts": artifacts,
+    }.__getitem__
+    task.write_report = AsyncMock()
+
+    artifact = await task.get_or_create_report()
+
+    assert artifact["path"] == str(report_path)
+    artifacts.find_one.assert_called_once_with({"_id": "7:gzip"})
+    task.write_report.assert_not_called()
@@ -0,0 +1,236 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pymongo.errors import OperationFailure
+from fastapi_assignment.middleware.request_middleware import RequestGuardMiddleware
+from fastapi_assignment.routers import admin
+from fastapi_assignment.utils.jwt_utils import create_access_token
+from fastapi_assignment.utils.slow_queries import (
+    SlowQueryLog,
+    explain_summary,
+    explainable_command,
+    query_shape,
+    request_route,
+    request_scope,
+)
+
+
+def command_event(request_id, command, duration_ms, database_name="assignment_db"):
+    return SimpleNamespace(
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        command_name=next(iter(command)),
+        command=command,
+        database_name=database_name,
+        duration_micros=int(duration_ms * 1000),
+    )
+
+
+def run_command(log, request_id, command, duration_ms, **kwargs):
+    event = command_event(request_id, command, duration_ms, **kwargs)
+    log.started(event)
+    log.succeeded(event)
+
+
+async def run_scheduled_explains():
+    # One turn creates the explain task, the next ones run it
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "PROJECTION_SIMPLE",
+            "inputStage": {"stage": "COLLSCAN"},
+        }
+    },
+    "executionStats": {
+        "nReturned": 1,
+        "totalDocsExamined": 5000,
+        "totalKeysExamined": 0,
+        "executionTimeMillis": 120,
+    },
+}
+
+
+def test_query_shape_hides_values():
+    """Test queries differing only in their arguments share one shape"""
+    first = {
+        "find": "candidates",
+        "filter": {"email": "a@example.com", "$or": [{"x": 1}, {"x": 2}]},
+        "sort": {"created_at": -1},
+        "$db": "assignment_db",
+    }
+    second = {**first, "filter": {"email": "b@example.com", "$or": [{"x": 9}]}}
+
+    shape = query_shape("find", first)
+
+    assert shape == {
+        "filter": {"email": "?", "$or": [{"x": "?"}]},
+        "sort": {"created_at": -1},
+    }
+    assert query_shape("find", second) == shape
+    assert query_shape(
+        "update", {"update": "candidates", "updates": [{"q": {"_id": 1}, "u": {}}]}
+    ) == {"q": [{"_id": "?"}]}
+
+
+def test_explainable_command_strips_driver_fields():
+    """Test explain is sent without session fields and with one statement"""
+    command = {
+        "delete": "candidates",
+        "deletes": [{"q": {"_id": 1}}, {"q": {"_id": 2}}],
+        "lsid": {"id": "x"},
+        "$db": "assignment_db",
+        "writeConcern": {"w": 1},
+    }
+
+    assert explainable_command("delete", command) == {
+        "delete": "candidates",
+        "deletes": [{"q": {"_id": 1}}],
+    }
+
+
+def test_explain_summary_flags_collection_scans():
+    """Test the plan summary names stages and keeps no query values"""
+    summary = explain_summary(COLLSCAN_EXPLAIN)
+
+    assert summary == {
+        "stages": ["PROJECTION_SIMPLE", "COLLSCAN"],
+        "collection_scan": True,
+        "docs_examined": 5000,
+        "keys_examined": 0,
+        "returned": 1,
+        "execution_ms": 120,
+    }
+    indexed = explain_summary(
+        {
+            "queryPlanner": {
+                "winningPlan": {
+                    "queryPlan": {
+                        "stage": "FETCH",
+                        "inputStage": {"stage": "IXSCAN", "indexName": "email_1"},
+                    }
+                }
+            }
+        }
+    )
+    assert indexed["stages"] == ["FETCH", "IXSCAN(email_1)"]
+    assert not indexed["collection_scan"]
+
+
+def test_request_route_prefers_route_template():
+    """Test commands are attributed to the route template when routed"""
+    assert request_route() is None
+
+    scope = {"path": "/candidate/abc"}
+    token = request_scope.set(scope)
+    try:
+        assert request_route() == "/candidate/abc"
+        scope["route"] = SimpleNamespace(path="/candidate/{id}")
+        assert request_route() == "/candidate/{id}"
+    finally:
+        request_scope.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_slow_commands_are_logged_and_explained_once():
+    """Test slow commands are recorded and each new shape explained once"""
+    db = MagicMock()
+    db.name = "assignment_db"
+    db.command = AsyncMock(return_value=COLLSCAN_EXPLAIN)
+    log = SlowQueryLog(threshold_ms=50, max_entries=10, max_explains=10)
+    log.attach(db)
+
+    run_command(log, 1, {"find": "candidates", "filter": {"name": "a"}}, 5)
+    run_command(log, 2, {"find": "candidates", "filter": {"name": "b"}}, 80)
+    run_command(log, 3, {"find": "candidates", "filter": {"name": "c"}}, 90)
+    run_command(log, 4, {"insert": "outbox", "documents": [{}]}, 70)
+    await run_scheduled_explains()
+
+    report = log.report()
+    assert [entry["duration_ms"] for entry in report["slow_queries"]] == [70, 90, 80]
+    assert report["slow_queries"][-1]["shape"] == {"filter": {"name": "?"}}
+    db.command.assert_awaited_once()
+    explain = db.command.call_args.args[0]
+    assert explain["explain"] == {"find": "candidates", "filter": {"name": "b"}}
+    assert explain["verbosity"] == "executionStats"
+    [explained] = report["explains"]
+    assert explained["collection"] == "candidates"
+    assert explained["plan"]["collection_scan"]
+    assert log._commands == {}
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_stays_bounded():
+    """Test the log ring and explain table drop their oldest entries"""
+    db = MagicMock()
+    db.name = "assignment_db"
+    db.command = AsyncMock(side_effect=OperationFailure("not allowed"))
+    log = SlowQueryLog(threshold_ms=0, max_entries=2, max_explains=2)
+    log.attach(db)
+
+    for request_id, field in enumerate(("a", "b", "c")):
+        run_command(log, request_id, {"find": "candidates", "filter": {field: 1}}, 1)
+    await run_scheduled_explains()
+
+    report = log.report()
+    assert len(report["slow_queries"]) == 2
+    assert [entry["shape"]["filter"] for entry in report["explains"]] == [
+        {"b": "?"},
+        {"c": "?"},
+    ]
+    # Failed explains leave the entry without a plan
+    assert all(entry["plan"] is None for entry in report["explains"])
+
+
+@pytest.fixture
+def admin_client():
+    """Create a client for the admin router behind the request middleware"""
+    app = FastAPI()
+    app.add_middleware(RequestGuardMiddleware)
+    app.include_router(admin.router)
+    return TestClient(app)
+
+
+def _auth(email):
+    token = create_access_token({"id": "1", "email": email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_slow_query_endpoint_requires_admin(admin_client):
+    """Test only configured admin emails can read the slow-query log"""
+    assert admin_client.get("/admin/slow-queries").status_code == 403
+
+    with patch.object(admin.config, "ADMIN_EMAILS", frozenset({"ops@example.com"})):
+        forbidden = admin_client.get(
+            "/admin/slow-queries", headers=_auth("user@example.com")
+        )
+        allowed = admin_client.get(
+            "/admin/slow-queries", headers=_auth("ops@example.com")
+        )
+
+    assert forbidden.status_code == 403
+    assert allowed.status_code == 200
+    assert set(allowed.json()) == {"threshold_ms", "slow_queries", "explains"}
+
+
+def test_middleware_exposes_request_scope():
+    """Test commands issued by a handler see the handler's route template"""
+    app = FastAPI()
+    app.add_middleware(RequestGuardMiddleware)
+    seen = []
+
+    @app.get("/health/{probe}")
+    async def probe(probe: str, request: Request):
+        seen.append(request_route())
+        return {}
+
+    TestClient(app).get("/health/db")
+
+    assert seen == ["/health/{probe}"]
+    assert request_route() is None
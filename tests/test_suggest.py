@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi_assignment.models.candidate import CandidateCreate
+from fastapi_assignment.routers.candidate import new_candidate_document
+from fastapi_assignment.utils.suggest import (
+    PREFIX_MAX_LENGTH,
+    backfill_prefixes,
+    email_prefixes,
+    name_prefixes,
+    suggest_query,
+)
+
+
+def test_name_prefixes_cover_every_word():
+    """Test each word of a name starts a prefix key, case-insensitively"""
+    prefixes = name_prefixes("  John   RONALD Doe ")
+
+    for key in ("j", "john r", "john ronald doe", "ron", "ronald d", "doe"):
+        assert key in prefixes
+    assert "ohn" not in prefixes
+    assert prefixes == sorted(set(prefixes))
+
+
+def test_email_prefixes_split_local_part():
+    """Test emails match from the start and after local-part separators"""
+    prefixes = email_prefixes("John.Doe+jobs@Example.com")
+
+    for key in ("john.", "doe+", "doe+jobs@example.com", "jobs@ex"):
+        assert key in prefixes
+    assert "example" not in prefixes
+    assert max(len(key) for key in prefixes) <= PREFIX_MAX_LENGTH
+
+
+def test_new_candidate_document_stores_prefixes():
+    """Test created candidates carry their prefix keys"""
+    document = new_candidate_document(
+        CandidateCreate(name="Jane Roe", email="jane@example.com")
+    )
+
+    assert "roe" in document["name_prefixes"]
+    assert "jane@" in document["email_prefixes"]
+
+
+def test_suggest_query_truncates_long_prefixes():
+    """Test long queries match on the stored prefix length"""
+    query = suggest_query("  A" * 40)
+
+    key = query["$or"][0]["name_prefixes"]
+    assert len(key) == PREFIX_MAX_LENGTH
+    assert key.startswith("a a a")
+
+
+def test_suggest_endpoint(client, mock_collection):
+    """Test /candidates/suggest projects, sorts and caps the results"""
+    candidate_id = ObjectId()
+    mock_collection.find.return_value.to_list.return_value = [
+        {"_id": candidate_id, "name": "John Doe", "email": "john@example.com"}
+    ]
+
+    response = client.get("/candidates/suggest?q=Jo&limit=5")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": str(candidate_id), "name": "John Doe", "email": "john@example.com"}
+    ]
+    query, projection = mock_collection.find.call_args.args
+    assert query == {"$or": [{"name_prefixes": "jo"}, {"email_prefixes": "jo"}]}
+    assert projection == {"name": 1, "email": 1}
+    mock_collection.find.return_value.sort.assert_called_once_with("name", 1)
+    mock_collection.find.return_value.limit.assert_called_once_with(5)
+
+    assert client.get("/candidates/suggest?q=jo&limit=500").status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_backfill_prefixes(mock_db, mock_collection):
+    """Test legacy candidates get prefix keys in unordered batches"""
+    candidates = [
+        {"_id": ObjectId(), "name": f"Name {i}", "email": f"n{i}@example.com"}
+        for i in range(3)
+    ]
+
+    async def iterate():
+        for candidate in candidates:
+            yield candidate
+
+    mock_collection.find = MagicMock(return_value=iterate())
+    mock_collection.bulk_write = AsyncMock(return_value=MagicMock(modified_count=2))
+
+    updated = await backfill_prefixes(mock_db, batch_size=2)
+
+    assert updated == 4
+    assert mock_collection.bulk_write.call_count == 2
+    operations = mock_collection.bulk_write.call_args_list[0].args[0]
+    assert "name 0" in operations[0]._doc["$set"]["name_prefixes"]
@@ -1,8 +1,12 @@
+import asyncio
+import threading
 import pytest
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
 from fastapi_assignment.models.user import UserCreate
 from fastapi_assignment.utils.jwt_utils import get_password_hash
+from fastapi_assignment.utils.password_hashing import PasswordHasher
 
 # Test data
 test_user = UserCreate(email="test@example.com", password="testpassword123")
@@ -43,6 +47,19 @@ async def test_register_user_duplicate_email(mock_user_service, mock_collection)
     assert exc_info.value.detail == "Email already registered"
 
 
+@pytest.mark.asyncio
+async def test_register_user_concurrent_duplicate(mock_user_service, mock_collection):
+    """Test a registration racing past the pre-check is rejected by the index"""
+    mock_collection.find_one.return_value = None
+    mock_collection.insert_one.side_effect = DuplicateKeyError("E11000")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await mock_user_service.register_user(test_user)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Email already registered"
+
+
 @pytest.mark.asyncio
 async def test_login_user_success(mock_user_service, mock_collection):
     """Test successful user login"""
@@ -78,6 +95,46 @@ async def test_login_user_invalid_credentials(mock_user_service, mock_collection
     assert exc_info.value.detail == "Invalid credentials"
 
 
+@pytest.mark.asyncio
+async def test_password_hashing_does_not_block_event_loop():
+    """Test other coroutines keep running while a hash is in progress"""
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    release = threading.Event()
+    job = asyncio.ensure_future(hasher.run(release.wait))
+
+    # The loop is free to run other work while the hash thread is busy
+    await asyncio.sleep(0.01)
+    assert not job.done()
+    release.set()
+    assert await job is True
+
+    stats = hasher.stats()
+    assert stats["completed"] == 1
+    # How the job splits between queued and running depends on when the
+    # pool thread starts, but together they span the sleep above
+    assert stats["queued_seconds_total"] + stats["hash_seconds_total"] >= 0.01
+    assert stats["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_rejects_when_queue_full():
+    """Test requests beyond the queue limit fail fast with 503"""
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.ensure_future(hasher.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.verify("password", test_user_hash)
+
+    assert exc_info.value.status_code == 503
+    assert hasher.stats()["rejected"] == 1
+    release.set()
+    await asyncio.gather(*running)
+    assert await hasher.verify("testpassword123", test_user_hash)
+    assert hasher.stats()["queued_seconds_total"] > 0
+
+
 def test_register_endpoint_integration(client, mock_collection):
     """Test the register endpoint integration"""
     # Setup mock responses for the endpoint